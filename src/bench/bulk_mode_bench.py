@@ -0,0 +1,85 @@
+# src/bench/bulk_mode_bench.py
+# ----------------------------
+# Benchmark: N synthetic commits with and without bulk mode
+#
+#   python -m src.bench.bulk_mode_bench --commits 10000
+#
+# Each commit mirrors commit_executor._git_commit: touch a file,
+# `git add .`, `git commit` with injected dates. Both runs use a fresh
+# repo in a temp dir; the bulk run includes its final repack.
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.bulk_mode import bulk_mode
+
+
+def _init_repo(path: Path, with_hook: bool) -> None:
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    subprocess.run(["git", "config", "user.name", "bench"], cwd=path, check=True)
+    subprocess.run(["git", "config", "user.email", "bench@example.com"], cwd=path, check=True)
+
+    if with_hook:
+        # a typical cheap client hook; bulk mode skips it
+        hook = path / ".git" / "hooks" / "pre-commit"
+        hook.write_text("#!/bin/sh\nexit 0\n", encoding="utf-8")
+        hook.chmod(0o755)
+
+
+def _commit_loop(repo: Path, n: int) -> None:
+    env = os.environ.copy()
+    for i in range(n):
+        note = repo / "src" / f"note_{i % 500:04d}.md"
+        note.parent.mkdir(parents=True, exist_ok=True)
+        with open(note, "a", encoding="utf-8") as f:
+            f.write(f"{i}\n")
+
+        stamp = f"{1_600_000_000 + i * 60} -0500"
+        env["GIT_AUTHOR_DATE"] = stamp
+        env["GIT_COMMITTER_DATE"] = stamp
+
+        subprocess.run(["git", "add", "."], cwd=repo, check=True, env=env)
+        subprocess.run(
+            ["git", "commit", "-q", "-m", f"bench {i}"],
+            cwd=repo, check=True, env=env,
+        )
+
+
+def run_bench(n: int, with_hook: bool = True) -> dict:
+    results = {}
+    base = Path(tempfile.mkdtemp(prefix="gitcom_bench_"))
+
+    try:
+        for label in ("default", "bulk"):
+            repo = base / label
+            _init_repo(repo, with_hook)
+
+            t0 = time.perf_counter()
+            if label == "bulk":
+                with bulk_mode(str(repo)):
+                    _commit_loop(repo, n)
+            else:
+                _commit_loop(repo, n)
+            results[label] = time.perf_counter() - t0
+
+            print(f"[bench] {label:<8} {n} commits in {results[label]:.2f}s "
+                  f"({n / results[label]:.0f} commits/s)")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    print(f"[bench] speedup x{results['default'] / results['bulk']:.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=10000)
+    parser.add_argument("--no-hook", action="store_true")
+    args = parser.parse_args()
+
+    run_bench(args.commits, with_hook=not args.no_hook)
@@ -0,0 +1,359 @@
+# src/core/bootstrap.py
+# ---------------------
+# Execution repo bootstrap: local mirror cache + cheap clones
+#
+#   python -m src.core.bootstrap mirror --url git@github.com:me/gitcom-test.git
+#   python -m src.core.bootstrap ensure --all          # registry + execution_repo
+#   python -m src.core.bootstrap batch --url ... --dest /tmp/runs --count 100 \
+#       --sparse src/notes
+#
+# repo_config.json:
+#   "bootstrap": {
+#     "mirror_dir": "~/.gitcom/mirrors",
+#     "mode": "partial",                       # partial | reference
+#     "repos": {"gitcom-test": {"url": "...", "branch": "main", "sparse": ["src"]}}
+#   }
+#
+# mirror     one bare clone per upstream URL (heads + tags only), refreshed
+#            with `git fetch --prune`; the only step that uses the network
+# partial    `git clone --filter=blob:none file://<mirror>`: commits and
+#            trees only, blobs are fetched lazily from the mirror, and only
+#            for the checked-out cone
+# reference  `git clone --reference <mirror>`: the mirror becomes an
+#            alternate, nothing is copied
+# sparse     clone --no-checkout, `sparse-checkout set --cone <dirs>`,
+#            then check out
+#
+# A clone fetches from the mirror (origin url) and pushes to the upstream
+# (origin pushurl), so final_pusher and @{u} work unchanged. Mirrors have
+# gc.auto=0 / gc.pruneExpire=never because reference clones borrow their
+# objects. They are marked gitcom.mirror, not as an object store, so
+# object_store.store_of() never absorbs a reference clone into its mirror.
+# Partial clones are promisor repos and cannot be put on a shared object
+# store; use mode "reference" for repos that go through object_store.
+
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.core.object_store import STORE_CONFIG
+from src.core.run_metrics import METRICS
+
+
+CONFIG_PATH = Path("src/res/repo_config.json")
+REPOPATH_FILE = Path("src/locked_res_ver1.3/gitcom_repopath.txt")
+DEFAULT_MIRROR_DIR = Path("~/.gitcom/mirrors")
+
+MODES = ("partial", "reference")
+
+MIRROR_CONFIG = {
+    **STORE_CONFIG,
+    "gitcom.mirror": "true",
+    "uploadpack.allowFilter": "true",
+    "uploadpack.allowAnySHA1InWant": "true",
+}
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class BootstrapError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    name: str
+    path: Path
+    url: str
+    branch: Optional[str] = None          # None: the mirror's default branch
+    sparse: Sequence[str] = field(default_factory=tuple)
+
+
+# --------------------------------------------------
+# git helpers
+# --------------------------------------------------
+
+def _git(cwd: Optional[Path], *args: str) -> str:
+    cmd = ["git", *args]
+    with METRICS.time_git(cmd):
+        result = subprocess.run(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    if result.returncode != 0:
+        raise BootstrapError(f"[bootstrap] {' '.join(cmd)} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def _is_repo(path: Path) -> bool:
+    return (path / ".git").exists()
+
+
+# --------------------------------------------------
+# Mirror cache
+# --------------------------------------------------
+
+def mirror_path(mirror_dir: Path, url: str) -> Path:
+    """
+    <mirror_dir>/<last url component>-<hash>.git
+    """
+    stem = re.sub(r"\.git$", "", url.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]) or "repo"
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+    return Path(mirror_dir).expanduser().resolve() / f"{stem}-{digest}.git"
+
+
+def ensure_mirror(mirror_dir: Path, url: str, *, refresh: bool = True) -> Path:
+    """
+    Create the mirror for `url` or fetch into it. refresh=False uses the
+    cached mirror as is (fully offline).
+    """
+    mirror = mirror_path(mirror_dir, url)
+
+    if not (mirror / "objects").is_dir():
+        # configured under a temp name: an interrupted clone never looks
+        # like a usable mirror
+        tmp = mirror.with_name(mirror.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        _git(None, "clone", "-q", "--bare", "--template=", url, str(tmp))
+        for spec in MIRROR_REFSPECS:
+            _git(tmp, "config", "--add", "remote.origin.fetch", spec)
+        for key, value in MIRROR_CONFIG.items():
+            _git(tmp, "config", key, value)
+        tmp.rename(mirror)
+    elif refresh:
+        _git(mirror, "fetch", "-q", "--prune", "origin")
+
+    return mirror
+
+
+def _default_branch(mirror: Path) -> str:
+    ref = _git(mirror, "symbolic-ref", "-q", "HEAD")
+    return ref[len("refs/heads/"):]
+
+
+# --------------------------------------------------
+# Clones
+# --------------------------------------------------
+
+def clone_from_mirror(
+    mirror: Path,
+    spec: RepoSpec,
+    *,
+    mode: str = "partial",
+) -> Dict[str, Any]:
+    """
+    Create spec.path from the local mirror; fetch from the mirror, push
+    to spec.url.
+    """
+    if mode not in MODES:
+        raise BootstrapError(f"[bootstrap] mode must be one of {MODES}, got {mode!r}")
+    if spec.path.exists() and any(spec.path.iterdir()):
+        raise BootstrapError(f"[bootstrap] {spec.path} exists and is not empty")
+
+    t0 = time.perf_counter()
+    branch = spec.branch or _default_branch(mirror)
+    source = mirror.as_uri()
+
+    cmd = ["clone", "-q", "--no-checkout", "--template=", "-b", branch]
+    if mode == "partial":
+        cmd += ["--filter=blob:none"]
+    else:
+        cmd += ["--reference", str(mirror)]
+    _git(None, *cmd, source, str(spec.path))
+
+    _git(spec.path, "remote", "set-url", "--push", "origin", spec.url)
+    if spec.sparse:
+        _git(spec.path, "sparse-checkout", "set", "--cone", *spec.sparse)
+    _git(spec.path, "checkout", "-q", branch)
+
+    return {
+        "name": spec.name,
+        "path": str(spec.path),
+        "action": "cloned",
+        "mode": mode,
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+def refresh_clone(spec: RepoSpec) -> Dict[str, Any]:
+    """
+    Existing repo: fetch from its origin (the mirror for repos made here)
+    and re-apply the sparse cone. The worktree and local commits are left
+    alone.
+    """
+    t0 = time.perf_counter()
+    _git(spec.path, "fetch", "-q", "--prune", "origin")
+    if spec.sparse:
+        _git(spec.path, "sparse-checkout", "set", "--cone", *spec.sparse)
+    return {
+        "name": spec.name,
+        "path": str(spec.path),
+        "action": "refreshed",
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+def ensure_repo(
+    spec: RepoSpec,
+    mirror_dir: Path,
+    *,
+    mode: str = "partial",
+    refresh_mirror: bool = True,
+) -> Dict[str, Any]:
+    mirror = ensure_mirror(mirror_dir, spec.url, refresh=refresh_mirror)
+    if _is_repo(spec.path):
+        return refresh_clone(spec)
+    return clone_from_mirror(mirror, spec, mode=mode)
+
+
+def spin_up(
+    url: str,
+    dest: Path,
+    count: int,
+    *,
+    mirror_dir: Path = DEFAULT_MIRROR_DIR,
+    mode: str = "partial",
+    branch: Optional[str] = None,
+    sparse: Sequence[str] = (),
+    prefix: str = "run",
+    workers: int = 8,
+    refresh_mirror: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    `count` fresh execution repos <dest>/<prefix>-NNN off one mirror
+    refresh; clones are local and run concurrently (each is a git
+    subprocess, so threads are enough).
+    """
+    mirror = ensure_mirror(mirror_dir, url, refresh=refresh_mirror)
+    specs = [
+        RepoSpec(name=f"{prefix}-{i:03d}", path=Path(dest) / f"{prefix}-{i:03d}",
+                 url=url, branch=branch, sparse=tuple(sparse))
+        for i in range(count)
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(lambda s: clone_from_mirror(mirror, s, mode=mode), specs))
+
+
+def remove_batch(dest: Path, prefix: str = "run") -> int:
+    removed = 0
+    for path in sorted(Path(dest).glob(f"{prefix}-[0-9][0-9][0-9]")):
+        shutil.rmtree(path)
+        removed += 1
+    return removed
+
+
+# --------------------------------------------------
+# Config
+# --------------------------------------------------
+
+def load_specs(cfg: dict, repopath_file: Path = REPOPATH_FILE) -> List[RepoSpec]:
+    """
+    Registry repos (current platform section) plus execution_repo.path,
+    each with its bootstrap.repos entry. Repos without a url are skipped:
+    there is nothing to bootstrap them from.
+    """
+    from src.core.final_pusher import load_repo_paths
+
+    entries = cfg.get("bootstrap", {}).get("repos", {})
+    paths = load_repo_paths(repopath_file) if Path(repopath_file).exists() else {}
+
+    exec_path = cfg.get("execution_repo", {}).get("path")
+    if exec_path and exec_path not in paths.values():
+        paths[Path(exec_path).name] = exec_path
+
+    specs = []
+    for name, path in paths.items():
+        entry = entries.get(name, {})
+        if not entry.get("url"):
+            continue
+        specs.append(RepoSpec(
+            name=name,
+            path=Path(path).expanduser(),
+            url=entry["url"],
+            branch=entry.get("branch"),
+            sparse=tuple(entry.get("sparse", ())),
+        ))
+    return specs
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="execution repo bootstrap from local mirrors")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    parser.add_argument("--registry", type=Path, default=REPOPATH_FILE)
+    parser.add_argument("--mirror-dir", type=Path, default=None)
+    parser.add_argument("--mode", choices=MODES, default=None)
+    parser.add_argument("--offline", action="store_true", help="use cached mirrors without fetching")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_mirror = sub.add_parser("mirror")
+    p_mirror.add_argument("--url", required=True)
+
+    p_ensure = sub.add_parser("ensure")
+    which = p_ensure.add_mutually_exclusive_group(required=True)
+    which.add_argument("--all", action="store_true")
+    which.add_argument("--name", action="append")
+
+    p_batch = sub.add_parser("batch")
+    p_batch.add_argument("--url", required=True)
+    p_batch.add_argument("--dest", type=Path, required=True)
+    p_batch.add_argument("--count", type=int, required=True)
+    p_batch.add_argument("--branch", default=None)
+    p_batch.add_argument("--sparse", action="append", default=[], help="cone directory (repeatable)")
+    p_batch.add_argument("--prefix", default="run")
+    p_batch.add_argument("--workers", type=int, default=8)
+    p_batch.add_argument("--clean", action="store_true", help="remove <dest>/<prefix>-NNN first")
+
+    args = parser.parse_args()
+
+    cfg = {}
+    if args.config.exists():
+        with open(args.config, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    boot = cfg.get("bootstrap", {})
+    mirror_dir = args.mirror_dir or Path(boot.get("mirror_dir", DEFAULT_MIRROR_DIR))
+    mode = args.mode or boot.get("mode", "partial")
+
+    if args.cmd == "mirror":
+        print(f"[bootstrap] {ensure_mirror(mirror_dir, args.url, refresh=not args.offline)}")
+
+    elif args.cmd == "ensure":
+        specs = load_specs(cfg, args.registry)
+        if args.name:
+            specs = [s for s in specs if s.name in args.name]
+        for spec in specs:
+            r = ensure_repo(spec, mirror_dir, mode=mode, refresh_mirror=not args.offline)
+            print(f"[bootstrap] {r['name']}: {r['action']} at {r['path']} ({r['ms']} ms)")
+
+    else:
+        if args.clean:
+            remove_batch(args.dest, args.prefix)
+        t0 = time.perf_counter()
+        results = spin_up(
+            args.url,
+            args.dest,
+            args.count,
+            mirror_dir=mirror_dir,
+            mode=mode,
+            branch=args.branch,
+            sparse=args.sparse,
+            prefix=args.prefix,
+            workers=args.workers,
+            refresh_mirror=not args.offline,
+        )
+        print(f"[bootstrap] {len(results)} repos in {args.dest} ({mode}) in {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,439 @@
+# src/core/branch_synth.py
+# ------------------------
+# Parallel feature-branch synthesis with merge commits
+#
+#   python -m src.core.branch_synth --begin 2022-01-01 --end 2022-03-31 \
+#       --branches 12 --workers 4
+#
+#   plan     (main process) each branch gets a fork day, a length and its
+#            commit times from its own rng stream; it merges back the day
+#            after its last commit. Merge times are drawn up front, so
+#            every branch knows its fork point: the main tip after the
+#            last merge before its first commit (the base if none).
+#            `begin` may not precede the base commit's day; commits on
+#            that day are clamped after it.
+#   build    (process pool) one `git fast-import` per branch, all writing
+#            into the repo's object store at once (each import writes its
+#            own pack); commits are built from the fork point's tree with
+#            inline blobs -- no index, no worktree, no index.lock
+#            -> refs/gitcom/synth/<run>/<branch>
+#            A branch is submitted as soon as its fork point exists.
+#   merge    (main process) merge commits in merge-time order with
+#            `git merge-tree --write-tree` + `git commit-tree`, each one
+#            waiting only for its own branch
+#   publish  one `git update-ref --stdin` transaction: main (checked
+#            against its old value), the feature branches, temp refs
+#            removed -- all or nothing
+#
+# Branches only add / edit / delete files under src/<branch>/, so merges
+# never conflict.
+
+import bisect
+import multiprocessing
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.action_layout import ACTION_TYPES
+from src.core.anti_timedox import validate_actions
+from src.core.msg_lib import MSGS_PATH, MsgLibrary
+from src.core.multidays_commit_pusher import MULTI_COMMIT_RANGE, date_range
+from src.core.rng_streams import RngStreams, resolve_seed
+from src.core.run_refs import new_run_id
+from src.core.time_set import TimeInjection, commit_times
+
+
+REF_PREFIX = "refs/gitcom/synth"
+
+BRANCH_DAYS = (2, 10)        # working days of a feature branch, inclusive
+MAX_ACTIONS = 3
+
+Author = Tuple[str, str]
+
+
+class BranchSynthError(Exception):
+    pass
+
+
+@dataclass
+class BranchPlan:
+    name: str
+    times: List[int]                     # commit epochs, ascending
+    merge_day: str
+    fork: Optional[str] = None           # main tip the branch starts from
+    tip: Optional[str] = None
+    files: List[str] = field(default_factory=list)
+
+
+# --------------------------------------------------
+# git helpers
+# --------------------------------------------------
+
+def _git(repo_path: str, *args: str, env: Optional[Dict[str, str]] = None, stdin: Optional[str] = None) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        input=stdin,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise BranchSynthError(f"[branch] git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def _date_env(epoch: int, tz: str, author: Author) -> Dict[str, str]:
+    env = os.environ.copy()
+    stamp = f"{epoch} {tz}"
+    env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = stamp
+    env["GIT_AUTHOR_NAME"] = env["GIT_COMMITTER_NAME"] = author[0]
+    env["GIT_AUTHOR_EMAIL"] = env["GIT_COMMITTER_EMAIL"] = author[1]
+    return env
+
+
+# --------------------------------------------------
+# Plan
+# --------------------------------------------------
+
+def plan_branches(
+    days: List[str],
+    n_branches: int,
+    injection: TimeInjection,
+    streams: RngStreams,
+    branch_days: Tuple[int, int] = BRANCH_DAYS,
+) -> List[BranchPlan]:
+    """
+    Fork day, working days and commit times per branch; every branch
+    merges the day after its last working day, inside `days`.
+    """
+    lo, hi = branch_days
+    if len(days) < lo + 1:
+        raise BranchSynthError(f"[branch] range of {len(days)} days is too short for a branch")
+
+    gen = streams.numpy(None, "branches")
+    plans: List[BranchPlan] = []
+    for b in range(n_branches):
+        name = f"feature-{b:03d}"
+        length = int(gen.integers(lo, min(hi, len(days) - 1) + 1))
+        start = int(gen.integers(0, len(days) - length))
+        span = days[start:start + length]
+
+        bstreams = streams.for_repo(f"{streams.repo}@{name}")
+        bgen = bstreams.numpy(None, "days")
+        counts = np.where(
+            bgen.random(length) < 0.35,
+            bgen.integers(MULTI_COMMIT_RANGE[0], MULTI_COMMIT_RANGE[1] + 1, size=length),
+            1,
+        )
+        times = commit_times(span, counts, injection, streams=bstreams)
+
+        plans.append(BranchPlan(
+            name=name,
+            times=times.tolist(),
+            merge_day=days[start + length],
+        ))
+    return plans
+
+
+def _after(times: List[int], floor: int) -> List[int]:
+    """
+    Clamp ascending epochs strictly after `floor`, keeping them strictly
+    increasing.
+    """
+    out = []
+    for t in times:
+        floor = max(t, floor + 1)
+        out.append(floor)
+    return out
+
+
+# --------------------------------------------------
+# Build (worker processes)
+# --------------------------------------------------
+
+_MSG_LIB: Optional[MsgLibrary] = None
+
+
+def _init_worker(msgs_path: str) -> None:
+    global _MSG_LIB
+    _MSG_LIB = MsgLibrary(msgs_path)
+
+
+def _data(payload: bytes) -> bytes:
+    return b"data %d\n%s\n" % (len(payload), payload)
+
+
+def build_branch(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write one branch with its own fast-import; returns tip + live files.
+    """
+    name = task["name"]
+    ref = task["ref"]
+    who = f"{task['author'][0]} <{task['author'][1]}>".encode("utf-8")
+    tz = task["tz"].encode("ascii")
+    streams = RngStreams(task["seed"], f"{task['repo']}@{name}")
+
+    proc = subprocess.Popen(
+        ["git", "fast-import", "--quiet"],
+        cwd=task["repo_path"],
+        stdin=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    files: Dict[str, bytes] = {}
+    for i, epoch in enumerate(task["times"]):
+        rng = streams.stream(None, f"actions/{i}")
+        live = list(files)
+        actions = []
+        for _ in range(rng.randint(1, MAX_ACTIONS)):
+            kind = ACTION_TYPES.draw(rng)
+            if kind == "add" or not live:
+                actions.append({"type": "add", "path": f"src/{name}/note_{rng.randint(1000, 9999)}.md"})
+            else:
+                actions.append({"type": kind, "path": rng.choice(live)})
+        valid = validate_actions(last_snap=files, actions=actions)
+
+        message = _MSG_LIB.pick(valid[0]["type"], streams.stream(None, f"message/{i}").random())
+        out = [
+            b"commit %s\n" % ref.encode("utf-8"),
+            b"author %s %d %s\n" % (who, epoch, tz),
+            b"committer %s %d %s\n" % (who, epoch, tz),
+            _data(message.encode("utf-8")),
+        ]
+        if i == 0:
+            out.append(b"from %s\n" % task["base"].encode("ascii"))
+
+        for act in valid:
+            path = act["path"]
+            if act["type"] == "delete":
+                files.pop(path, None)
+                out.append(b"D %s\n" % path.encode("utf-8"))
+                continue
+            if act["type"] == "add":
+                files.setdefault(path, b"")
+            else:
+                files[path] += b"\n"
+            out.append(b"M 100644 inline %s\n" % path.encode("utf-8"))
+            out.append(_data(files[path]))
+
+        out.append(b"\n")
+        proc.stdin.write(b"".join(out))
+
+    proc.stdin.close()
+    if proc.wait() != 0:
+        raise BranchSynthError(f"[branch] fast-import for {name} failed: {proc.stderr.read().decode(errors='replace')}")
+
+    tip = _git(task["repo_path"], "rev-parse", ref)
+    return {"name": name, "tip": tip, "files": sorted(files)}
+
+
+# --------------------------------------------------
+# Driver
+# --------------------------------------------------
+
+def synthesize(
+    repo_path: str,
+    begin: str,
+    end: str,
+    *,
+    n_branches: int,
+    author: Author,
+    injection: Optional[TimeInjection] = None,
+    seed: Optional[int] = None,
+    main: str = "HEAD",
+    keep_branches: bool = True,
+    workers: Optional[int] = None,
+    msgs_path: Path = MSGS_PATH,
+) -> Dict[str, Any]:
+    """
+    Build `n_branches` feature branches off `main` in parallel, merge them
+    back at their planned times and publish everything in one ref
+    transaction.
+    """
+    injection = injection or TimeInjection()
+    seed = resolve_seed(seed)
+    repo = Path(repo_path).resolve().name
+    streams = RngStreams(seed, repo)
+
+    main_ref = _git(repo_path, "rev-parse", "--symbolic-full-name", main)
+    if not main_ref.startswith("refs/heads/"):
+        raise BranchSynthError(f"[branch] {main} is not a branch")
+    base = _git(repo_path, "rev-parse", "--verify", f"{main_ref}^{{commit}}")
+    base_epoch = int(_git(repo_path, "log", "-1", "--format=%ct", base))
+    base_day = datetime.fromtimestamp(base_epoch, injection.tzinfo).date().isoformat()
+    if begin < base_day:
+        raise BranchSynthError(f"[branch] begin {begin} is before the base commit ({base_day})")
+
+    days = date_range(begin, end)
+    plans = plan_branches(days, n_branches, injection, streams)
+    for p in plans:
+        p.times = _after(p.times, base_epoch)
+    run_id = new_run_id()
+    tz = injection.timezone.replace(":", "")
+
+    # merge order and times, then each branch's fork point: the number of
+    # merges on main before its first commit
+    order = sorted(range(len(plans)), key=lambda k: (plans[k].merge_day, k))
+    merge_days = sorted({plans[k].merge_day for k in order})
+    per_day = [sum(plans[k].merge_day == d for k in order) for d in merge_days]
+    merge_times = commit_times(merge_days, per_day, injection, streams=streams.for_repo(f"{repo}@merges")).tolist()
+    forks_at = [bisect.bisect_left(merge_times, p.times[0]) for p in plans]
+
+    tasks = [
+        {
+            "name": p.name,
+            "ref": f"{REF_PREFIX}/{run_id}/{p.name}",
+            "times": p.times,
+            "base": None,
+            "repo_path": str(Path(repo_path).resolve()),
+            "repo": repo,
+            "seed": seed,
+            "tz": tz,
+            "author": author,
+        }
+        for p in plans
+    ]
+
+    t0 = time.perf_counter()
+    build_s = 0.0
+    pool = None
+    try:
+        if workers == 0:
+            _init_worker(str(msgs_path))
+        else:
+            pool = multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(str(msgs_path),))
+
+        pending: Dict[int, Any] = {}
+
+        def _fork(m: int, tip: str) -> None:
+            # 1. branches forking after the m-th merge, one fast-import each
+            for k, at in enumerate(forks_at):
+                if at != m:
+                    continue
+                plans[k].fork = tasks[k]["base"] = tip
+                pending[k] = pool.apply_async(build_branch, (tasks[k],)) if pool else build_branch(tasks[k])
+
+        def _built(k: int) -> BranchPlan:
+            nonlocal build_s
+            t = time.perf_counter()
+            result = pending.pop(k)
+            b = result.get() if pool else result
+            build_s += time.perf_counter() - t
+            plans[k].tip, plans[k].files = b["tip"], b["files"]
+            return plans[k]
+
+        # 2. merges on main, in merge-time order
+        main_tip = base
+        short_main = main_ref[len("refs/heads/"):]
+        _fork(0, main_tip)
+        for m, (k, epoch) in enumerate(zip(order, merge_times)):
+            p = _built(k)
+            tree = _git(repo_path, "merge-tree", "--write-tree", main_tip, p.tip).split("\n", 1)[0]
+            main_tip = _git(
+                repo_path, "commit-tree", tree, "-p", main_tip, "-p", p.tip,
+                "-m", f"Merge branch '{p.name}' into {short_main}",
+                env=_date_env(epoch, tz, author),
+            )
+            _fork(m + 1, main_tip)
+
+        # 3. publish atomically
+        lines = ["start", f"update {main_ref} {main_tip} {base}"]
+        for p in plans:
+            if keep_branches:
+                lines.append(f"create refs/heads/{p.name} {p.tip}")
+            lines.append(f"delete {REF_PREFIX}/{run_id}/{p.name} {p.tip}")
+        lines += ["prepare", "commit"]
+        _git(repo_path, "update-ref", "--stdin", stdin="\n".join(lines) + "\n")
+    except Exception:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+            pool = None
+        for t in tasks:
+            subprocess.run(["git", "update-ref", "-d", t["ref"]], cwd=repo_path, stderr=subprocess.DEVNULL)
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    _sync_worktree(repo_path, main_ref, base, main_tip)
+
+    commits = sum(len(p.times) for p in plans)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"[branch] {len(plans)} branches, {commits} commits + {len(plans)} merges "
+        f"in {elapsed:.2f}s (waiting on builds {build_s:.2f}s)"
+    )
+    return {
+        "seed": seed,
+        "base": base,
+        "head": main_tip,
+        "branches": {p.name: p.tip for p in plans},
+        "forks": {p.name: p.fork for p in plans},
+        "commits": commits,
+        "merges": len(plans),
+        "files": sorted({f for p in plans for f in p.files}),
+    }
+
+
+def _sync_worktree(repo_path: str, main_ref: str, old: str, new: str) -> None:
+    """
+    If main is checked out, fast-forward index + worktree (local changes
+    are kept, like a fast-forward merge).
+    """
+    if _git(repo_path, "rev-parse", "--is-bare-repository") == "true":
+        return
+    head = subprocess.run(
+        ["git", "symbolic-ref", "-q", "HEAD"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout.strip()
+    if head == main_ref:
+        _git(repo_path, "read-tree", "-m", "-u", old, new)
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="parallel feature-branch synthesis")
+    parser.add_argument("--repo", default=".")
+    parser.add_argument("--begin", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--branches", type=int, default=8)
+    parser.add_argument("--main", default="HEAD")
+    parser.add_argument("--workers", type=int, default=None, help="default: os.cpu_count()")
+    parser.add_argument("--drop-branches", action="store_true", help="only keep the merges on main")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    with open("src/res/repo_config.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    ident = cfg["git_identity"]
+    synthesize(
+        args.repo,
+        args.begin,
+        args.end,
+        n_branches=args.branches,
+        author=(ident["username"], ident["email"]),
+        injection=TimeInjection.from_config(cfg),
+        seed=resolve_seed(args.seed, cfg),
+        main=args.main,
+        keep_branches=not args.drop_branches,
+        workers=args.workers,
+    )
@@ -0,0 +1,173 @@
+# src/core/bulk_mode.py
+# ---------------------
+# Bulk-mode git config profile for high-throughput runs
+#
+#   with bulk_mode(repo_path):
+#       run_days(...)
+#
+# While active, the execution repo skips per-commit overhead that only
+# matters for interactive use (hooks, auto-gc, fsync, commit-graph
+# writes). On exit the previous settings are restored (and an fsmonitor
+# daemon started by the profile is stopped); after a successful run ONE
+# repack + commit-graph write is done for the whole run.
+#
+# The saved settings live in <git-dir>/gitcom/bulk_mode.json until
+# restored, so a crashed run can be cleaned up with restore_profile().
+
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.core.run_metrics import METRICS
+
+
+STATE_FILENAME = "bulk_mode.json"
+
+
+class BulkModeError(Exception):
+    pass
+
+
+def bulk_profile(hooks_dir: str) -> Dict[str, str]:
+    profile = {
+        "gc.auto": "0",
+        "maintenance.auto": "false",
+        "core.hooksPath": hooks_dir,           # empty dir -> no hooks
+        "core.fsync": "none",
+        "core.untrackedCache": "true",
+        "gc.writeCommitGraph": "false",
+        "fetch.writeCommitGraph": "false",
+    }
+    if platform.system() in ("Darwin", "Windows"):
+        # builtin fsmonitor daemon is only available there
+        profile["core.fsmonitor"] = "true"
+    return profile
+
+
+# --------------------------------------------------
+# git config helpers
+# --------------------------------------------------
+
+def _git(repo_path: str, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+    cmd = ["git", *args]
+    with METRICS.time_git(cmd):
+        return subprocess.run(
+            cmd,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=check,
+        )
+
+
+def _get_local(repo_path: str, key: str) -> Optional[List[str]]:
+    result = _git(repo_path, "config", "--local", "--get-all", key, check=False)
+    if result.returncode != 0:
+        return None
+    return result.stdout.splitlines()
+
+
+def _restore_key(repo_path: str, key: str, values: Optional[List[str]]) -> None:
+    _git(repo_path, "config", "--local", "--unset-all", key, check=False)
+    for value in values or []:
+        _git(repo_path, "config", "--local", "--add", key, value)
+
+
+def _state_path(repo_path: str) -> Path:
+    git_dir = _git(repo_path, "rev-parse", "--absolute-git-dir").stdout.strip()
+    return Path(git_dir) / "gitcom" / STATE_FILENAME
+
+
+# --------------------------------------------------
+# Profile switching
+# --------------------------------------------------
+
+def apply_profile(repo_path: str) -> Dict[str, Optional[List[str]]]:
+    """
+    Save current local values, then apply the bulk profile.
+    """
+    state_path = _state_path(repo_path)
+    if state_path.exists():
+        raise BulkModeError(
+            f"[bulk] {repo_path} is already in bulk mode "
+            f"(or a previous run crashed: call restore_profile)"
+        )
+
+    hooks_dir = tempfile.mkdtemp(prefix="gitcom_nohooks_")
+    profile = bulk_profile(hooks_dir)
+    saved = {key: _get_local(repo_path, key) for key in profile}
+
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(
+        json.dumps({"saved": saved, "hooks_dir": hooks_dir}), encoding="utf-8"
+    )
+
+    for key, value in profile.items():
+        _git(repo_path, "config", "--local", key, value)
+
+    print(f"[bulk] profile applied to {repo_path}")
+    return saved
+
+
+def restore_profile(repo_path: str) -> bool:
+    """
+    Put back the settings saved by apply_profile(). Returns False if
+    the repo was not in bulk mode.
+    """
+    state_path = _state_path(repo_path)
+    if not state_path.exists():
+        return False
+
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    for key, values in state["saved"].items():
+        _restore_key(repo_path, key, values)
+
+    if "core.fsmonitor" in state["saved"] and state["saved"]["core.fsmonitor"] != ["true"]:
+        # the profile turned the builtin daemon on; it outlives the run otherwise
+        _git(repo_path, "fsmonitor--daemon", "stop", check=False)
+
+    try:
+        os.rmdir(state["hooks_dir"])
+    except OSError:
+        pass
+
+    state_path.unlink()
+    print(f"[bulk] profile restored on {repo_path}")
+    return True
+
+
+def finalize(repo_path: str) -> float:
+    """
+    The one deferred maintenance pass: pack loose objects, write the
+    commit-graph. Returns seconds spent.
+    """
+    t0 = time.perf_counter()
+    _git(repo_path, "repack", "-d", "-q")
+    _git(repo_path, "prune-packed", "-q")
+    _git(repo_path, "commit-graph", "write", "--reachable", "--split")
+    elapsed = time.perf_counter() - t0
+    print(f"[bulk] finalize (repack + commit-graph) took {elapsed:.2f}s")
+    return elapsed
+
+
+@contextmanager
+def bulk_mode(repo_path: str, run_finalize: bool = True):
+    """
+    The profile is always restored; finalize() only runs when the body
+    succeeded, so it can neither mask the body's error nor pack a
+    half-done run.
+    """
+    apply_profile(repo_path)
+    try:
+        yield
+    finally:
+        restore_profile(repo_path)
+    if run_finalize:
+        finalize(repo_path)
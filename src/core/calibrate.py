@@ -0,0 +1,284 @@
+# src/core/calibrate.py
+# ---------------------
+# Monte Carlo calibration of day_decision parameters, fully in memory
+#
+#   python -m src.core.calibrate report --work 0.85 --multi 0.35 --sims 2000
+#   python -m src.core.calibrate search --target weekly_commits=6 \
+#       --target rest_ratio=0.2 --workers 8
+#
+# Simulates thousands of seeded years as NumPy arrays (sims x days) with
+# the same semantics as the git pipeline:
+#   decide_day_state / decide_commit_mode  -> random() < p
+#   MULTI_COMMIT_RANGE                     -> commits on a "multiple" day
+#   generate_actions                       -> 1..max_actions actions,
+#                                             ACTION_WEIGHTS, "add" only
+#                                             while the snapshot is empty
+# Only the snapshot size recursion loops over days (vectorized over sims).
+# Not modelled: validate_actions dropping duplicate targets in one commit.
+
+import itertools
+import multiprocessing
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.action_layout import ACTION_WEIGHTS
+from src.core.multidays_commit_pusher import MULTI_COMMIT_RANGE
+from src.core.rng_streams import RngStreams
+
+
+DAYS_PER_YEAR = 364          # whole weeks
+DEFAULT_SIMS = 2000
+STATS = (
+    "weekly_commits",
+    "commits_per_year",
+    "rest_ratio",
+    "max_streak",
+    "mean_streak",
+    "files_per_week",
+    "final_files",
+)
+
+
+@dataclass(frozen=True)
+class DayParams:
+    work_probability: float = 0.85
+    multi_commit_probability: float = 0.35
+    multi_range: Tuple[int, int] = MULTI_COMMIT_RANGE
+    max_actions: int = 3
+    start_files: int = 0
+
+
+class CalibrateError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Simulation
+# --------------------------------------------------
+
+def _streak_stats(work: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-sim max and mean length of consecutive work-day runs.
+    """
+    a = work.astype(np.int64)
+    c = np.cumsum(a, axis=1)
+    reset = np.maximum.accumulate(np.where(a == 0, c, 0), axis=1)
+    pos = c - reset                                   # position inside the run
+    ends = work & ~np.concatenate([work[:, 1:], np.zeros((work.shape[0], 1), bool)], axis=1)
+    runs = ends.sum(axis=1)
+    mean = np.divide(work.sum(axis=1), runs, out=np.zeros(work.shape[0]), where=runs > 0)
+    return pos.max(axis=1), mean
+
+
+def simulate(
+    params: DayParams,
+    sims: int = DEFAULT_SIMS,
+    days: int = DAYS_PER_YEAR,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    `sims` independent runs of `days` days; returns one array per stat.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    lo, hi = params.multi_range
+
+    work = rng.random((sims, days)) < params.work_probability
+    multi = rng.random((sims, days)) < params.multi_commit_probability
+    commits = np.where(multi, rng.integers(lo, hi + 1, size=(sims, days)), 1) * work
+
+    # actions per day: sum of U{1..max_actions} over that day's commits
+    flat = commits.ravel()
+    per_commit = rng.integers(1, params.max_actions + 1, size=int(flat.sum()))
+    owner = np.repeat(np.arange(flat.size), flat)
+    actions = np.bincount(owner, weights=per_commit, minlength=flat.size).astype(np.int64)
+    actions = actions.reshape(sims, days)
+
+    p = np.asarray(list(ACTION_WEIGHTS.values()))
+    mix = rng.multinomial(actions, p / p.sum())      # (sims, days, [add, edit, delete])
+    adds, deletes = mix[..., 0], mix[..., 2]
+
+    # snapshot size: empty snapshot -> every action is an add
+    size = np.full(sims, params.start_files, dtype=np.int64)
+    sizes = np.empty((sims, days), dtype=np.int64)
+    for d in range(days):
+        empty = size == 0
+        grow = np.where(empty, actions[:, d], adds[:, d])
+        drop = np.where(empty, 0, deletes[:, d])
+        size = np.maximum(size + grow - drop, 0)
+        sizes[:, d] = size
+
+    weeks = days // 7
+    weekly = commits[:, : weeks * 7].reshape(sims, weeks, 7).sum(axis=2)
+    max_streak, mean_streak = _streak_stats(work)
+
+    return {
+        "weekly_commits": weekly.mean(axis=1),
+        "commits_per_year": commits.sum(axis=1) * (365.0 / days),
+        "rest_ratio": 1.0 - work.mean(axis=1),
+        "max_streak": max_streak.astype(np.float64),
+        "mean_streak": mean_streak,
+        "files_per_week": (sizes[:, -1] - params.start_files) / max(weeks, 1),
+        "final_files": sizes[:, -1].astype(np.float64),
+    }
+
+
+def distribution(samples: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+    out = {}
+    for name, values in samples.items():
+        p5, p50, p95 = np.percentile(values, [5, 50, 95])
+        out[name] = {
+            "mean": round(float(values.mean()), 3),
+            "p5": round(float(p5), 3),
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+        }
+    return out
+
+
+# --------------------------------------------------
+# Grid search
+# --------------------------------------------------
+
+def _score(dist: Dict[str, Dict[str, float]], target: Dict[str, float]) -> float:
+    """
+    Sum of squared relative errors of the medians.
+    """
+    return float(sum(
+        ((dist[k]["p50"] - v) / (abs(v) or 1.0)) ** 2 for k, v in target.items()
+    ))
+
+
+def _grid_point(task) -> Dict:
+    params, target, sims, days, seed = task
+    rng = RngStreams(seed, "calibrate").numpy(
+        None, f"{params.work_probability:.6f}/{params.multi_commit_probability:.6f}"
+    )
+    dist = distribution(simulate(params, sims, days, rng))
+    return {"params": asdict(params), "score": _score(dist, target), "stats": dist}
+
+
+def grid_search(
+    target: Dict[str, float],
+    work_grid: Sequence[float],
+    multi_grid: Sequence[float],
+    *,
+    base: DayParams = DayParams(),
+    sims: int = DEFAULT_SIMS,
+    days: int = DAYS_PER_YEAR,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Evaluate every (work, multi) pair; results sorted best first.
+    Each grid point has its own seeded stream, so results do not depend
+    on `workers`.
+    """
+    unknown = set(target) - set(STATS)
+    if unknown:
+        raise CalibrateError(f"unknown target stats {sorted(unknown)}; known: {STATS}")
+
+    tasks = [
+        (
+            DayParams(
+                work_probability=w,
+                multi_commit_probability=m,
+                multi_range=base.multi_range,
+                max_actions=base.max_actions,
+                start_files=base.start_files,
+            ),
+            target, sims, days, seed,
+        )
+        for w, m in itertools.product(work_grid, multi_grid)
+    ]
+
+    if workers == 0:
+        results = list(map(_grid_point, tasks))
+    else:
+        with multiprocessing.Pool(processes=workers) as pool:
+            results = pool.map(_grid_point, tasks)
+
+    return sorted(results, key=lambda r: r["score"])
+
+
+def _frange(spec: str) -> List[float]:
+    """
+    "0.7:0.95:0.05" -> [0.7, 0.75, ..., 0.95];  "0.8,0.85" -> [0.8, 0.85]
+    """
+    if ":" in spec:
+        lo, hi, step = (float(x) for x in spec.split(":"))
+        return [round(v, 6) for v in np.arange(lo, hi + step / 2, step)]
+    return [float(x) for x in spec.split(",")]
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="day_decision Monte Carlo calibration")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--days", type=int, default=DAYS_PER_YEAR)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-files", type=int, default=0)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_report = sub.add_parser("report")
+    p_report.add_argument("--work", type=float, default=DayParams.work_probability)
+    p_report.add_argument("--multi", type=float, default=DayParams.multi_commit_probability)
+
+    p_search = sub.add_parser("search")
+    p_search.add_argument("--target", action="append", default=[], help="stat=value (repeatable)")
+    p_search.add_argument("--from-repo", default=None, help="take weekly_commits / rest_ratio from this repo's history")
+    p_search.add_argument("--grid-work", default="0.6:0.95:0.05")
+    p_search.add_argument("--grid-multi", default="0.05:0.6:0.05")
+    p_search.add_argument("--workers", type=int, default=None)
+    p_search.add_argument("--top", type=int, default=5)
+
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+
+    if args.cmd == "report":
+        params = DayParams(args.work, args.multi, start_files=args.start_files)
+        rng = RngStreams(args.seed, "calibrate").numpy(None, "report")
+        dist = distribution(simulate(params, args.sims, args.days, rng))
+        print(json.dumps({"params": asdict(params), "stats": dist}, indent=2))
+
+    else:
+        target = {}
+        if args.from_repo:
+            from src.core.history_stats import analyze, load_history
+
+            report = analyze(load_history(args.from_repo)[0])
+            target = {"weekly_commits": report["per_week"]["mean"], "rest_ratio": report["rest_ratio"]}
+        for item in args.target:
+            key, _, value = item.partition("=")
+            target[key] = float(value)
+        if not target:
+            parser.error("give at least one --target or --from-repo")
+
+        results = grid_search(
+            target,
+            _frange(args.grid_work),
+            _frange(args.grid_multi),
+            base=DayParams(start_files=args.start_files),
+            sims=args.sims,
+            days=args.days,
+            seed=args.seed,
+            workers=args.workers,
+        )
+        print(f"[calibrate] target {target}")
+        for r in results[: args.top]:
+            p = r["params"]
+            got = {k: r["stats"][k]["p50"] for k in target}
+            print(
+                f"  work={p['work_probability']:.3f} multi={p['multi_commit_probability']:.3f} "
+                f"score={r['score']:.4f} p50={got}"
+            )
+
+    print(f"[calibrate] {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,278 @@
+# src/core/heatmap_solver.py
+# --------------------------
+# Target contribution heatmap -> commits per day
+#
+#   target  : commits per day for a range (JSON {"YYYY-MM-DD": n} / CSV
+#             "date,count"), or a weekday profile x intensity
+#   solve() : smoothing -> rest-day constraints -> mass-preserving
+#             stochastic rounding, all vectorized over (repos, days)
+#   output  : integer counts, fed to run_days(counts=...) like the
+#             day_decision counts
+#
+#   python -m src.core.heatmap_solver --begin 2020-01-01 --end 2024-12-31 \
+#       --weekday 1,1,1,1,0.8,0.2,0.1 --intensity 2.5 --max-streak 9
+
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+MAX_PER_DAY = 12
+
+
+class HeatmapError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Targets
+# --------------------------------------------------
+
+def day_axis(begin: str, end: str) -> np.ndarray:
+    """
+    Inclusive datetime64[D] range.
+    """
+    first, last = np.datetime64(begin, "D"), np.datetime64(end, "D")
+    if last < first:
+        raise HeatmapError(f"end {end} is before begin {begin}")
+    return np.arange(first, last + 1, dtype="datetime64[D]")
+
+
+def weekday_index(days: np.ndarray) -> np.ndarray:
+    # 1970-01-01 was a Thursday -> Monday = 0
+    return (days.astype(np.int64) + 3) % 7
+
+
+def profile_target(
+    days: np.ndarray,
+    weekday_weights: Sequence[float],
+    intensity: float,
+) -> np.ndarray:
+    """
+    Expected commits per day = intensity * weekday weight (mon..sun).
+    """
+    weights = np.asarray(weekday_weights, dtype=np.float64)
+    if weights.shape != (7,) or (weights < 0).any():
+        raise HeatmapError(f"weekday profile needs 7 non-negative weights, got {weekday_weights}")
+    return intensity * weights[weekday_index(days)]
+
+
+def load_target_file(path: Path, days: np.ndarray) -> np.ndarray:
+    """
+    Per-day target from JSON {"YYYY-MM-DD": n} or CSV "date,count";
+    days missing from the file get 0.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            pairs = list(json.load(f).items())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            pairs = [(row[0], row[1]) for row in csv.reader(f) if row and row[0][:1].isdigit()]
+
+    if not pairs:
+        return np.zeros(days.size)
+
+    when = np.asarray([d for d, _ in pairs], dtype="datetime64[D]")
+    value = np.asarray([float(v) for _, v in pairs])
+
+    target = np.zeros(days.size)
+    idx = (when - days[0]).astype(np.int64)
+    keep = (idx >= 0) & (idx < days.size)
+    np.add.at(target, idx[keep], value[keep])
+    return target
+
+
+# --------------------------------------------------
+# Solver
+# --------------------------------------------------
+
+def _smooth(target: np.ndarray, window: int) -> np.ndarray:
+    if window <= 1:
+        return target
+    pad = window // 2
+    padded = np.pad(target, ((0, 0), (pad, window - 1 - pad)), mode="edge")
+    # moving average per row via cumulative sums
+    c = np.cumsum(padded, axis=1)
+    c = np.concatenate([np.zeros((c.shape[0], 1)), c], axis=1)
+    return (c[:, window:] - c[:, :-window]) / window
+
+
+def _cap_streaks(active: np.ndarray, max_streak: int) -> np.ndarray:
+    """
+    Force a rest day after every max_streak consecutive work days.
+    """
+    a = active.astype(np.int64)
+    c = np.cumsum(a, axis=1)
+    reset = np.maximum.accumulate(np.where(a == 0, c, 0), axis=1)
+    pos = c - reset                      # 1-based position inside the run
+    return active & (pos % (max_streak + 1) != 0)
+
+
+def _round_preserving(x: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """
+    Stochastic cumulative rounding: every prefix sum stays within 1 of
+    the real-valued prefix sum, totals match up to rounding.
+    """
+    c = np.floor(np.cumsum(x, axis=1) + u[:, None])
+    c = np.concatenate([np.zeros((c.shape[0], 1)), c], axis=1)
+    return np.diff(c, axis=1).astype(np.int64)
+
+
+def _spread_excess(t: np.ndarray, active: np.ndarray, cap: float) -> np.ndarray:
+    """
+    Clip rows at `cap` and hand the clipped mass to active days under the
+    cap, in proportion to their room (one pass: no day is pushed past it).
+    """
+    excess = np.clip(t - cap, 0.0, None).sum(axis=1, keepdims=True)
+    t = np.minimum(t, cap)
+    room = np.where(active, cap - t, 0.0)
+    free = room.sum(axis=1, keepdims=True)
+    share = np.divide(np.minimum(excess, free), free, out=np.zeros_like(free), where=free > 0)
+    return np.minimum(t + room * share, cap)
+
+
+def solve(
+    target: np.ndarray,
+    *,
+    smooth: int = 1,
+    min_rest_ratio: float = 0.0,
+    max_streak: Optional[int] = None,
+    max_per_day: int = MAX_PER_DAY,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Integer commits per day matching `target` ((days,) or (repos, days)).
+
+    1. smooth:          moving average over `smooth` days
+    2. rest days:       the lowest-target days become rest days until at
+                        least min_rest_ratio of the range rests; at most
+                        max_streak work days in a row
+    3. mass kept:       work days are rescaled to the original total
+    4. cap:             mass above max_per_day is spread over work days
+                        still under the cap (in proportion to their room);
+                        only a total above work days x max_per_day is cut
+    5. rounding:        stochastic cumulative rounding (prefix sums exact
+                        to +-1); each day rounds to the floor or ceiling of
+                        its value, so the cap holds, rest days stay 0 and
+                        low-target days round to 0 some of the time
+    """
+    target = np.asarray(target, dtype=np.float64)
+    squeeze = target.ndim == 1
+    t = np.atleast_2d(target).copy()
+    if (t < 0).any():
+        raise HeatmapError("target must be non-negative")
+    if not 0.0 <= min_rest_ratio < 1.0:
+        raise HeatmapError("min_rest_ratio must be in [0, 1)")
+
+    rng = rng if rng is not None else np.random.default_rng()
+    total = t.sum(axis=1, keepdims=True)
+
+    t = _smooth(t, smooth)
+
+    # 2. rest days
+    active = t > 0
+    if min_rest_ratio > 0:
+        n_rest = int(np.ceil(min_rest_ratio * t.shape[1]))
+        order = np.argsort(t + rng.random(t.shape) * 1e-9, axis=1, kind="stable")
+        rest = np.zeros_like(active)
+        np.put_along_axis(rest, order[:, :n_rest], True, axis=1)
+        active &= ~rest
+    if max_streak:
+        active = _cap_streaks(active, max_streak)
+
+    # 3. rescale work days to the requested total
+    t = np.where(active, t, 0.0)
+    mass = t.sum(axis=1, keepdims=True)
+    t = np.divide(t * total, mass, out=np.zeros_like(t), where=mass > 0)
+
+    # 4. cap without losing mass
+    t = _spread_excess(t, active, max_per_day)
+
+    # 5. round; rounding only ever removes work days, so the rest
+    #    constraints above still hold
+    counts = _round_preserving(t, rng.random(t.shape[0]))
+    counts = np.minimum(counts, max_per_day)     # float guard only
+
+    return counts[0] if squeeze else counts
+
+
+def summarize(target: np.ndarray, counts: np.ndarray) -> Dict[str, float]:
+    target = np.atleast_2d(target)
+    counts = np.atleast_2d(counts)
+    return {
+        "target_total": round(float(target.sum()), 2),
+        "planned_total": int(counts.sum()),
+        "rest_ratio": round(float((counts == 0).mean()), 4),
+        "max_per_day": int(counts.max()) if counts.size else 0,
+        "mae_per_day": round(float(np.abs(counts - target).mean()), 4),
+    }
+
+
+def to_run_days(days: np.ndarray, counts: np.ndarray) -> Tuple[str, str, list]:
+    """
+    (begin, end, counts) for multidays_commit_pusher.run_days(counts=...).
+    """
+    return str(days[0]), str(days[-1]), [int(c) for c in counts]
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="heatmap target -> commits per day")
+    parser.add_argument("--begin", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--target", type=Path, default=None, help="JSON/CSV per-day target")
+    parser.add_argument("--weekday", default="1,1,1,1,1,0.3,0.2", help="mon..sun weights")
+    parser.add_argument("--intensity", type=float, default=1.5, help="commits on a weight-1 day")
+    parser.add_argument("--smooth", type=int, default=1)
+    parser.add_argument("--min-rest", type=float, default=0.0)
+    parser.add_argument("--max-streak", type=int, default=None)
+    parser.add_argument("--max-per-day", type=int, default=MAX_PER_DAY)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--run", choices=["dry_run", "soft_run", "full_run"], default=None,
+                        help="execute the solved counts with run_days on the current repo")
+    args = parser.parse_args()
+
+    days = day_axis(args.begin, args.end)
+    if args.target:
+        target = load_target_file(args.target, days)
+    else:
+        target = profile_target(days, [float(w) for w in args.weekday.split(",")], args.intensity)
+
+    t0 = time.perf_counter()
+    counts = solve(
+        target,
+        smooth=args.smooth,
+        min_rest_ratio=args.min_rest,
+        max_streak=args.max_streak,
+        max_per_day=args.max_per_day,
+        rng=np.random.default_rng(args.seed),
+    )
+    print(f"[heatmap] solved {days.size} days in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(f"[heatmap] {summarize(target, counts)}")
+
+    if args.run:
+        from src.core.multidays_commit_pusher import run_days
+        from src.core.time_set import load_time_injection
+
+        begin, end, day_counts = to_run_days(days, counts)
+        summary = run_days(
+            repo_path=".",
+            begin=begin,
+            end=end,
+            snap_dir=Path("src/res"),
+            run_mode=args.run,
+            time_injection=load_time_injection(Path("src/res/repo_config.json")),
+            counts=day_counts,
+            seed=args.seed,
+        )
+        print(f"[heatmap] executed {summary['commits']} commits")
@@ -0,0 +1,331 @@
+# src/core/history_stats.py
+# -------------------------
+# Commit-history analytics for execution repos
+#
+#   python -m src.core.history_stats --repo <path> [--json]
+#
+# One streamed `git log -z --format=%H%x00%at%x00%an%x00%s` pass fills
+# NumPy arrays; everything else is vectorized:
+#   - commits per day / ISO week / weekday / local hour
+#   - streaks, gaps, rest-day ratio, multi-commit-day ratio
+#   - duplicate-message rate, action mix (subjects mapped back to the
+#     message library categories)
+#   - the day_decision parameters that would reproduce the history
+#
+# Parsed history is cached per HEAD in <git-dir>/gitcom/history_cache.npz;
+# after a new run only `<cached head>..HEAD` is read.
+
+import json
+import subprocess
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.msg_lib import MSGS_PATH
+from src.core.time_set import TimeInjection
+
+
+CACHE_FILENAME = "history_cache.npz"
+LOG_FORMAT = "%H%x00%at%x00%an%x00%s"
+
+_DAY = 86400
+_FIELDS = 4
+
+
+class HistoryStatsError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# git
+# --------------------------------------------------
+
+def _git_out(repo_path: str, *args: str) -> Optional[str]:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _iter_log_fields(repo_path: str, rev_range: str, chunk_size: int = 1 << 16) -> Iterator[List[str]]:
+    """
+    Yield [sha, epoch, author, subject] per commit; -z plus %x00 makes
+    the whole output one flat NUL-separated field stream.
+    """
+    proc = subprocess.Popen(
+        ["git", "log", "-z", f"--format={LOG_FORMAT}", rev_range],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    fields: List[str] = []
+    buf = b""
+    while True:
+        chunk = proc.stdout.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        *parts, buf = buf.split(b"\0")
+        for part in parts:
+            fields.append(part.decode("utf-8", errors="replace"))
+            if len(fields) == _FIELDS:
+                yield fields
+                fields = []
+    if buf:
+        fields.append(buf.decode("utf-8", errors="replace"))
+        if len(fields) == _FIELDS:
+            yield fields
+
+    if proc.wait() != 0:
+        raise HistoryStatsError(
+            f"[stats] git log {rev_range} failed: {proc.stderr.read().decode(errors='replace')}"
+        )
+
+
+# --------------------------------------------------
+# Parsed history (+ cache)
+# --------------------------------------------------
+
+class History:
+    """
+    Column arrays for every commit reachable from HEAD.
+    """
+
+    def __init__(self):
+        self.head: Optional[str] = None
+        self.ts = np.empty(0, dtype=np.int64)
+        self.author = np.empty(0, dtype=np.int32)
+        self.authors: List[str] = []
+        self.subjects = np.empty(0, dtype=str)
+
+    def __len__(self) -> int:
+        return int(self.ts.size)
+
+    def extend(self, repo_path: str, rev_range: str) -> int:
+        ts: List[int] = []
+        author: List[int] = []
+        subjects: List[str] = []
+        ids = {name: i for i, name in enumerate(self.authors)}
+
+        for _sha, at, an, subject in _iter_log_fields(repo_path, rev_range):
+            ts.append(int(at))
+            author.append(ids.setdefault(an, len(ids)))
+            subjects.append(subject)
+
+        self.authors = sorted(ids, key=ids.get)
+        self.ts = np.concatenate([self.ts, np.asarray(ts, dtype=np.int64)])
+        self.author = np.concatenate([self.author, np.asarray(author, dtype=np.int32)])
+        self.subjects = np.concatenate([self.subjects, np.asarray(subjects, dtype=str)])
+        return len(ts)
+
+    # -------- cache --------
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            head=np.asarray(self.head or ""),
+            ts=self.ts,
+            author=self.author,
+            authors=np.asarray(self.authors, dtype=str),
+            subjects=self.subjects,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load_cache(cls, path: Path) -> "History":
+        hist = cls()
+        if not path.exists():
+            return hist
+        with np.load(path, allow_pickle=False) as data:
+            hist.head = str(data["head"]) or None
+            hist.ts = data["ts"]
+            hist.author = data["author"]
+            hist.authors = [str(a) for a in data["authors"]]
+            hist.subjects = data["subjects"]
+        return hist
+
+
+def load_history(repo_path: str, use_cache: bool = True) -> Tuple[History, int]:
+    """
+    History at HEAD; returns (history, commits parsed in this call).
+    """
+    head = _git_out(repo_path, "rev-parse", "--verify", "--quiet", "HEAD")
+    if head is None:
+        return History(), 0
+
+    git_dir = _git_out(repo_path, "rev-parse", "--absolute-git-dir")
+    cache_path = Path(git_dir) / "gitcom" / CACHE_FILENAME
+
+    hist = History.load_cache(cache_path) if use_cache else History()
+    if hist.head == head:
+        return hist, 0
+
+    if hist.head and _git_out(repo_path, "merge-base", "--is-ancestor", hist.head, head) is not None:
+        parsed = hist.extend(repo_path, f"{hist.head}..{head}")
+    else:
+        hist = History()  # first run, or history was rewritten
+        parsed = hist.extend(repo_path, head)
+
+    hist.head = head
+    if use_cache:
+        hist.save(cache_path)
+    return hist, parsed
+
+
+# --------------------------------------------------
+# Statistics
+# --------------------------------------------------
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """
+    Lengths of the runs of True in a boolean array.
+    """
+    padded = np.concatenate([[False], mask, [False]]).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return edges[1::2] - edges[0::2]
+
+
+def _describe(values: np.ndarray) -> Dict[str, float]:
+    if values.size == 0:
+        return {"mean": 0.0, "median": 0.0, "max": 0}
+    return {
+        "mean": round(float(values.mean()), 3),
+        "median": float(np.median(values)),
+        "max": int(values.max()),
+    }
+
+
+def _action_lookup(msgs_path: Path) -> Dict[str, str]:
+    if not msgs_path.exists():
+        return {}
+    with open(msgs_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {msg: kind for kind, msgs in data.items() for msg in msgs}
+
+
+def analyze(
+    hist: History,
+    tz_offset: str = "+0000",
+    author: Optional[str] = None,
+    msgs_path: Path = MSGS_PATH,
+    top: int = 5,
+) -> Dict[str, Any]:
+    ts, subjects = hist.ts, hist.subjects
+    if author is not None:
+        if author not in hist.authors:
+            raise HistoryStatsError(f"[stats] no commits by {author!r}")
+        keep = hist.author == hist.authors.index(author)
+        ts, subjects = ts[keep], subjects[keep]
+
+    if ts.size == 0:
+        return {"commits": 0}
+
+    local = ts + TimeInjection(timezone=tz_offset).offset_seconds
+    day = local // _DAY
+    first, last = int(day.min()), int(day.max())
+
+    per_day = np.bincount(day - first, minlength=last - first + 1)
+    active = per_day > 0
+    active_counts = per_day[active]
+
+    # ISO weeks start on Monday; day 0 (1970-01-01) was a Thursday
+    week = (day + 3) // 7
+    per_week = np.bincount(week - week.min())
+    weekday = np.bincount((day + 3) % 7, minlength=7)
+    hour = np.bincount((local % _DAY) // 3600, minlength=24)
+
+    streaks = _runs(active)
+    gaps = _runs(~active)
+
+    unique, counts = np.unique(subjects, return_counts=True)
+    dup_order = np.argsort(-counts)[:top]
+
+    lookup = _action_lookup(msgs_path)
+    mix = Counter()
+    for s, c in zip(unique.tolist(), counts.tolist()):
+        mix[lookup.get(s, "other")] += c
+
+    n_days = per_day.size
+    work_ratio = float(active.sum()) / n_days
+    multi_ratio = float((active_counts > 1).mean())
+
+    return {
+        "commits": int(ts.size),
+        "first_day": str(np.datetime64(first, "D")),
+        "last_day": str(np.datetime64(last, "D")),
+        "days": n_days,
+        "active_days": int(active.sum()),
+        "rest_ratio": round(1.0 - work_ratio, 4),
+        "per_active_day": _describe(active_counts),
+        "per_day_histogram": np.bincount(active_counts).tolist(),
+        "per_week": _describe(per_week),
+        "weekday": dict(zip(["mon", "tue", "wed", "thu", "fri", "sat", "sun"], weekday.tolist())),
+        "hour": hour.tolist(),
+        "streaks": {**_describe(streaks), "count": int(streaks.size)},
+        "gaps": {**_describe(gaps), "count": int(gaps.size)},
+        "duplicate_rate": round(1.0 - unique.size / ts.size, 4),
+        "top_duplicates": [
+            [str(unique[i]), int(counts[i])] for i in dup_order if counts[i] > 1
+        ],
+        "action_mix": dict(mix.most_common()),
+        "day_decision_fit": {
+            "work_probability": round(work_ratio, 4),
+            "multi_commit_probability": round(multi_ratio, 4),
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    if not report.get("commits"):
+        print("[stats] no commits")
+        return
+
+    r = report
+    print(f"[stats] {r['commits']} commits, {r['first_day']} .. {r['last_day']}")
+    print(f"  active days   {r['active_days']}/{r['days']}  (rest ratio {r['rest_ratio']:.1%})")
+    print(f"  per day       {r['per_active_day']}")
+    print(f"  per week      {r['per_week']}")
+    print(f"  streaks       {r['streaks']}")
+    print(f"  gaps          {r['gaps']}")
+    print(f"  weekday       {r['weekday']}")
+    print(f"  hour          {r['hour']}")
+    print(f"  duplicates    {r['duplicate_rate']:.1%}  {r['top_duplicates']}")
+    print(f"  action mix    {r['action_mix']}")
+    print(f"  day_decision  {r['day_decision_fit']}")
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.core.time_set import load_time_injection
+
+    parser = argparse.ArgumentParser(description="execution repo history analytics")
+    parser.add_argument("--repo", default=".")
+    parser.add_argument("--author", default=None)
+    parser.add_argument("--tz", default=None, help="bucket by this offset (default: time_injection)")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    tz = args.tz or load_time_injection(Path("src/res/repo_config.json")).timezone
+    hist, parsed = load_history(args.repo, use_cache=not args.no_cache)
+    report = analyze(hist, tz_offset=tz, author=args.author)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"[stats] parsed {parsed} new commits (cached head {hist.head})")
+        print_report(report)
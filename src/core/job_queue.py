@@ -0,0 +1,572 @@
+# src/core/job_queue.py
+# ---------------------
+# Persistent job queue + scheduler for many repos x date ranges
+#
+#   python -m src.core.job_queue add --repo gitcom-test --begin 2022-01-01 --end 2022-12-31
+#   python -m src.core.job_queue run --workers 8 --git-slots 4 --push-slots 2
+#   python -m src.core.job_queue list --status failed
+#
+# - SQLite-backed (WAL), safe for several worker processes
+# - priorities, never two running jobs on the same repo
+# - global limits on concurrent git work and concurrent pushes
+# - failed / partial jobs are retried with backoff; partial jobs resume
+#   after the last completed day, or after the day of the last landed
+#   commit if that is later (a day is never committed twice). Whether a
+#   job resumes is keyed on its own record (done_through, landed), so a
+#   manual retry that resets the attempt budget resumes the same way
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+DB_ENV = "GITCOM_JOB_DB"
+DEFAULT_DB = SRC_DIR / "res" / "gitcom_jobs.sqlite"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_PARTIAL = "partial"
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 30.0   # seconds, doubled per attempt
+POLL_INTERVAL = 1.0
+STALE_LEASE = 6 * 3600.0   # running jobs of workers on other hosts
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    repo         TEXT NOT NULL,
+    begin        TEXT NOT NULL,
+    end          TEXT NOT NULL,
+    engine       TEXT NOT NULL DEFAULT 'multidays',
+    run_mode     TEXT NOT NULL DEFAULT 'soft_run',
+    priority     INTEGER NOT NULL DEFAULT 0,
+    status       TEXT NOT NULL DEFAULT 'queued',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    done_through TEXT,
+    landed       INTEGER NOT NULL DEFAULT 0,
+    not_before   REAL NOT NULL DEFAULT 0,
+    worker       TEXT,
+    last_error   TEXT,
+    result       TEXT,
+    created_at   REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS jobs_repo ON jobs (repo, status);
+"""
+
+
+class JobQueueError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: int
+    repo: str
+    begin: str
+    end: str
+    engine: str
+    run_mode: str
+    priority: int
+    status: str
+    attempts: int
+    max_attempts: int
+    done_through: Optional[str]
+    landed: int = 0              # an earlier attempt may have left commits
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(**{k: row[k] for k in cls.__dataclass_fields__})
+
+    @property
+    def resumed(self) -> bool:
+        """
+        An earlier attempt finished days or may have landed commits.
+        """
+        return bool(self.done_through or self.landed)
+
+    @property
+    def resume_begin(self) -> str:
+        """
+        First day still to run (after a partial attempt).
+        """
+        if not self.done_through:
+            return self.begin
+        nxt = datetime.strptime(self.done_through, "%Y-%m-%d") + timedelta(days=1)
+        return nxt.strftime("%Y-%m-%d")
+
+
+# --------------------------------------------------
+# Queue
+# --------------------------------------------------
+
+class JobQueue:
+    def __init__(self, db_path: Path = None):
+        self.db_path = Path(db_path or os.environ.get(DB_ENV) or DEFAULT_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "landed" not in columns:  # queue created before the column existed
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN landed INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        self._conn.close()
+
+    # -------- producer side --------
+
+    def add(
+        self,
+        *,
+        repo: str,
+        begin: str,
+        end: str,
+        engine: str = "multidays",
+        run_mode: str = "soft_run",
+        priority: int = 0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> int:
+        cur = self._conn.execute(
+            "INSERT INTO jobs (repo, begin, end, engine, run_mode, priority, max_attempts, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (repo, begin, end, engine, run_mode, priority, max_attempts, time.time()),
+        )
+        return cur.lastrowid
+
+    def add_many(self, jobs: List[Dict[str, Any]]) -> int:
+        """
+        Bulk insert in one transaction (thousands of jobs at once).
+        """
+        now = time.time()
+        rows = [
+            (
+                j["repo"], j["begin"], j["end"],
+                j.get("engine", "multidays"), j.get("run_mode", "soft_run"),
+                j.get("priority", 0), j.get("max_attempts", DEFAULT_MAX_ATTEMPTS),
+                now,
+            )
+            for j in jobs
+        ]
+        with self._tx():
+            self._conn.executemany(
+                "INSERT INTO jobs (repo, begin, end, engine, run_mode, priority, max_attempts, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def list(self, status: Optional[str] = None) -> List[sqlite3.Row]:
+        if status:
+            return self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)
+            ).fetchall()
+        return self._conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: n for status, n in rows}
+
+    def retry(self, job_id: int) -> None:
+        """
+        Manually requeue a failed / partial job (resets its attempt budget;
+        done_through and landed are kept, so it still resumes).
+        """
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, attempts = 0, not_before = 0"
+            " WHERE id = ? AND status IN (?, ?)",
+            (STATUS_QUEUED, job_id, STATUS_FAILED, STATUS_PARTIAL),
+        )
+
+    # -------- worker side --------
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """
+        Atomically take the best runnable job whose repo is idle.
+        """
+        now = time.time()
+        with self._tx():
+            row = self._conn.execute(
+                "SELECT * FROM jobs j"
+                " WHERE j.status = ? AND j.not_before <= ?"
+                "   AND NOT EXISTS (SELECT 1 FROM jobs r WHERE r.repo = j.repo AND r.status = ?)"
+                " ORDER BY j.priority DESC, j.id LIMIT 1",
+                (STATUS_QUEUED, now, STATUS_RUNNING),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                (STATUS_RUNNING, worker, now, row["id"]),
+            )
+
+        job = Job.from_row(row)
+        job.attempts += 1
+        job.status = STATUS_RUNNING
+        return job
+
+    def mark_progress(self, job_id: int, day: str) -> None:
+        self._conn.execute("UPDATE jobs SET done_through = ? WHERE id = ?", (day, job_id))
+
+    def complete(self, job_id: int, result: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, finished_at = ?, last_error = NULL WHERE id = ?",
+            (STATUS_DONE, json.dumps(result), time.time(), job_id),
+        )
+
+    def fail(self, job: Job, error: str, partial: bool) -> None:
+        """
+        Record a failure; requeue with backoff while attempts remain.
+        """
+        final = STATUS_PARTIAL if partial else STATUS_FAILED
+        landed = int(bool(job.landed or partial))
+
+        if job.attempts < job.max_attempts:
+            delay = RETRY_BACKOFF * (2 ** (job.attempts - 1))
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, not_before = ?, landed = ? WHERE id = ?",
+                (STATUS_QUEUED, error, time.time() + delay, landed, job.id),
+            )
+        else:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, finished_at = ?, landed = ? WHERE id = ?",
+                (final, error, time.time(), landed, job.id),
+            )
+
+    def requeue_stale(self, lease: float = STALE_LEASE) -> int:
+        """
+        Jobs left 'running' by a crashed worker go back to the queue.
+
+        A job counts as stale when its worker process on this host is
+        gone, or (worker on another host) it started more than `lease`
+        seconds ago. Jobs of live workers are left alone. A crashed worker
+        may have committed part of a day, so requeued jobs are marked landed.
+        """
+        host = os.uname().nodename
+        cutoff = time.time() - lease
+        stale = []
+
+        with self._tx():
+            rows = self._conn.execute(
+                "SELECT id, worker, started_at FROM jobs WHERE status = ?", (STATUS_RUNNING,)
+            ).fetchall()
+            for row in rows:
+                node, _, pid = (row["worker"] or "").rpartition(":")
+                if node == host and pid.isdigit():
+                    if not _pid_alive(int(pid)):
+                        stale.append(row["id"])
+                elif (row["started_at"] or 0) < cutoff:
+                    stale.append(row["id"])
+
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, landed = 1 WHERE id = ? AND status = ?",
+                [(STATUS_QUEUED, job_id, STATUS_RUNNING) for job_id in stale],
+            )
+        return len(stale)
+
+    def _tx(self):
+        return _ImmediateTx(self._conn)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _ImmediateTx:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+# --------------------------------------------------
+# Engines
+# --------------------------------------------------
+
+Engine = Callable[[Job, str, Callable[[Dict[str, Any]], None]], Dict[str, Any]]
+
+
+def _landed_day(repo_path: str) -> Optional[str]:
+    """
+    Author day (in its own timezone) of HEAD, i.e. of the last commit.
+    """
+    import subprocess
+
+    result = subprocess.run(
+        ["git", "log", "-1", "--format=%ad", "--date=short"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None  # no commits yet
+    return result.stdout.strip() or None
+
+
+def resume_begin(job: Job, repo_path: str) -> str:
+    """
+    First day a (re)attempt runs. done_through only moves when a day is
+    finished; a failure in the middle of a day leaves some of its commits
+    in HEAD. Days run in order, so HEAD's day is the last day with landed
+    commits: start after it rather than commit that day a second time
+    (the rest of its planned commits are dropped).
+    """
+    begin = job.resume_begin
+    if not job.resumed:
+        return begin
+
+    landed = _landed_day(repo_path)
+    if landed and begin <= landed <= job.end:
+        nxt = datetime.strptime(landed, "%Y-%m-%d") + timedelta(days=1)
+        begin = nxt.strftime("%Y-%m-%d")
+    return begin
+
+
+def _multidays_engine(job: Job, repo_path: str, progress) -> Dict[str, Any]:
+    """
+    Multi-day pipeline; run_mode full_run is split so the push itself
+    happens under the scheduler's push slot (see _run_one).
+    """
+    from src.core import multidays_commit_pusher
+    from src.core.repo_truth import load_head_structure
+    from src.core.sim_daemon import CONFIG_PATH, default_snap_dir
+    from src.core.time_set import load_time_injection
+
+    begin = resume_begin(job, repo_path)
+    if begin > job.end:
+        return {"days": 0, "work_days": 0, "commits": 0, "run_mode": job.run_mode}
+
+    snap_dir = default_snap_dir(repo_path)
+    last_snap = None
+    if job.resumed:
+        # earlier attempt may have committed without persisting the snapshot
+        last_snap = load_head_structure(repo_path)
+
+    summary = multidays_commit_pusher.run_days(
+        repo_path=repo_path,
+        begin=begin,
+        end=job.end,
+        snap_dir=snap_dir,
+        run_mode="dry_run" if job.run_mode == "dry_run" else "soft_run",
+        time_injection=load_time_injection(CONFIG_PATH),
+        last_snap=last_snap,
+        progress=progress,
+    )
+    summary.pop("snap", None)
+    return summary
+
+
+def _multidays_bulk_engine(job: Job, repo_path: str, progress) -> Dict[str, Any]:
+    from src.core.bulk_mode import bulk_mode, restore_profile
+
+    restore_profile(repo_path)  # left over from a crashed attempt
+    with bulk_mode(repo_path):
+        return _multidays_engine(job, repo_path, progress)
+
+
+ENGINES: Dict[str, Engine] = {
+    "multidays": _multidays_engine,
+    "multidays-bulk": _multidays_bulk_engine,
+}
+
+
+def register_engine(name: str, engine: Engine) -> None:
+    ENGINES[name] = engine
+
+
+# --------------------------------------------------
+# Scheduler
+# --------------------------------------------------
+
+def _head(repo_path: str) -> Optional[str]:
+    from src.core.run_journal import current_head
+    return current_head(repo_path)
+
+
+def _run_one(queue: JobQueue, job: Job, git_slots, push_slots) -> None:
+    from src.core.sim_daemon import resolve_repo
+
+    try:
+        repo_path = resolve_repo(job.repo)
+    except (KeyError, FileNotFoundError) as e:
+        queue.fail(job, f"{type(e).__name__}: {e}", partial=False)
+        return
+
+    head_before = _head(repo_path)
+
+    def progress(event: Dict[str, Any]):
+        if event.get("event") == "day":
+            queue.mark_progress(job.id, event["day"])
+
+    try:
+        engine = ENGINES[job.engine]
+    except KeyError:
+        queue.fail(job, f"unknown engine {job.engine!r}", partial=False)
+        return
+
+    try:
+        with git_slots:
+            result = engine(job, repo_path, progress)
+
+        if job.run_mode == "full_run" and result.get("commits"):
+            from src.core.final_pusher import push_gitcom_repo
+            with push_slots:
+                push_gitcom_repo(repo_path=repo_path)
+
+        queue.complete(job.id, result)
+        print(f"[jobs] #{job.id} done: {result}")
+
+    except Exception as e:
+        partial = _head(repo_path) != head_before
+        queue.fail(job, f"{type(e).__name__}: {e}\n{traceback.format_exc()}", partial)
+        print(f"[jobs] #{job.id} {'partial' if partial else 'failed'}: {e}")
+
+
+def _worker_loop(db_path, git_slots, push_slots, exit_when_idle: bool) -> None:
+    queue = JobQueue(db_path)
+    worker = f"{os.uname().nodename}:{os.getpid()}"
+
+    try:
+        while True:
+            job = queue.claim(worker)
+            if job is None:
+                counts = queue.counts()
+                if exit_when_idle and not counts.get(STATUS_RUNNING) \
+                        and not counts.get(STATUS_QUEUED):
+                    return
+                time.sleep(POLL_INTERVAL)
+                continue
+            _run_one(queue, job, git_slots, push_slots)
+    finally:
+        queue.close()
+
+
+def run_scheduler(
+    db_path: Path = None,
+    *,
+    workers: int = os.cpu_count() or 4,
+    git_slots: int = 4,
+    push_slots: int = 2,
+    exit_when_idle: bool = True,
+) -> Dict[str, int]:
+    """
+    Start `workers` processes pulling from the queue; returns final
+    status counts once the queue is drained (exit_when_idle=True).
+    """
+    queue = JobQueue(db_path)
+    stale = queue.requeue_stale()
+    if stale:
+        print(f"[jobs] requeued {stale} stale running jobs")
+    queue.close()
+
+    git_sem = multiprocessing.BoundedSemaphore(git_slots)
+    push_sem = multiprocessing.BoundedSemaphore(push_slots)
+
+    procs = [
+        multiprocessing.Process(
+            target=_worker_loop,
+            args=(db_path, git_sem, push_sem, exit_when_idle),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    queue = JobQueue(db_path)
+    counts = queue.counts()
+    queue.close()
+    return counts
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="gitcom job queue")
+    parser.add_argument("--db", default=None)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_add = sub.add_parser("add")
+    p_add.add_argument("--repo", required=True)
+    p_add.add_argument("--begin", required=True)
+    p_add.add_argument("--end", required=True)
+    p_add.add_argument("--engine", default="multidays")
+    p_add.add_argument("--mode", default="soft_run", choices=["dry_run", "soft_run", "full_run"])
+    p_add.add_argument("--priority", type=int, default=0)
+
+    p_run = sub.add_parser("run")
+    p_run.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    p_run.add_argument("--git-slots", type=int, default=4)
+    p_run.add_argument("--push-slots", type=int, default=2)
+    p_run.add_argument("--forever", action="store_true", help="keep polling when idle")
+
+    p_list = sub.add_parser("list")
+    p_list.add_argument("--status", default=None)
+
+    p_retry = sub.add_parser("retry")
+    p_retry.add_argument("id", type=int)
+
+    args = parser.parse_args()
+
+    if args.cmd == "run":
+        print(run_scheduler(
+            args.db,
+            workers=args.workers,
+            git_slots=args.git_slots,
+            push_slots=args.push_slots,
+            exit_when_idle=not args.forever,
+        ))
+    else:
+        q = JobQueue(args.db)
+        if args.cmd == "add":
+            job_id = q.add(
+                repo=args.repo, begin=args.begin, end=args.end,
+                engine=args.engine, run_mode=args.mode, priority=args.priority,
+            )
+            print(f"[jobs] queued #{job_id}")
+        elif args.cmd == "list":
+            for row in q.list(args.status):
+                print(
+                    f"#{row['id']:<6} {row['status']:<8} p={row['priority']:<3} "
+                    f"{row['repo']} {row['begin']}..{row['end']} "
+                    f"[{row['engine']}/{row['run_mode']}] attempts={row['attempts']}"
+                )
+        elif args.cmd == "retry":
+            q.retry(args.id)
+        q.close()
@@ -14,18 +14,26 @@ class MsgSelector:
     It only decides how a human might casually describe it.
     """
 
-    def __init__(self, lexicon: Dict):
+    MAX_ATTEMPTS = 8
+
+    def __init__(self, lexicon: Dict, rng=None, seen=None):
         """
         lexicon: loaded from msg_lexicon.json
+        rng:     random.Random-like stream (module random by default)
+        seen:    optional history message index (msg_index.MsgIndex);
+                 messages already in the repo history are re-drawn
         """
         self.lexicon = lexicon
+        self.rng = rng or random
+        self.seen = seen
 
     # -------- public API --------
 
     def generate(
         self,
         action: Dict,
-        timeline_ctx: Dict
+        timeline_ctx: Dict,
+        rng=None,
     ) -> str:
         """
         Main entry point.
@@ -42,7 +50,13 @@ class MsgSelector:
             "tempo": "steady",
             "self_assessment": "early but promising"
         }
+
+        rng (optional): per-call stream, overrides the selector's own
+
+        With `seen` set, up to MAX_ATTEMPTS drafts are tried and the first
+        one not in the history wins (the last draft otherwise).
         """
+        rng = rng or self.rng
 
         action_type = action.get("action_type")
         target = self._simplify_target(action.get("target", ""))
@@ -50,22 +64,32 @@ class MsgSelector:
         # Step 1: select lexical mood
         mood = self._select_mood(timeline_ctx)
 
+        msg = self._draft(action_type, mood, target, rng)
+        if self.seen is not None:
+            for _ in range(self.MAX_ATTEMPTS - 1):
+                if msg not in self.seen:
+                    break
+                msg = self._draft(action_type, mood, target, rng)
+
+        return msg
+
+    # -------- internal mechanics --------
+
+    def _draft(self, action_type: str, mood: str, target: str, rng) -> str:
         # Step 2: pick verb phrase
-        verb = self._pick_verb(action_type, mood)
+        verb = self._pick_verb(action_type, mood, rng)
 
         # Step 3: optional qualifier
-        qualifier = self._pick_qualifier(mood)
+        qualifier = self._pick_qualifier(mood, rng)
 
         # Step 4: optional filler
-        filler = self._pick_filler(mood)
+        filler = self._pick_filler(mood, rng)
 
         # Step 5: assemble message
         msg = self._assemble(verb, qualifier, target, filler)
 
         return msg.strip()
 
-    # -------- internal mechanics --------
-
     def _select_mood(self, timeline_ctx: Dict) -> str:
         """
         Decide linguistic mood based on research phase and tempo.
@@ -84,20 +108,20 @@ class MsgSelector:
 
         return "neutral"
 
-    def _pick_verb(self, action_type: str, mood: str) -> str:
+    def _pick_verb(self, action_type: str, mood: str, rng=random) -> str:
         verbs = self.lexicon["verbs"].get(action_type, [])
         if not verbs:
             return action_type
 
-        return random.choice(verbs)
+        return rng.choice(verbs)
 
-    def _pick_qualifier(self, mood: str) -> str:
+    def _pick_qualifier(self, mood: str, rng=random) -> str:
         pool = self.lexicon.get("qualifiers", {}).get(mood, [])
-        return random.choice(pool) if pool and random.random() < 0.6 else ""
+        return rng.choice(pool) if pool and rng.random() < 0.6 else ""
 
-    def _pick_filler(self, mood: str) -> str:
+    def _pick_filler(self, mood: str, rng=random) -> str:
         fillers = self.lexicon.get("fillers", [])
-        return random.choice(fillers) if fillers and random.random() < 0.3 else ""
+        return rng.choice(fillers) if fillers and rng.random() < 0.3 else ""
 
     def _assemble(self, verb: str, qualifier: str, target: str, filler: str) -> str:
         parts = [verb]
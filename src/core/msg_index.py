@@ -0,0 +1,352 @@
+# src/core/msg_index.py
+# ---------------------
+# History-wide commit message index (dedup across runs)
+#
+#   index = MsgIndex(repo_path).load()      # one `git log --format=%s` pass
+#   "add notes" in index                    # O(1) Bloom check
+#   index.add("add notes")                  # after the commit is created
+#   index.save()
+#
+# Two layers, both keyed by a 64-bit blake2b hash of the subject line:
+#   - Bloom filter (~10 bits per message, k=7, ~1% false positives),
+#     kept in memory; a miss is final
+#   - exact sorted hash array on disk, memory-mapped, consulted only on a
+#     Bloom hit (binary search), so false positives never reject a message
+#
+# Stored in <git-dir>/gitcom/ (msg_index.json, msg_bloom.npy,
+# msg_hashes.npy) and kept incrementally: only `<indexed head>..HEAD` is
+# read on load. Memory stays bounded by the Bloom filter plus the hashes
+# added since the last save.
+
+import json
+import os
+import subprocess
+from hashlib import blake2b
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+
+META_FILENAME = "msg_index.json"
+BLOOM_FILENAME = "msg_bloom.npy"
+HASHES_FILENAME = "msg_hashes.npy"
+
+BITS_PER_MSG = 10
+NUM_HASHES = 7
+MIN_CAPACITY = 1 << 12
+
+_MASK32 = 0xFFFFFFFF
+
+
+class MsgIndexError(Exception):
+    pass
+
+
+def subject_of(message: str) -> str:
+    return message.strip().split("\n", 1)[0].strip()
+
+
+def msg_hash(message: str) -> int:
+    digest = blake2b(subject_of(message).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# --------------------------------------------------
+# Bloom filter
+# --------------------------------------------------
+
+class BloomFilter:
+    """
+    Packed bit array; k positions per item by double hashing the
+    64-bit message hash (h1 + i * h2).
+    """
+
+    def __init__(self, capacity: int, bits: Optional[np.ndarray] = None, k: int = NUM_HASHES):
+        m = 1 << max(int(capacity * BITS_PER_MSG), 8).bit_length()
+        self.capacity = int(capacity)
+        self.k = k
+        self.mask = m - 1
+        self.bits = bits if bits is not None else np.zeros(m // 8, dtype=np.uint8)
+        if self.bits.size * 8 != m:
+            raise MsgIndexError(f"[msg_index] bloom size {self.bits.size * 8} != {m}")
+
+    def _positions(self, h: int) -> Iterator[int]:
+        h1, h2 = h & _MASK32, (h >> 32) | 1
+        for i in range(self.k):
+            yield (h1 + i * h2) & self.mask
+
+    def add(self, h: int) -> None:
+        for p in self._positions(h):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, h: int) -> bool:
+        return all(self.bits[p >> 3] >> (p & 7) & 1 for p in self._positions(h))
+
+    def add_many(self, hashes: np.ndarray) -> None:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        h1 = hashes & np.uint64(_MASK32)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        for i in range(self.k):
+            p = (h1 + np.uint64(i) * h2) & np.uint64(self.mask)
+            np.bitwise_or.at(
+                self.bits,
+                (p >> np.uint64(3)).astype(np.int64),
+                (np.uint8(1) << (p & np.uint64(7)).astype(np.uint8)),
+            )
+
+
+# --------------------------------------------------
+# Index
+# --------------------------------------------------
+
+class MsgIndex:
+    def __init__(self, repo_path: str, index_dir: Optional[Path] = None):
+        self.repo_path = repo_path
+        self.index_dir = Path(index_dir) if index_dir else _default_index_dir(repo_path)
+        self.head: Optional[str] = None
+        self._hashes = np.empty(0, dtype=np.uint64)     # sorted, mmap after load
+        self._pending: set = set()
+        self._bloom = BloomFilter(MIN_CAPACITY)
+
+    # -------- lookups --------
+
+    def __contains__(self, message: str) -> bool:
+        return self._has(msg_hash(message))
+
+    def _has(self, h: int) -> bool:
+        if h not in self._bloom:
+            return False
+        if h in self._pending:
+            return True
+        i = int(np.searchsorted(self._hashes, np.uint64(h)))
+        return i < self._hashes.size and int(self._hashes[i]) == h
+
+    def __len__(self) -> int:
+        return int(self._hashes.size) + len(self._pending)
+
+    def add(self, message: str) -> None:
+        h = msg_hash(message)
+        if self._has(h):
+            return
+        self._pending.add(h)
+        if len(self) > self._bloom.capacity:
+            self._rebuild_bloom()
+        else:
+            self._bloom.add(h)
+
+    def fresh(self, messages: Iterable[str]) -> List[str]:
+        """
+        Messages not used anywhere in the history yet.
+        """
+        return [m for m in messages if m not in self]
+
+    # -------- sync --------
+
+    def load(self) -> "MsgIndex":
+        """
+        Load the stored index and catch up with HEAD.
+        """
+        self._read()
+
+        head = _rev_parse(self.repo_path, "HEAD")
+        if head is None:
+            self._reset()
+            return self
+
+        if self.head == head:
+            return self
+
+        self._catch_up(head)
+        self.save(head)
+        return self
+
+    def save(self, head: Optional[str] = None) -> None:
+        """
+        Merge pending hashes and write the index as of `head` (default:
+        the current HEAD). Commits between the last indexed head and
+        `head` are scanned first, so commits made without add() are
+        never skipped.
+        """
+        head = head or _rev_parse(self.repo_path, "HEAD")
+        if head is not None and head != self.head:
+            self._catch_up(head)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+        # drop the memory map of the file about to be replaced (Windows
+        # refuses to replace a mapped file)
+        self._hashes = np.array(self._hashes)
+        if self._pending:
+            pending = np.fromiter(self._pending, dtype=np.uint64, count=len(self._pending))
+            self._hashes = np.union1d(self._hashes, pending)
+            self._pending.clear()
+
+        _save_npy(self.index_dir / HASHES_FILENAME, self._hashes)
+        _save_npy(self.index_dir / BLOOM_FILENAME, self._bloom.bits)
+
+        meta = {
+            "head": self.head,
+            "count": int(self._hashes.size),
+            "capacity": self._bloom.capacity,
+            "k": self._bloom.k,
+        }
+        tmp = self.index_dir / (META_FILENAME + ".tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.index_dir / META_FILENAME)
+
+        self._hashes = np.load(self.index_dir / HASHES_FILENAME, mmap_mode="r")
+
+    def _catch_up(self, head: str) -> None:
+        if self.head and _is_ancestor(self.repo_path, self.head, head):
+            self._scan(f"{self.head}..{head}")
+        else:
+            # history rewritten or first run: full rebuild
+            self._reset()
+            self._scan(head)
+        self.head = head
+
+    def _reset(self) -> None:
+        self.head = None
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._pending.clear()
+        self._bloom = BloomFilter(MIN_CAPACITY)
+
+    def _read(self) -> None:
+        self._reset()
+
+        meta_path = self.index_dir / META_FILENAME
+        if not meta_path.exists():
+            return
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        try:
+            self._hashes = np.load(self.index_dir / HASHES_FILENAME, mmap_mode="r")
+            bits = np.load(self.index_dir / BLOOM_FILENAME)
+            self._bloom = BloomFilter(meta["capacity"], bits=bits, k=meta["k"])
+        except (OSError, ValueError, KeyError, MsgIndexError):
+            self._reset()  # unreadable index: rebuilt from git on load()
+            return
+        self.head = meta.get("head")
+
+    def _rebuild_bloom(self) -> None:
+        capacity = max(MIN_CAPACITY, self._bloom.capacity)
+        while capacity < 2 * len(self):
+            capacity *= 2
+        self._bloom = BloomFilter(capacity)
+        self._bloom.add_many(self._hashes)
+        self._bloom.add_many(np.fromiter(self._pending, dtype=np.uint64, count=len(self._pending)))
+
+    def _scan(self, rev_range: str, chunk: int = 1 << 16) -> None:
+        """
+        Stream subjects once; hashes are batched into arrays so memory
+        stays flat for long histories.
+        """
+        proc = subprocess.Popen(
+            ["git", "log", "-z", "--format=%s", rev_range],
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        batches: List[np.ndarray] = []
+        batch: List[int] = []
+        for subject in _iter_nul_records(proc.stdout):
+            batch.append(msg_hash(subject))
+            if len(batch) == chunk:
+                batches.append(np.unique(np.asarray(batch, dtype=np.uint64)))
+                batch = []
+        if batch:
+            batches.append(np.unique(np.asarray(batch, dtype=np.uint64)))
+
+        _, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise MsgIndexError(
+                f"[msg_index] git log failed:\n{stderr.decode(errors='replace')}"
+            )
+
+        if batches:
+            self._hashes = np.unique(np.concatenate([np.asarray(self._hashes), *batches]))
+        self._rebuild_bloom()
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+
+def _save_npy(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(path.stem + ".tmp.npy")
+    np.save(tmp, np.asarray(array))
+    os.replace(tmp, path)
+
+
+def _default_index_dir(repo_path: str) -> Path:
+    result = subprocess.run(
+        ["git", "rev-parse", "--absolute-git-dir"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return Path(result.stdout.strip()) / "gitcom"
+
+
+def _rev_parse(repo_path: str, rev: str) -> Optional[str]:
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", rev],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def _is_ancestor(repo_path: str, old: str, new: str) -> bool:
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", old, new],
+        cwd=repo_path,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def _iter_nul_records(stream, chunk_size: int = 1 << 16) -> Iterator[str]:
+    buf = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        *records, buf = buf.split(b"\0")
+        for record in records:
+            yield record.decode("utf-8", errors="replace")
+    if buf:
+        yield buf.decode("utf-8", errors="replace")
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="commit message dedup index")
+    parser.add_argument("--repo", default=".")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--check", action="append", default=[], help="message to look up (repeatable)")
+    args = parser.parse_args()
+
+    index = MsgIndex(args.repo)
+    if args.rebuild:
+        for name in (META_FILENAME, BLOOM_FILENAME, HASHES_FILENAME):
+            (index.index_dir / name).unlink(missing_ok=True)
+
+    t0 = time.perf_counter()
+    index.load()
+    print(f"[msg_index] {len(index)} distinct subjects at {index.head} ({time.perf_counter() - t0:.2f}s)")
+    for msg in args.check:
+        print(f"  {'used' if msg in index else 'new '}  {msg}")
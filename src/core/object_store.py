@@ -0,0 +1,404 @@
+# src/core/object_store.py
+# ------------------------
+# Shared object store for execution repos (objects/info/alternates)
+#
+#   python -m src.core.object_store init
+#   python -m src.core.object_store provision --all        # registry repos
+#   python -m src.core.object_store provision --path /tmp/run-17
+#   python -m src.core.object_store repack --repo gitcom-test
+#   python -m src.core.object_store status
+#
+# One bare repo (default ~/.gitcom/store.git, repo_config.json
+# "object_store.path") holds the objects every execution repo has in
+# common. A provisioned repo lists the store in objects/info/alternates
+# and only keeps objects the store does not have yet.
+#
+#   provision   `git init --template=` + one alternates line (a few ms);
+#               an existing repo is attached and repacked -l, which drops
+#               its local copies of objects the store already has
+#   absorb      the store fetches the repo's refs into
+#               refs/repos/<key>/..., so its new objects move to the store
+#   repack      absorb, then `git repack -a -d -l` in the repo, loose
+#               objects the store now has are deleted (repack -l leaves
+#               them loose), and a connectivity check; final_pusher runs
+#               it before a push
+#
+# Safety: repos depend on store objects they no longer hold, so the store
+# never drops anything. It has gc.auto=0 and gc.pruneExpire=never. Every
+# absorbed ref stays under refs/repos/. compact_store() repacks with
+# --keep-unreachable.
+#
+# A store is recognised by gitcom.objectStore=true, not by its gc settings:
+# bootstrap mirrors share those settings and must never absorb repos.
+# Partial clones (extensions.partialClone / remote.<name>.promisor) are
+# refused: their missing blobs cannot be fetched into the store.
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.run_metrics import METRICS
+
+
+CONFIG_PATH = Path("src/res/repo_config.json")
+REPOPATH_FILE = Path("src/locked_res_ver1.3/gitcom_repopath.txt")
+DEFAULT_STORE = Path("~/.gitcom/store.git")
+
+STORE_MARKER = "gitcom.objectStore"
+STORE_REF_PREFIX = "refs/repos"
+ABSORB_REFS = ("refs/heads", "refs/tags", "refs/gitcom")
+
+STORE_CONFIG = {
+    "gc.auto": "0",
+    "gc.pruneExpire": "never",
+    "gc.reflogExpireUnreachable": "never",
+    "core.logAllRefUpdates": "false",
+}
+
+
+class ObjectStoreError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# git helpers
+# --------------------------------------------------
+
+def _git(cwd: Path, *args: str, check: bool = True) -> str:
+    cmd = ["git", *args]
+    with METRICS.time_git(cmd):
+        result = subprocess.run(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    if check and result.returncode != 0:
+        raise ObjectStoreError(f"[store] {' '.join(cmd)} failed: {result.stderr.strip()}")
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def _git_dir(repo_path: Path) -> Path:
+    return Path(_git(repo_path, "rev-parse", "--absolute-git-dir"))
+
+
+def _alternates_file(repo_path: Path) -> Path:
+    return _git_dir(repo_path) / "objects" / "info" / "alternates"
+
+
+def repo_key(repo_path: Path) -> str:
+    """
+    Namespace of a repo inside the store: basename + short path hash, so
+    two repos with the same name never share refs.
+    """
+    path = Path(repo_path).resolve()
+    return f"{path.name}-{hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:8]}"
+
+
+def _disk_kib(repo_path: Path) -> int:
+    """
+    Local object storage in KiB (loose + packs, alternates excluded).
+    """
+    stats = dict(
+        line.split(": ", 1)
+        for line in _git(repo_path, "count-objects", "-v").splitlines()
+    )
+    return int(stats.get("size", 0)) + int(stats.get("size-pack", 0))
+
+
+# --------------------------------------------------
+# Store
+# --------------------------------------------------
+
+def store_path(cfg: Optional[dict] = None) -> Path:
+    path = (cfg or {}).get("object_store", {}).get("path") or DEFAULT_STORE
+    return Path(path).expanduser().resolve()
+
+
+def init_store(store: Path) -> Path:
+    """
+    Create the bare store (idempotent) and pin its no-prune settings.
+    """
+    store = Path(store).expanduser().resolve()
+    if not (store / "objects").is_dir():
+        store.mkdir(parents=True, exist_ok=True)
+        _git(store, "init", "-q", "--bare", "--template=")
+    for key, value in {**STORE_CONFIG, STORE_MARKER: "true"}.items():
+        _git(store, "config", key, value)
+    return store
+
+
+def compact_store(store: Path) -> None:
+    """
+    Repack the store into one pack without dropping unreachable objects
+    (a repo may still borrow them).
+    """
+    _git(Path(store), "repack", "-a", "-d", "-q", "--keep-unreachable")
+
+
+def store_of(repo_path: Path) -> Optional[Path]:
+    """
+    The store a repo borrows from, if it was provisioned by this module.
+    """
+    alternates = _alternates_file(Path(repo_path))
+    if not alternates.exists():
+        return None
+    for line in alternates.read_text(encoding="utf-8").splitlines():
+        objects = Path(line.strip())
+        if line.strip() and (objects.parent / "config").exists():
+            if _git(objects.parent, "config", "--bool", "--get", STORE_MARKER, check=False) == "true":
+                return objects.parent
+    return None
+
+
+# --------------------------------------------------
+# Repos
+# --------------------------------------------------
+
+def _check_not_partial(repo_path: Path) -> None:
+    # extensions.partialClone on format v1 repos, remote.<name>.promisor otherwise
+    promisor = _git(repo_path, "config", "--get", "extensions.partialClone", check=False)
+    for line in _git(repo_path, "config", "--get-regexp", r"^remote\..*\.promisor$", check=False).splitlines():
+        key, _, value = line.partition(" ")
+        if value.lower() == "true":
+            promisor = promisor or key[len("remote."):-len(".promisor")]
+    if promisor:
+        raise ObjectStoreError(
+            f"[store] {repo_path} is a partial clone (promisor remote '{promisor}'); "
+            "its missing blobs cannot be absorbed into the store. "
+            "Bootstrap it with mode 'reference' to share objects."
+        )
+
+
+def attach(store: Path, repo_path: Path) -> bool:
+    """
+    Add the store to the repo's alternates. Returns False when it was
+    already listed.
+    """
+    objects = str(Path(store).resolve() / "objects")
+    alternates = _alternates_file(Path(repo_path))
+    lines = alternates.read_text(encoding="utf-8").splitlines() if alternates.exists() else []
+    if objects in (l.strip() for l in lines):
+        return False
+
+    alternates.parent.mkdir(parents=True, exist_ok=True)
+    tmp = alternates.with_name(alternates.name + ".tmp")
+    tmp.write_text("\n".join(lines + [objects]) + "\n", encoding="utf-8")
+    os.replace(tmp, alternates)
+    return True
+
+
+def provision(store: Path, repo_path: Path, *, branch: str = "main") -> Dict[str, Any]:
+    """
+    Make `repo_path` an execution repo on the shared store: a new repo
+    is created empty; an existing one is attached and deduplicated.
+    """
+    repo_path = Path(repo_path).expanduser()
+    t0 = time.perf_counter()
+
+    existed = (repo_path / ".git").exists() or (repo_path / "HEAD").is_file()
+    if not existed:
+        repo_path.mkdir(parents=True, exist_ok=True)
+        _git(repo_path, "init", "-q", "--template=", "-b", branch)
+    else:
+        _check_not_partial(repo_path)
+
+    attached = attach(store, repo_path)
+    before = after = 0
+    if existed and attached:
+        before = _disk_kib(repo_path)
+        repack(store, repo_path, verify=True)
+        after = _disk_kib(repo_path)
+
+    return {
+        "repo": str(repo_path),
+        "created": not existed,
+        "attached": attached,
+        "kib_before": before,
+        "kib_after": after,
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+def absorb(store: Path, repo_path: Path) -> int:
+    """
+    Fetch the repo's refs into the store (refs/repos/<key>/...). Only
+    objects the store lacks are transferred. Returns the number of refs
+    the store now holds for the repo.
+    """
+    store, repo_path = Path(store), Path(repo_path).resolve()
+    prefix = f"{STORE_REF_PREFIX}/{repo_key(repo_path)}"
+    refspecs = [f"+{ns}/*:{prefix}/{ns[len('refs/'):]}/*" for ns in ABSORB_REFS]
+    _git(store, "fetch", "-q", "--no-tags", "--no-write-fetch-head", str(repo_path), *refspecs)
+    return len(_git(store, "for-each-ref", "--format=%(refname)", prefix).splitlines())
+
+
+def repack(store: Path, repo_path: Path, *, verify: bool = True) -> Dict[str, Any]:
+    """
+    Safe per-repo repack: objects go to the store first, then the repo
+    keeps only what the store does not have (-l skips borrowed objects).
+    """
+    repo_path = Path(repo_path)
+    _check_not_partial(repo_path)
+    refs = absorb(store, repo_path)
+    _git(repo_path, "repack", "-a", "-d", "-l", "-q")
+    _git(repo_path, "prune-packed", "-q")
+    _drop_borrowed_loose(store, repo_path)
+
+    if verify:
+        # every object reachable from the repo's refs is local or in the store
+        _git(repo_path, "fsck", "--connectivity-only", "--no-dangling", "--no-progress")
+    return {"refs": refs, "kib": _disk_kib(repo_path)}
+
+
+def _drop_borrowed_loose(store: Path, repo_path: Path) -> int:
+    """
+    Delete loose objects the store holds. repack -l skips objects found
+    in an alternate, so they stay loose, and prune-packed only looks at
+    local packs. The store never prunes, so the copies are redundant.
+    """
+    objects = _git_dir(repo_path) / "objects"
+    loose = {
+        d.name + f.name: f
+        for d in objects.iterdir()
+        if len(d.name) == 2 and d.is_dir()
+        for f in d.iterdir()
+        if len(f.name) == 38
+    }
+    if not loose:
+        return 0
+
+    cmd = ["git", "cat-file", "--batch-check=%(objectname)"]
+    with METRICS.time_git(cmd):
+        result = subprocess.run(
+            cmd,
+            cwd=store,
+            input="\n".join(loose) + "\n",
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    if result.returncode != 0:
+        raise ObjectStoreError(f"[store] cat-file in {store} failed: {result.stderr.strip()}")
+
+    dropped = 0
+    for line in result.stdout.splitlines():
+        path = loose.get(line.strip())
+        if path is not None:          # "<sha> missing" lines never match
+            path.unlink()
+            dropped += 1
+    return dropped
+
+
+def repack_before_push(repo_path: str) -> None:
+    """
+    final_pusher hook: no-op for repos without a shared store.
+    """
+    store = store_of(Path(repo_path))
+    if store is None:
+        return
+    info = repack(store, Path(repo_path))
+    print(f"[store] {repo_path}: absorbed into {store}, {info['kib']} KiB local")
+
+
+def provision_registry(
+    store: Path,
+    repopath_file: Path = REPOPATH_FILE,
+    names: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Provision every repo of the current platform's registry section (or
+    only `names`).
+    """
+    from src.core.final_pusher import load_repo_paths
+
+    mapping = load_repo_paths(repopath_file)
+    unknown = set(names or ()) - set(mapping)
+    if unknown:
+        raise ObjectStoreError(f"[store] not in {repopath_file}: {', '.join(sorted(unknown))}")
+
+    results = []
+    for name, path in mapping.items():
+        if names and name not in names:
+            continue
+        info = provision(store, Path(path))
+        info["name"] = name
+        results.append(info)
+    return results
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="shared object store for execution repos")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    parser.add_argument("--store", type=Path, default=None, help="default: object_store.path or ~/.gitcom/store.git")
+    parser.add_argument("--registry", type=Path, default=REPOPATH_FILE)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("init")
+
+    p_prov = sub.add_parser("provision")
+    which = p_prov.add_mutually_exclusive_group(required=True)
+    which.add_argument("--all", action="store_true", help="every repo in the registry")
+    which.add_argument("--name", action="append", help="registry name (repeatable)")
+    which.add_argument("--path", type=Path, action="append", help="repo path (repeatable)")
+
+    p_repack = sub.add_parser("repack")
+    p_repack.add_argument("--repo", required=True, help="path or registry name")
+    p_repack.add_argument("--no-verify", action="store_true")
+
+    sub.add_parser("status")
+    sub.add_parser("compact")
+
+    args = parser.parse_args()
+
+    cfg = {}
+    if args.config.exists():
+        with open(args.config, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    store = init_store(args.store or store_path(cfg))
+
+    if args.cmd == "init":
+        print(f"[store] {store}")
+
+    elif args.cmd == "provision":
+        if args.path:
+            results = [provision(store, p) for p in args.path]
+        else:
+            results = provision_registry(store, args.registry, None if args.all else args.name)
+        for r in results:
+            state = "created" if r["created"] else f"attached {r['kib_before']} -> {r['kib_after']} KiB"
+            print(f"[store] {r.get('name', r['repo'])}: {state} ({r['ms']} ms)")
+
+    elif args.cmd == "repack":
+        repo = args.repo
+        if not Path(repo).is_dir():
+            from src.core.final_pusher import load_repo_paths
+            repo = load_repo_paths(args.registry)[repo]
+        info = repack(store, Path(repo), verify=not args.no_verify)
+        print(f"[store] {repo}: {info['refs']} refs in store, {info['kib']} KiB local")
+
+    elif args.cmd == "compact":
+        compact_store(store)
+        print(f"[store] {store}: {_disk_kib(store)} KiB")
+
+    else:
+        from src.core.final_pusher import load_repo_paths
+
+        print(f"[store] {store}: {_disk_kib(store)} KiB")
+        for name, path in load_repo_paths(args.registry).items():
+            if not Path(path).is_dir():
+                print(f"  {name:<20} missing")
+                continue
+            shared = store_of(Path(path)) == store
+            print(f"  {name:<20} {_disk_kib(Path(path)):>8} KiB  {'shared' if shared else 'private'}")
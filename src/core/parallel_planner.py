@@ -0,0 +1,241 @@
+# src/core/parallel_planner.py
+# ----------------------------
+# Two-phase planner for long date ranges x many repos
+#
+#   phase 1 (process pool, per repo x date shard) -- no snapshot needed:
+#       day state, commit counts, action types, add-file names,
+#       timestamps
+#   phase 2 (sequential, per repo, in date order):
+#       resolve edit/delete targets against the evolving snapshot,
+#       validate (anti_timedox), pick the commit message, emit plan commits
+#
+# Every draw comes from an rng_streams stream keyed by (seed, repo, day,
+# purpose), so the output does not depend on the shard size or the
+# number of workers. The keys and draw order are those of
+# multidays_commit_pusher.run_days (actions/<i>, targets/<i>,
+# message/<i>; action_layout.plan_action_types / resolve_actions), so a
+# plan equals what run_days(dedup_msgs=False) commits for the same seed
+# and repo name. Phase 2 consumes shards as soon as they arrive
+# (Pool.imap), overlapping with phase 1 of later shards.
+#
+# Output: one NDJSON plan per repo (plan_stream format) with a
+# "message" per commit.
+
+import json
+import multiprocessing
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.core.action_layout import plan_action_types, resolve_actions
+from src.core.anti_timedox import validate_actions
+from src.core.msg_lib import MSGS_PATH, MsgLibrary
+from src.core.multidays_commit_pusher import apply_actions_to_snap, date_range, plan_day_counts
+from src.core.rng_streams import RngStreams
+from src.core.time_set import TimeInjection, commit_times, to_datetimes
+from src.core.weighted_pick import TargetSampler
+
+
+DEFAULT_SHARD_DAYS = 366
+MAX_ACTIONS = 3
+TARGET_RECENCY = 0.05
+
+PlanCommit = Dict[str, Any]
+
+
+@dataclass
+class CommitSkeleton:
+    """
+    Snapshot-independent part of one planned commit.
+    """
+    day: str
+    commit_index: int           # 1-based within the day
+    time_point: str
+    planned: List[Tuple[str, str]]  # (action type, add-file name) per action
+
+
+# --------------------------------------------------
+# Phase 1 (worker processes)
+# --------------------------------------------------
+
+def plan_shard(
+    seed: int,
+    repo: str,
+    days: List[str],
+    injection: TimeInjection,
+    max_actions: int = MAX_ACTIONS,
+) -> List[CommitSkeleton]:
+    streams = RngStreams(seed, repo)
+    counts = plan_day_counts(days, streams)
+    times = to_datetimes(commit_times(days, counts, injection, streams=streams), injection)
+
+    out: List[CommitSkeleton] = []
+    k = 0
+    for day, n in zip(days, counts):
+        for commit_index in range(1, n + 1):
+            rng = streams.stream(day, f"actions/{commit_index}")
+            out.append(CommitSkeleton(
+                day=day,
+                commit_index=commit_index,
+                time_point=times[k].isoformat(),
+                planned=plan_action_types(rng, max_actions),
+            ))
+            k += 1
+
+    return out
+
+
+def _plan_shard_task(task: Tuple[int, str, List[str], TimeInjection, int]):
+    seed, repo, days, injection, max_actions = task
+    return repo, plan_shard(seed, repo, days, injection, max_actions)
+
+
+# --------------------------------------------------
+# Phase 2 (sequential)
+# --------------------------------------------------
+
+class RepoResolver:
+    """
+    Turns skeletons into concrete plan commits for one repo.
+    """
+
+    def __init__(self, seed: int, repo: str, snap: Iterable[str], msgs_path: Path):
+        self.streams = RngStreams(seed, repo)
+        self.snap = set(snap)
+        self.sampler = TargetSampler(self.snap, recency=TARGET_RECENCY)
+        # per repo: the library remembers its picks like commit_executor's does in a run
+        self.msg_lib = MsgLibrary(str(msgs_path))
+        self.position = 0
+
+    def resolve(self, sk: CommitSkeleton) -> PlanCommit:
+        actions = resolve_actions(
+            sk.planned,
+            self.snap,
+            self.sampler,
+            self.streams.stream(sk.day, f"targets/{sk.commit_index}"),
+        )
+
+        valid = validate_actions(last_snap=self.snap, actions=actions)
+        apply_actions_to_snap(self.snap, valid)
+        self.sampler.apply(valid)
+
+        # message follows the leading action of the pack (commit_executor)
+        message = self.msg_lib.random_msg(
+            valid[0]["type"],
+            sk.commit_index,
+            rng=self.streams.stream(sk.day, f"message/{sk.commit_index}"),
+        )
+
+        commit = {
+            "commit_index": self.position,
+            "time_point": sk.time_point,
+            "message": message,
+            "actions": [{"op": a["type"], "path": a["path"]} for a in valid],
+        }
+        self.position += 1
+        return commit
+
+
+# --------------------------------------------------
+# Driver
+# --------------------------------------------------
+
+def shard_days(days: List[str], size: int) -> List[List[str]]:
+    return [days[i:i + size] for i in range(0, len(days), size)]
+
+
+def plan_repos(
+    repos: Dict[str, Iterable[str]],
+    begin: str,
+    end: str,
+    out_dir: Path,
+    seed: int,
+    injection: Optional[TimeInjection] = None,
+    workers: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_DAYS,
+    msgs_path: Path = MSGS_PATH,
+) -> Dict[str, int]:
+    """
+    Plan [begin, end] for every repo (name -> starting snapshot) and
+    write <out_dir>/<repo>.ndjson. Returns commits planned per repo.
+
+    workers=0 runs phase 1 in-process (same output, for debugging).
+    """
+    injection = injection or TimeInjection()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = shard_days(date_range(begin, end), shard_size)
+    tasks = [
+        (seed, repo, days, injection, MAX_ACTIONS)
+        for repo in repos
+        for days in shards
+    ]
+
+    resolvers = {repo: RepoResolver(seed, repo, snap, msgs_path) for repo, snap in repos.items()}
+    files = {repo: open(out_dir / f"{repo}.ndjson", "w", encoding="utf-8") for repo in repos}
+    planned = {repo: 0 for repo in repos}
+
+    t0 = time.perf_counter()
+    resolve_s = 0.0
+
+    def _consume(results: Iterator[Tuple[str, List[CommitSkeleton]]]):
+        nonlocal resolve_s
+
+        for repo, skeletons in results:
+            t = time.perf_counter()
+            resolver, f = resolvers[repo], files[repo]
+            for sk in skeletons:
+                f.write(json.dumps(resolver.resolve(sk), separators=(",", ":")) + "\n")
+            planned[repo] += len(skeletons)
+            resolve_s += time.perf_counter() - t
+
+    try:
+        if workers == 0:
+            _consume(map(_plan_shard_task, tasks))
+        else:
+            with multiprocessing.Pool(processes=workers) as pool:
+                _consume(pool.imap(_plan_shard_task, tasks))
+    finally:
+        for f in files.values():
+            f.close()
+
+    elapsed = time.perf_counter() - t0
+    print(
+        f"[planner] {sum(planned.values())} commits, {len(repos)} repos, "
+        f"{len(tasks)} shards in {elapsed:.2f}s (sequential resolve {resolve_s:.2f}s)"
+    )
+    return planned
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.core.rng_streams import resolve_seed
+    from src.core.time_set import load_time_injection
+
+    parser = argparse.ArgumentParser(description="two-phase parallel planner")
+    parser.add_argument("--repo", action="append", required=True, help="repo name (repeatable)")
+    parser.add_argument("--begin", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--out-dir", type=Path, required=True)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="default: os.cpu_count()")
+    parser.add_argument("--shard-days", type=int, default=DEFAULT_SHARD_DAYS)
+    args = parser.parse_args()
+
+    plan_repos(
+        {repo: () for repo in args.repo},
+        begin=args.begin,
+        end=args.end,
+        out_dir=args.out_dir,
+        seed=resolve_seed(args.seed),
+        injection=load_time_injection(Path("src/res/repo_config.json")),
+        workers=args.workers,
+        shard_size=args.shard_days,
+    )
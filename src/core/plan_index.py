@@ -0,0 +1,251 @@
+# src/core/plan_index.py
+# ----------------------
+# Idempotent execution index: plan commit id -> git sha
+#
+# Every planned commit carries a stable id in a commit trailer:
+#
+#     <message>
+#
+#     Gitcom-Plan-Id: 3f2a9c0d41b7e2aa
+#
+# The index is rebuilt from ONE `git log` stream and then kept
+# incrementally (only commits after the recorded HEAD are read).
+
+import hashlib
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+PLAN_ID_TRAILER = "Gitcom-Plan-Id"
+INDEX_FILENAME = "plan_index.tsv"
+
+_FIELD_SEP = "\x1f"
+
+
+class PlanIndexError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Plan ids
+# --------------------------------------------------
+
+def plan_commit_id(commit: Dict[str, Any], position: int, namespace: str = "") -> str:
+    """
+    Stable id for one planned commit.
+
+    - an explicit "plan_id" field wins
+    - otherwise a hash of (namespace, position, time_point, actions), so
+      the same plan file always yields the same ids and two identical
+      commits at different positions do not share one
+    """
+    if commit.get("plan_id"):
+        return str(commit["plan_id"])
+
+    canonical = json.dumps(
+        {
+            "ns": namespace,
+            "pos": position,
+            "time_point": commit.get("time_point"),
+            "actions": commit.get("actions", []),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def with_plan_trailer(message: str, plan_id: Optional[str]) -> str:
+    if not plan_id:
+        return message
+    return f"{message.rstrip()}\n\n{PLAN_ID_TRAILER}: {plan_id}\n"
+
+
+# --------------------------------------------------
+# Index
+# --------------------------------------------------
+
+class PlanIndex:
+    """
+    On-disk map plan_id -> sha, stored as <git-dir>/gitcom/plan_index.tsv:
+
+        # head <sha>
+        <plan_id>\\t<sha>
+        ...
+    """
+
+    def __init__(self, repo_path: str, index_path: Optional[Path] = None):
+        self.repo_path = repo_path
+        self.index_path = Path(index_path) if index_path else _default_index_path(repo_path)
+        self.head: Optional[str] = None
+        self._ids: Dict[str, str] = {}
+
+    # -------- lookups (O(1)) --------
+
+    def __contains__(self, plan_id: str) -> bool:
+        return plan_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get(self, plan_id: str) -> Optional[str]:
+        return self._ids.get(plan_id)
+
+    def add(self, plan_id: str, sha: str) -> None:
+        self._ids[plan_id] = sha
+
+    # -------- sync --------
+
+    def load(self) -> "PlanIndex":
+        """
+        Load the cached index and catch up with HEAD.
+        """
+        self._read()
+
+        head = _rev_parse(self.repo_path, "HEAD")
+        if head is None:
+            self.head = None
+            self._ids.clear()
+            return self
+
+        if self.head == head:
+            return self
+
+        if self.head and _is_ancestor(self.repo_path, self.head, head):
+            self._scan(f"{self.head}..{head}")
+        else:
+            # history rewritten or first run: full rebuild
+            self._ids.clear()
+            self._scan(head)
+
+        self.head = head
+        self.save()
+        return self
+
+    def save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(f"# head {self.head or ''}\n")
+            for plan_id, sha in self._ids.items():
+                f.write(f"{plan_id}\t{sha}\n")
+
+        os.replace(tmp, self.index_path)
+
+    def _read(self) -> None:
+        self._ids.clear()
+        self.head = None
+
+        if not self.index_path.exists():
+            return
+
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("# head "):
+                    self.head = line[len("# head "):] or None
+                elif line and "\t" in line:
+                    plan_id, sha = line.split("\t", 1)
+                    self._ids[plan_id] = sha
+
+    def _scan(self, rev_range: str) -> None:
+        """
+        Stream `git log` once; newest-first, so keep the first sha per id.
+        """
+        fmt = (
+            f"%H{_FIELD_SEP}"
+            f"%(trailers:key={PLAN_ID_TRAILER},valueonly,separator=%x1f)"
+        )
+        proc = subprocess.Popen(
+            ["git", "log", "-z", f"--format={fmt}", rev_range],
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        new_ids: Dict[str, str] = {}
+        for record in _iter_nul_records(proc.stdout):
+            sha, _, trailers = record.partition(_FIELD_SEP)
+            for plan_id in trailers.split(_FIELD_SEP):
+                plan_id = plan_id.strip()
+                if plan_id and plan_id not in new_ids:
+                    new_ids[plan_id] = sha
+
+        _, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise PlanIndexError(
+                f"[plan_index] git log failed:\n{stderr.decode(errors='replace')}"
+            )
+
+        self._ids.update(new_ids)
+
+
+def pending_commits(
+    plan: Iterable[Dict[str, Any]],
+    index: PlanIndex,
+    namespace: str = "",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield only commits whose plan id is not in the index yet.
+    Each yielded commit gets its "plan_id" filled in.
+    """
+    for position, commit in enumerate(plan):
+        plan_id = plan_commit_id(commit, position, namespace)
+        if plan_id in index:
+            continue
+        yield {**commit, "plan_id": plan_id}
+
+
+# --------------------------------------------------
+# Git helpers
+# --------------------------------------------------
+
+def _default_index_path(repo_path: str) -> Path:
+    result = subprocess.run(
+        ["git", "rev-parse", "--absolute-git-dir"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return Path(result.stdout.strip()) / "gitcom" / INDEX_FILENAME
+
+
+def _rev_parse(repo_path: str, rev: str) -> Optional[str]:
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", rev],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def _is_ancestor(repo_path: str, old: str, new: str) -> bool:
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", old, new],
+        cwd=repo_path,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def _iter_nul_records(stream, chunk_size: int = 1 << 16) -> Iterator[str]:
+    buf = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        *records, buf = buf.split(b"\0")
+        for record in records:
+            yield record.decode("utf-8", errors="replace").lstrip("\n")
+    if buf.strip():
+        yield buf.decode("utf-8", errors="replace").lstrip("\n")
@@ -0,0 +1,363 @@
+# src/core/plan_stream.py
+# -----------------------
+# Stream planned commits from disk and replay them with bounded memory
+#
+# Supported plan formats (auto-detected):
+#
+#   JSON array (planned_temp_commit.txt):
+#     [
+#       {"commit_index": 0, "time_point": "2022-05-29T22:13:57",
+#        "actions": [{"op": "add", "path": "foo.txt"}, ...]},
+#       ...
+#     ]
+#
+#   NDJSON: one such commit object per line.
+#
+# Optional per-commit "message" is used as-is (see parallel_planner).
+
+import json
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.core.plan_index import PlanIndex, plan_commit_id
+from src.core.run_metrics import METRICS
+
+
+PlanCommit = Dict[str, Any]
+Engine = Callable[[PlanCommit], None]
+
+CHUNK_SIZE = 1 << 16
+MAX_COMMIT_CHARS = 1 << 26    # one commit object / NDJSON line (64 Mi chars)
+DEFAULT_PREFETCH = 256
+DEFAULT_PROGRESS_EVERY = 1000
+
+_QUEUE_STAGE = "plan_reader->engine"
+_WS = re.compile(r"\s*")
+_EOF = object()
+
+
+class PlanStreamError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Streaming parsers
+# --------------------------------------------------
+
+def iter_plan(
+    plan_path: Path,
+    chunk_size: int = CHUNK_SIZE,
+    max_commit_chars: int = MAX_COMMIT_CHARS,
+) -> Iterator[PlanCommit]:
+    """
+    Yield planned commits one by one; never holds more than one
+    commit (plus one read chunk) in memory. A commit that does not
+    parse within `max_commit_chars` is an error, not a reason to
+    buffer the rest of the file.
+    """
+    with open(plan_path, "r", encoding="utf-8") as f:
+        head = _peek_non_space(f, chunk_size)
+
+        if head.startswith("["):
+            yield from _iter_json_array(f, head, chunk_size, max_commit_chars)
+        elif head.startswith("{"):
+            yield from _iter_ndjson(f, head, max_commit_chars)
+        elif not head:
+            return
+        else:
+            raise PlanStreamError(
+                f"[plan] {plan_path}: expected JSON array or NDJSON, got {head[:20]!r}"
+            )
+
+
+def _peek_non_space(f, chunk_size: int) -> str:
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return ""
+        stripped = chunk.lstrip()
+        if stripped:
+            return stripped
+
+
+def _iter_json_array(f, buf: str, chunk_size: int, max_chars: int) -> Iterator[PlanCommit]:
+    decoder = json.JSONDecoder()
+    pos = 1  # skip "["
+    eof = False
+
+    while True:
+        pos = _WS.match(buf, pos).end()
+
+        if buf.startswith(",", pos):
+            pos += 1
+            continue
+
+        if buf.startswith("]", pos):
+            return
+
+        if pos < len(buf):
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                end = -1
+
+            if end >= 0:
+                yield _check_commit(obj)
+                pos = end
+                continue
+
+        if eof:
+            raise PlanStreamError("[plan] truncated JSON plan (missing ']')")
+        if len(buf) - pos > max_chars:
+            raise PlanStreamError(
+                f"[plan] malformed JSON plan: no complete commit within {max_chars} chars"
+            )
+
+        # refill: keep only the unconsumed tail
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def _iter_ndjson(f, head: str, max_chars: int) -> Iterator[PlanCommit]:
+    # `head` is the rest of the first chunk; finish its last line first
+    first_lines = head.split("\n")
+    tail = first_lines.pop()
+    tail += _readline(f, max_chars - len(tail), len(first_lines) + 1)
+    lineno = 0
+
+    for line in [*first_lines, tail]:
+        lineno += 1
+        if line.strip():
+            yield _check_commit(_loads(line, lineno))
+
+    while True:
+        line = _readline(f, max_chars, lineno + 1)
+        if not line:
+            return
+        lineno += 1
+        if line.strip():
+            yield _check_commit(_loads(line, lineno))
+
+
+def _readline(f, max_chars: int, lineno: int) -> str:
+    line = f.readline(max(max_chars, 0) + 1)
+    if len(line) > max_chars and not line.endswith("\n"):
+        raise PlanStreamError(f"[plan] NDJSON line {lineno} longer than {max_chars} chars")
+    return line
+
+
+def _loads(line: str, lineno: int):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise PlanStreamError(f"[plan] bad NDJSON at line {lineno}: {e}")
+
+
+def _check_commit(obj) -> PlanCommit:
+    if not isinstance(obj, dict):
+        raise PlanStreamError(f"[plan] commit must be an object, got {type(obj)}")
+    if not isinstance(obj.get("actions"), list):
+        raise PlanStreamError(f"[plan] commit missing 'actions' list: {obj}")
+    if "time_point" not in obj:
+        raise PlanStreamError(f"[plan] commit missing 'time_point': {obj}")
+    return obj
+
+
+# --------------------------------------------------
+# Plan -> executor contract
+# --------------------------------------------------
+
+def to_cmd_pack(actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Plan actions use "op"; the executor expects "type".
+    """
+    pack = []
+    for action in actions:
+        cmd = {k: v for k, v in action.items() if k != "op"}
+        cmd["type"] = action.get("op") or action.get("type")
+        pack.append(cmd)
+    return pack
+
+
+def executor_engine(repo_path: str, sparse: bool = False) -> Engine:
+    """
+    Default engine: one execute_one_commit() call per planned commit.
+    A commit whose actions cancel out (add, rename, delete) is still
+    committed, empty, so its plan id lands like any other.
+
+    sparse: commits stage only their own paths; pair with
+    sparse_exec.apply_cone(repo_path, plan_cone(plan)).
+    """
+    from src.core.commit_executor import execute_one_commit
+
+    def _run(commit: PlanCommit) -> None:
+        execute_one_commit(
+            repo_path=Path(repo_path),
+            git_cmd_pack=to_cmd_pack(commit["actions"]),
+            commit_time=datetime.fromisoformat(commit["time_point"]),
+            commit_index=commit.get("commit_index", 0),
+            plan_id=commit.get("plan_id"),
+            message=commit.get("message"),
+            sparse=sparse,
+            allow_empty=True,
+        )
+
+    return _run
+
+
+# --------------------------------------------------
+# Replay
+# --------------------------------------------------
+
+def replay_plan(
+    plan_path: Path,
+    engine: Engine,
+    *,
+    index: Optional[PlanIndex] = None,
+    namespace: str = "",
+    prefetch: int = DEFAULT_PREFETCH,
+    progress_every: int = DEFAULT_PROGRESS_EVERY,
+) -> Dict[str, int]:
+    """
+    Replay a plan file through `engine`.
+
+    - a reader thread parses ahead into a bounded queue (prefetch)
+    - commits already in `index` are skipped (idempotent re-runs)
+    - progress is printed every `progress_every` commits
+
+    Returns {"executed": n, "skipped": n}.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max(1, prefetch))
+    failure: List[BaseException] = []
+    stop = threading.Event()
+
+    def _reader():
+        try:
+            for position, commit in enumerate(iter_plan(plan_path)):
+                commit["plan_id"] = plan_commit_id(commit, position, namespace)
+                while not stop.is_set():
+                    try:
+                        q.put(commit, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except BaseException as e:  # surfaced in the main thread
+            failure.append(e)
+        finally:
+            # the consumer may be gone (engine raised): never block on a full queue
+            while not stop.is_set():
+                try:
+                    q.put(_EOF, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    reader = threading.Thread(target=_reader, daemon=True)
+    reader.start()
+
+    executed = skipped = 0
+    t0 = time.perf_counter()
+
+    try:
+        while True:
+            commit = q.get()
+            if commit is _EOF:
+                break
+
+            METRICS.set_gauge("gitcom_queue_depth", q.qsize(), stage=_QUEUE_STAGE)
+
+            if index is not None and commit["plan_id"] in index:
+                skipped += 1
+            else:
+                engine(commit)
+                executed += 1
+                if index is not None:
+                    index.add(commit["plan_id"], "")
+
+            done = executed + skipped
+            if progress_every and done % progress_every == 0:
+                rate = done / max(time.perf_counter() - t0, 1e-9)
+                print(
+                    f"[plan] {done} commits "
+                    f"({executed} executed, {skipped} skipped, {rate:.0f}/s)"
+                )
+    finally:
+        stop.set()
+        reader.join()
+
+    if failure:
+        raise failure[0]
+
+    if index is not None and executed:
+        index.load()  # pick up real shas for the new trailers
+
+    print(f"[plan] done: {executed} executed, {skipped} skipped")
+    return {"executed": executed, "skipped": skipped}
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a planned commit file")
+    parser.add_argument("plan", type=Path)
+    parser.add_argument("--repo", default=".")
+    parser.add_argument("--progress-every", type=int, default=DEFAULT_PROGRESS_EVERY)
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="do not skip commits already applied (Gitcom-Plan-Id trailers)",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="check the whole (pending part of the) plan against HEAD first",
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="check out only the plan's directories (cone mode) and stage per path",
+    )
+    args = parser.parse_args()
+
+    index = None if args.no_index else PlanIndex(args.repo).load()
+
+    if args.validate:
+        from src.core.anti_timedox import check_plan
+        from src.core.plan_index import pending_commits
+        from src.core.repo_truth import load_head_structure
+
+        plan = iter_plan(args.plan)
+        if index is not None:
+            plan = pending_commits(plan, index)
+
+        conflicts = check_plan(load_head_structure(args.repo), plan)
+        for c in conflicts:
+            print(f"[timedox] commit {c.commit_index}: {c.kind} — {c.detail}")
+        if conflicts:
+            raise SystemExit(f"[plan] {len(conflicts)} conflicts, nothing executed")
+
+    if args.sparse:
+        from src.core.sparse_exec import apply_cone, plan_cone
+
+        apply_cone(args.repo, plan_cone(args.plan))
+
+    replay_plan(
+        args.plan,
+        executor_engine(args.repo, sparse=args.sparse),
+        index=index,
+        progress_every=args.progress_every,
+    )
@@ -0,0 +1,259 @@
+# src/core/repo_maintenance.py
+# ----------------------------
+# Post-run / between-chunk maintenance for execution repos
+#
+# Long synthetic runs leave thousands of loose objects behind, which
+# slows every later ls-tree (repo_truth), git add and push. This stage
+# looks at object / pack statistics and only runs what is needed:
+#
+#   loose objects >= LOOSE_THRESHOLD   -> incremental repack (loose -> 1 pack)
+#   packs >= GEOMETRIC_PACKS           -> geometric repack + multi-pack-index
+#   packs >= 2 without a midx          -> write multi-pack-index
+#   commits not in commit-graph        -> split commit-graph write
+#
+# Every run appends before/after timings to <git-dir>/gitcom/maintenance.jsonl
+
+import json
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.core.repo_truth import load_head_structure
+from src.core.run_metrics import METRICS
+
+
+LOOSE_THRESHOLD = 1000
+GEOMETRIC_PACKS = 8
+COMMIT_GRAPH_LAG = 500
+
+LOG_FILENAME = "maintenance.jsonl"
+STATE_FILENAME = "maintenance_state.json"
+
+
+@dataclass
+class ObjectStats:
+    loose: int
+    loose_kib: int
+    packed: int
+    packs: int
+    pack_kib: int
+    has_midx: bool
+    graph_lag: int   # commits reachable from HEAD not covered by the last graph write
+
+
+# --------------------------------------------------
+# git helpers
+# --------------------------------------------------
+
+def _git(repo_path: str, *args: str, check: bool = True) -> str:
+    cmd = ["git", *args]
+    with METRICS.time_git(cmd):
+        result = subprocess.run(
+            cmd,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=check,
+        )
+    return result.stdout
+
+
+def _git_dir(repo_path: str) -> Path:
+    return Path(_git(repo_path, "rev-parse", "--absolute-git-dir").strip())
+
+
+def _head(repo_path: str) -> Optional[str]:
+    return _git(repo_path, "rev-parse", "--verify", "--quiet", "HEAD", check=False).strip() or None
+
+
+# --------------------------------------------------
+# Stats + policy
+# --------------------------------------------------
+
+def object_stats(repo_path: str) -> ObjectStats:
+    raw: Dict[str, int] = {}
+    for line in _git(repo_path, "count-objects", "-v").splitlines():
+        key, _, value = line.partition(":")
+        try:
+            raw[key.strip()] = int(value.strip())
+        except ValueError:
+            pass
+
+    git_dir = _git_dir(repo_path)
+    has_midx = (git_dir / "objects" / "pack" / "multi-pack-index").exists()
+
+    head = _head(repo_path)
+    graph_head = _read_state(git_dir).get("graph_head")
+    lag = None
+    if head is None or graph_head == head:
+        lag = 0
+    elif graph_head:
+        # empty output: graph_head is gone (history rewritten, gc'd) -> stale
+        lag = _git(repo_path, "rev-list", "--count", f"{graph_head}..{head}", check=False).strip()
+        lag = int(lag) if lag else None
+    if lag is None:
+        lag = int(_git(repo_path, "rev-list", "--count", head) or 0)
+
+    return ObjectStats(
+        loose=raw.get("count", 0),
+        loose_kib=raw.get("size", 0),
+        packed=raw.get("in-pack", 0),
+        packs=raw.get("packs", 0),
+        pack_kib=raw.get("size-pack", 0),
+        has_midx=has_midx,
+        graph_lag=lag,
+    )
+
+
+def plan_tasks(stats: ObjectStats) -> List[str]:
+    tasks = []
+
+    if stats.loose >= LOOSE_THRESHOLD:
+        tasks.append("repack-loose")
+
+    packs_after = stats.packs + (1 if "repack-loose" in tasks else 0)
+    if packs_after >= GEOMETRIC_PACKS:
+        tasks.append("repack-geometric")
+    elif packs_after >= 2 and not stats.has_midx:
+        tasks.append("multi-pack-index")
+
+    if stats.graph_lag >= COMMIT_GRAPH_LAG or (stats.graph_lag and tasks):
+        tasks.append("commit-graph")
+
+    return tasks
+
+
+_TASK_CMDS = {
+    "repack-loose": [["repack", "-d", "-q"], ["prune-packed", "-q"]],
+    "repack-geometric": [["repack", "-d", "-q", "--geometric=2", "--write-midx"]],
+    "multi-pack-index": [["multi-pack-index", "write"]],
+    "commit-graph": [["commit-graph", "write", "--reachable", "--split"]],
+}
+
+
+# --------------------------------------------------
+# Timings
+# --------------------------------------------------
+
+def _time_truth(repo_path: str) -> Optional[float]:
+    if _head(repo_path) is None:
+        return None
+    t0 = time.perf_counter()
+    load_head_structure(repo_path)
+    return time.perf_counter() - t0
+
+
+def _time_push(repo_path: str, remote: Optional[str]) -> Optional[float]:
+    if not remote:
+        return None
+    t0 = time.perf_counter()
+    subprocess.run(
+        ["git", "push", "--dry-run", "-q", remote, "HEAD"],
+        cwd=repo_path,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - t0
+
+
+# --------------------------------------------------
+# Public entry
+# --------------------------------------------------
+
+def maintain(
+    repo_path: str,
+    *,
+    remote: Optional[str] = None,
+    dry_run: bool = False,
+) -> Dict:
+    """
+    Decide and run the needed maintenance tasks; log before/after.
+    `remote` enables `git push --dry-run` timing.
+    """
+    git_dir = _git_dir(repo_path)
+    before = object_stats(repo_path)
+    tasks = plan_tasks(before)
+
+    record = {
+        "at": time.time(),
+        "head": _head(repo_path),
+        "tasks": tasks,
+        "before": asdict(before),
+        "truth_s_before": None,
+        "push_s_before": None,
+    }
+
+    if not tasks:
+        print(f"[maint] nothing to do (loose={before.loose}, packs={before.packs})")
+        return record
+
+    if dry_run:
+        print(f"[maint] would run: {', '.join(tasks)}")
+        return record
+
+    record["truth_s_before"] = _time_truth(repo_path)
+    record["push_s_before"] = _time_push(repo_path, remote)
+
+    t0 = time.perf_counter()
+    for task in tasks:
+        for args in _TASK_CMDS[task]:
+            _git(repo_path, *args)
+    record["maintenance_s"] = time.perf_counter() - t0
+
+    if "commit-graph" in tasks:
+        _write_state(git_dir, {"graph_head": record["head"]})
+
+    after = object_stats(repo_path)
+    record["after"] = asdict(after)
+    record["truth_s_after"] = _time_truth(repo_path)
+    record["push_s_after"] = _time_push(repo_path, remote)
+
+    _append_log(git_dir, record)
+    print(
+        f"[maint] {', '.join(tasks)} in {record['maintenance_s']:.2f}s "
+        f"(loose {before.loose} -> {after.loose}, packs {before.packs} -> {after.packs})"
+    )
+    return record
+
+
+# --------------------------------------------------
+# state / log files
+# --------------------------------------------------
+
+def _read_state(git_dir: Path) -> Dict:
+    path = git_dir / "gitcom" / STATE_FILENAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_state(git_dir: Path, state: Dict) -> None:
+    path = git_dir / "gitcom" / STATE_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(state), encoding="utf-8")
+
+
+def _append_log(git_dir: Path, record: Dict) -> None:
+    path = git_dir / "gitcom" / LOG_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="execution repo maintenance")
+    parser.add_argument("--repo", default=".")
+    parser.add_argument("--remote", default=None, help="time `git push --dry-run` to this remote")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    maintain(args.repo, remote=args.remote, dry_run=args.dry_run)
@@ -0,0 +1,242 @@
+# src/core/run_journal.py
+# -----------------------
+# Crash-safe progress journal for multi-day runs (checkpoint / resume)
+
+import hashlib
+import json
+import os
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+JOURNAL_FILENAME = "run_journal.json"
+
+STATUS_PENDING = "pending"   # commit for `day` is about to be created
+STATUS_DONE = "done"         # `day` fully committed
+
+
+class RunJournalError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Repo / state helpers
+# --------------------------------------------------
+
+def default_journal_path(repo_path: str = ".") -> Path:
+    """
+    <git-dir>/gitcom/run_journal.json — per repo, never tracked.
+    """
+    result = subprocess.run(
+        ["git", "rev-parse", "--absolute-git-dir"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return Path(result.stdout.strip()) / "gitcom" / JOURNAL_FILENAME
+
+
+def current_head(repo_path: str = ".") -> Optional[str]:
+    """
+    HEAD sha, or None for an unborn branch.
+    """
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", "HEAD"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    sha = result.stdout.strip()
+    return sha or None
+
+
+def snap_version(snap_path: Optional[Path]) -> Optional[str]:
+    """
+    Content hash of a snapshot file (None if there is no snapshot).
+    """
+    if snap_path is None or not Path(snap_path).exists():
+        return None
+    return hashlib.sha1(Path(snap_path).read_bytes()).hexdigest()
+
+
+def resume_seed(point: Optional[Dict[str, Any]], seed: Optional[int]) -> Optional[int]:
+    """
+    Seed of a resumed run: the journal's, so every remaining day draws
+    from the same (seed, repo, day) streams as the interrupted run. An
+    explicit different seed is refused.
+    """
+    if not point or point.get("seed") is None:
+        return seed
+    if seed is not None and int(seed) != point["seed"]:
+        raise RunJournalError(
+            f"[journal] run was started with seed {point['seed']}, not {seed}"
+        )
+    return point["seed"]
+
+
+# --------------------------------------------------
+# Journal
+# --------------------------------------------------
+
+class RunJournal:
+    """
+    One JSON document, rewritten atomically (tmp + fsync + rename).
+
+    Two-phase per day:
+    - mark_pending(day, ...) right before the commit
+    - record_day(day, ...)   right after it
+    so a crash between the two can be told apart on resume by HEAD.
+
+    path=None keeps the journal in memory only (dry runs: nothing to
+    resume, no git repo needed).
+
+    seed: the run seed, written with every checkpoint (see resume_seed).
+    """
+
+    def __init__(self, path: Optional[Path], run_key: Dict[str, Any]):
+        self.path = Path(path) if path is not None else None
+        self.run_key = run_key
+        self.seed: Optional[int] = None
+        self.state: Dict[str, Any] = {}
+
+    # -------- read --------
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if self.path is None or not self.path.exists():
+            return None
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        if state.get("run_key") != self.run_key:
+            raise RunJournalError(
+                f"[journal] {self.path} belongs to another run: "
+                f"{state.get('run_key')} != {self.run_key}"
+            )
+
+        self.state = state
+        return state
+
+    def resume_point(self, repo_path: str = ".") -> Optional[Dict[str, Any]]:
+        """
+        Return {"next_position", "next_day", "seed"} to restart from,
+        or None when there is nothing to resume.
+        """
+        state = self.load()
+        if not state:
+            return None
+
+        head = current_head(repo_path)
+
+        if state["status"] == STATUS_PENDING:
+            if head != state["head_sha"]:
+                # commit landed, journal write did not
+                print(f"[journal] pending day {state['day']} found committed at {head}")
+                return {
+                    "next_position": state["position"] + 1,
+                    "next_day": state["next_day"],
+                    "seed": state.get("seed"),
+                }
+            print(f"[journal] pending day {state['day']} not committed, redo")
+            return {
+                "next_position": state["position"],
+                "next_day": state["day"],
+                "seed": state.get("seed"),
+            }
+
+        if head != state["head_sha"]:
+            raise RunJournalError(
+                f"[journal] HEAD moved since checkpoint: "
+                f"{state['head_sha']} -> {head}, refusing to resume"
+            )
+
+        return {
+            "next_position": state["position"] + 1,
+            "next_day": state["next_day"],
+            "seed": state.get("seed"),
+        }
+
+    # -------- write --------
+
+    def mark_pending(
+        self,
+        *,
+        position: int,
+        day: str,
+        next_day: str,
+        head_sha: Optional[str],
+    ) -> None:
+        self._write({
+            "status": STATUS_PENDING,
+            "position": position,
+            "day": day,
+            "next_day": next_day,
+            "head_sha": head_sha,
+            "snap_version": self.state.get("snap_version"),
+        })
+
+    def record_day(
+        self,
+        *,
+        position: int,
+        day: str,
+        next_day: str,
+        head_sha: Optional[str],
+        snap_version: Optional[str],
+    ) -> None:
+        self._write({
+            "status": STATUS_DONE,
+            "position": position,
+            "day": day,
+            "next_day": next_day,
+            "head_sha": head_sha,
+            "snap_version": snap_version,
+        })
+
+    def finish(self) -> None:
+        """
+        Run completed: drop the journal so the next run starts clean.
+        """
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+
+    def _write(self, fields: Dict[str, Any]) -> None:
+        state = {
+            "run_key": self.run_key,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "seed": self.seed,
+            **fields,
+        }
+
+        if self.path is None:
+            self.state = state
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path.parent)
+
+        self.state = state
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # e.g. windows
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
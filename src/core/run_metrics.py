@@ -0,0 +1,267 @@
+# src/core/run_metrics.py
+# -----------------------
+# Opt-in live metrics for long-running backfills (OpenMetrics text)
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# --------------------------------------------------
+# Config
+# --------------------------------------------------
+
+METRICS_PORT_ENV = "GITCOM_METRICS_PORT"
+METRICS_FILE_ENV = "GITCOM_METRICS_FILE"
+
+DEFAULT_FILE_INTERVAL = 10.0
+
+# git subprocess latency buckets (seconds)
+GIT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+_HELP = {
+    "gitcom_commits_executed": ("counter", "Commits created in the execution repo"),
+    "gitcom_days_planned": ("counter", "Simulated days that produced a work plan"),
+    "gitcom_days_skipped": ("counter", "Simulated days without commits, by reason"),
+    "gitcom_push_bytes": ("counter", "Estimated bytes sent by git push"),
+    "gitcom_git_command_seconds": ("histogram", "git subprocess latency by subcommand"),
+    "gitcom_queue_depth": ("gauge", "Items waiting between pipeline stages"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _git_subcommand(cmd: List[str]) -> str:
+    """
+    ["git", "-C", "repo", "commit", "-m", ...] -> "commit"
+    """
+    args = iter(cmd[1:])
+    for arg in args:
+        if arg in ("-C", "-c"):
+            next(args, None)
+            continue
+        if arg.startswith("-"):
+            continue
+        return arg
+    return "unknown"
+
+
+# --------------------------------------------------
+# Registry
+# --------------------------------------------------
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class RunMetrics:
+    """
+    In-process metrics registry.
+
+    Recording is always on (a dict update per event); exporting is
+    opt-in via serve_http() / write_file() or enable_from_env().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self.started_at = time.time()
+        self.exporting = False      # set by an exporter; gates costly probes
+
+    # -------- recording --------
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, buckets=GIT_LATENCY_BUCKETS, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def time_git(self, cmd: List[str]):
+        """
+        Time one git subprocess:
+
+            with METRICS.time_git(cmd):
+                subprocess.run(cmd, ...)
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(
+                "gitcom_git_command_seconds",
+                time.perf_counter() - t0,
+                subcommand=_git_subcommand(cmd),
+            )
+
+    # -------- export --------
+
+    def render(self) -> str:
+        """
+        Render all series in OpenMetrics text format.
+        """
+        lines: List[str] = []
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}_total{_fmt_labels(key)} {value}")
+
+            for name, series in sorted(self._gauges.items()):
+                self._header(lines, name, "gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_fmt_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip(hist.buckets, hist.counts):
+                        cumulative += n
+                        le = _fmt_labels(key, ("le", repr(float(bound))))
+                        lines.append(f"{name}_bucket{le} {cumulative}")
+                    le = _fmt_labels(key, ("le", "+Inf"))
+                    lines.append(f"{name}_bucket{le} {hist.count}")
+                    lines.append(f"{name}_count{_fmt_labels(key)} {hist.count}")
+                    lines.append(f"{name}_sum{_fmt_labels(key)} {hist.sum}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _header(lines: List[str], name: str, default_type: str):
+        metric_type, help_text = _HELP.get(name, (default_type, name))
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"# HELP {name} {help_text}")
+
+
+METRICS = RunMetrics()
+
+
+# --------------------------------------------------
+# Exporters
+# --------------------------------------------------
+
+def serve_http(port: int, host: str = "127.0.0.1", metrics: RunMetrics = METRICS):
+    """
+    Serve /metrics on localhost from a daemon thread.
+    Returns the server (call .shutdown() to stop).
+    """
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header(
+                "Content-Type",
+                "application/openmetrics-text; version=1.0.0; charset=utf-8",
+            )
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    metrics.exporting = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[metrics] serving http://{host}:{server.server_port}/metrics")
+    return server
+
+
+def write_file(
+    path: Path,
+    interval: float = DEFAULT_FILE_INTERVAL,
+    metrics: RunMetrics = METRICS,
+) -> threading.Event:
+    """
+    Periodically rewrite `path` (atomic replace) from a daemon thread.
+    Set the returned event to stop; a final write happens on stop.
+    """
+    path = Path(path)
+    stop = threading.Event()
+
+    def _dump():
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(metrics.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _loop():
+        while not stop.wait(interval):
+            _dump()
+        _dump()
+
+    metrics.exporting = True
+    threading.Thread(target=_loop, daemon=True).start()
+    print(f"[metrics] writing {path} every {interval}s")
+    return stop
+
+
+def enable_from_env(metrics: RunMetrics = METRICS) -> None:
+    """
+    Start exporters requested via GITCOM_METRICS_PORT / GITCOM_METRICS_FILE.
+    Does nothing when neither is set.
+    """
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        serve_http(int(port), metrics=metrics)
+
+    file_path = os.environ.get(METRICS_FILE_ENV)
+    if file_path:
+        write_file(Path(file_path), metrics=metrics)
@@ -0,0 +1,381 @@
+# src/core/run_refs.py
+# --------------------
+# Run refs + snapshot journal: O(1) rollback of a simulated range
+#
+# Every (non dry) run records, before its first commit:
+#   refs/gitcom/runs/<id>/base   HEAD before the run
+#   refs/gitcom/runs/<id>/snap   blob with latest_struct_snap.txt at that time
+#   <git-dir>/gitcom/runs/<id>.json
+#       {"id", "branch", "base", "snap_dir", "snap_version", "head", ...}
+# and refs/gitcom/runs/<id>/head when it finishes.
+#
+#   python -m src.core.run_refs list
+#   python -m src.core.run_refs rollback --last [--remote origin] [--force]
+#
+# Rollback resets the branch to `base` and writes the snapshot blob back;
+# nothing is rescanned. HEAD-keyed caches (plan_index, msg_index,
+# history_stats) notice the rewrite and rebuild on their next load.
+# Later runs stacked on top of the run (their base descends from its
+# base) go with it and are marked rolled back too.
+#
+# Only commits of the run (and of those later runs) are ever dropped: the
+# branch tip and the remote sha must be ancestors of one of their
+# refs/gitcom/runs/<id>/head refs, force or not.
+#
+# Pushed ranges: the remote branch is compared with `base` first
+#   remote at/behind base           -> local rollback only
+#   remote inside the run's range   -> refused, or with force:
+#                                      push --force-with-lease=<branch>:<remote sha>
+#   remote has unknown commits      -> always refused
+
+import json
+import os
+import secrets
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.run_journal import snap_version
+from src.core.run_metrics import METRICS
+from src.core.snap_state import SNAP_FILENAME
+
+
+REF_PREFIX = "refs/gitcom/runs"
+RUNS_DIRNAME = "runs"
+
+
+class RollbackError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# git helpers
+# --------------------------------------------------
+
+def _git(repo_path: str, *args: str, check: bool = True) -> str:
+    cmd = ["git", *args]
+    with METRICS.time_git(cmd):
+        result = subprocess.run(
+            cmd,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    if check and result.returncode != 0:
+        raise RollbackError(
+            f"[rollback] {' '.join(cmd)} failed: {result.stderr.decode(errors='replace').strip()}"
+        )
+    return result.stdout.decode("utf-8", errors="replace").strip() if result.returncode == 0 else ""
+
+
+def _rev(repo_path: str, rev: str) -> Optional[str]:
+    return _git(repo_path, "rev-parse", "--verify", "--quiet", rev, check=False) or None
+
+
+def _is_ancestor(repo_path: str, old: str, new: str) -> bool:
+    return subprocess.run(
+        ["git", "merge-base", "--is-ancestor", old, new],
+        cwd=repo_path,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    ).returncode == 0
+
+
+def _runs_dir(repo_path: str) -> Path:
+    return Path(_git(repo_path, "rev-parse", "--absolute-git-dir")) / "gitcom" / RUNS_DIRNAME
+
+
+def _save_record(repo_path: str, record: Dict[str, Any]) -> None:
+    path = _runs_dir(repo_path) / f"{record['id']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_record(repo_path: str, run_id: str) -> Dict[str, Any]:
+    path = _runs_dir(repo_path) / f"{run_id}.json"
+    if not path.exists():
+        raise RollbackError(f"[rollback] unknown run {run_id!r}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def list_runs(repo_path: str) -> List[Dict[str, Any]]:
+    """
+    All recorded runs, oldest first (ids sort by start time).
+    """
+    runs_dir = _runs_dir(repo_path)
+    if not runs_dir.exists():
+        return []
+    return [
+        json.loads(p.read_text(encoding="utf-8"))
+        for p in sorted(runs_dir.glob("*.json"))
+    ]
+
+
+# --------------------------------------------------
+# Recording
+# --------------------------------------------------
+
+def new_run_id() -> str:
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S.%f}-{secrets.token_hex(3)}"
+
+
+def begin_run(repo_path: str, snap_dir: Path, run_id: Optional[str] = None, **meta: Any) -> Dict[str, Any]:
+    """
+    Record the pre-run ref and snapshot. Extra keyword args (begin, end,
+    seed, ...) are stored in the run record.
+    """
+    run_id = run_id or new_run_id()
+    snap_path = Path(snap_dir) / SNAP_FILENAME
+
+    record: Dict[str, Any] = {
+        "id": run_id,
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "branch": _git(repo_path, "symbolic-ref", "-q", "HEAD", check=False) or None,
+        "base": _rev(repo_path, "HEAD"),
+        "snap_dir": str(Path(snap_dir).resolve()),
+        "snap_version": snap_version(snap_path),
+        "snap_blob": None,
+        "head": None,
+        "status": "running",
+        **meta,
+    }
+
+    if record["base"]:
+        _git(repo_path, "update-ref", f"{REF_PREFIX}/{run_id}/base", record["base"])
+    if snap_path.exists():
+        record["snap_blob"] = _git(repo_path, "hash-object", "-w", "--", str(snap_path.resolve()))
+        _git(repo_path, "update-ref", f"{REF_PREFIX}/{run_id}/snap", record["snap_blob"])
+
+    _save_record(repo_path, record)
+    return record
+
+
+def finish_run(repo_path: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    head = _rev(repo_path, "HEAD")
+    if head:
+        _git(repo_path, "update-ref", f"{REF_PREFIX}/{record['id']}/head", head)
+    record.update(head=head, status="done")
+    _save_record(repo_path, record)
+    return record
+
+
+# --------------------------------------------------
+# Rollback
+# --------------------------------------------------
+
+def remote_state(repo_path: str, remote: str, branch: str, base: str) -> Dict[str, Any]:
+    """
+    Where the remote branch is relative to the run's base.
+    """
+    if remote not in _git(repo_path, "remote").split():
+        return {"remote_sha": None, "state": "no_remote", "pushed_commits": 0}
+
+    listed = _git(repo_path, "ls-remote", remote, branch)
+    remote_sha = listed.split()[0] if listed else None
+
+    if remote_sha is None or remote_sha == base:
+        state = "not_pushed"
+    elif _rev(repo_path, f"{remote_sha}^{{commit}}") is None:
+        state = "unknown"                       # commits we do not have locally
+    elif _is_ancestor(repo_path, remote_sha, base):
+        state = "not_pushed"
+    elif _is_ancestor(repo_path, base, remote_sha):
+        state = "pushed"
+    else:
+        state = "unknown"
+
+    pushed = int(_git(repo_path, "rev-list", "--count", f"{base}..{remote_sha}")) if state == "pushed" else 0
+    return {"remote_sha": remote_sha, "state": state, "pushed_commits": pushed}
+
+
+def later_runs(repo_path: str, record: Dict[str, Any], base: str) -> List[Dict[str, Any]]:
+    """
+    Live runs started after `record` on the same branch whose base
+    descends from `base`: a rollback to `base` drops their commits too.
+    """
+    out = []
+    for r in list_runs(repo_path):
+        if r["id"] <= record["id"] or r.get("status") == "rolled_back":
+            continue
+        if r.get("branch") != record.get("branch"):
+            continue
+        r_base = _rev(repo_path, f"{REF_PREFIX}/{r['id']}/base")
+        if r_base and _is_ancestor(repo_path, base, r_base):
+            out.append(r)
+    return out
+
+
+def _within_runs(repo_path: str, sha: str, heads: List[str]) -> bool:
+    return any(_is_ancestor(repo_path, sha, head) for head in heads)
+
+
+def rollback(
+    repo_path: str,
+    run_id: str,
+    *,
+    remote: Optional[str] = "origin",
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Restore the branch and the snapshot file to their pre-run state.
+
+    remote: checked for already-pushed commits of the run (None = skip)
+    force:  rewrite the remote branch (--force-with-lease) when the run
+            was pushed, roll back even if the branch no longer contains
+            the base, and roll back a run that never finished (no head
+            ref to check against)
+
+    Commits outside the run and the later runs stacked on it are never
+    dropped, force or not.
+    """
+    record = load_record(repo_path, run_id)
+    branch = record.get("branch")
+    base = _rev(repo_path, f"{REF_PREFIX}/{run_id}/base")
+
+    if record.get("status") == "rolled_back":
+        raise RollbackError(f"[rollback] run {run_id} was already rolled back")
+    if base is None or not branch:
+        raise RollbackError(
+            f"[rollback] run {run_id} started on an unborn or detached HEAD; nothing to reset to"
+        )
+
+    stacked = later_runs(repo_path, record, base)
+    heads = [
+        h for h in (_rev(repo_path, f"{REF_PREFIX}/{r['id']}/head") for r in [record, *stacked])
+        if h
+    ]
+    if not heads and not force:
+        raise RollbackError(
+            f"[rollback] run {run_id} never finished (no head ref); use force to roll it back"
+        )
+
+    def _check_inside(sha: str, where: str) -> None:
+        if heads and not _within_runs(repo_path, sha, heads):
+            raise RollbackError(
+                f"[rollback] {where} at {sha[:12]} has commits after run {run_id}"
+                f"{' and its later runs' if stacked else ''}; refusing"
+            )
+
+    branch_sha = _rev(repo_path, branch)
+    if branch_sha and not _is_ancestor(repo_path, base, branch_sha) and not force:
+        raise RollbackError(f"[rollback] {branch} no longer contains the run base {base[:12]}")
+    if branch_sha:
+        _check_inside(branch_sha, branch)
+
+    # 1. remote
+    remote_info = None
+    if remote:
+        short = branch[len("refs/heads/"):] if branch.startswith("refs/heads/") else branch
+        remote_info = remote_state(repo_path, remote, branch, base)
+
+        if remote_info["state"] == "unknown":
+            raise RollbackError(
+                f"[rollback] {remote}/{short} has commits that are not part of run {run_id}; refusing"
+            )
+        if remote_info["state"] == "pushed":
+            _check_inside(remote_info["remote_sha"], f"{remote}/{short}")
+            if not force:
+                raise RollbackError(
+                    f"[rollback] {remote_info['pushed_commits']} commits of run {run_id} are on "
+                    f"{remote}/{short}; use force to rewrite the remote"
+                )
+            _git(
+                repo_path,
+                "push",
+                f"--force-with-lease={branch}:{remote_info['remote_sha']}",
+                remote,
+                f"{base}:{branch}",
+            )
+            print(f"[rollback] {remote}/{short} reset to {base[:12]}")
+
+    # 2. local branch
+    current = _git(repo_path, "symbolic-ref", "-q", "HEAD", check=False)
+    bare = _git(repo_path, "rev-parse", "--is-bare-repository") == "true"
+    if current == branch and not bare:
+        _git(repo_path, "reset", "-q", "--hard", base)
+    else:
+        _git(repo_path, "update-ref", branch, base)
+
+    # 3. snapshot
+    snap_path = Path(record["snap_dir"]) / SNAP_FILENAME
+    blob = _rev(repo_path, f"{REF_PREFIX}/{run_id}/snap")
+    if blob:
+        content = subprocess.run(
+            ["git", "cat-file", "blob", blob],
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+        snap_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = snap_path.with_name(snap_path.name + ".tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, snap_path)
+    elif snap_path.exists():
+        snap_path.unlink()   # the run created the snapshot
+
+    if snap_version(snap_path) != record.get("snap_version"):
+        raise RollbackError(f"[rollback] restored snapshot does not match version {record.get('snap_version')}")
+
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    record.update(
+        status="rolled_back",
+        rolled_back=now,
+        remote=remote_info,
+        cascaded=[r["id"] for r in stacked],
+    )
+    _save_record(repo_path, record)
+
+    for r in stacked:
+        r.update(status="rolled_back", rolled_back=now, rolled_back_with=run_id)
+        _save_record(repo_path, r)
+
+    print(f"[rollback] run {run_id}: {branch} -> {base[:12]}, snapshot {record.get('snap_version')}")
+    if stacked:
+        print(f"[rollback] later runs rolled back with it: {', '.join(r['id'] for r in stacked)}")
+    return record
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="recorded runs and rollback")
+    parser.add_argument("--repo", default=".")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list")
+
+    p_rb = sub.add_parser("rollback")
+    target = p_rb.add_mutually_exclusive_group(required=True)
+    target.add_argument("--run", default=None)
+    target.add_argument("--last", action="store_true", help="most recent run that is not rolled back")
+    p_rb.add_argument("--remote", default="origin")
+    p_rb.add_argument("--no-remote", action="store_true", help="skip the pushed-range check")
+    p_rb.add_argument("--force", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        for r in list_runs(args.repo):
+            base = (r.get("base") or "-")[:12]
+            head = (r.get("head") or "-")[:12]
+            print(f"{r['id']}  {r['status']:<12} {r.get('branch')}  {base}..{head}  {r.get('begin', '')} {r.get('end', '')}")
+    else:
+        run_id = args.run
+        if args.last:
+            live = [r for r in list_runs(args.repo) if r["status"] != "rolled_back"]
+            if not live:
+                parser.error("no run to roll back")
+            run_id = live[-1]["id"]
+        rollback(
+            args.repo,
+            run_id,
+            remote=None if args.no_remote else args.remote,
+            force=args.force,
+        )
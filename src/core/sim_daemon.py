@@ -0,0 +1,335 @@
+# src/core/sim_daemon.py
+# ----------------------
+# Long-running simulator daemon: warm state + local job socket
+#
+# One process keeps config, message library, snapshots and per-repo
+# git helpers warm, and accepts jobs over a Unix domain socket:
+#
+#   python -m src.core.sim_daemon serve
+#   python -m src.core.sim_daemon submit --repo gitcom-test \
+#       --begin 2022-06-01 --end 2022-06-30 --mode soft_run
+#
+# Wire protocol: newline-delimited JSON.
+#   client -> {"repo": ..., "begin": ..., "end": ..., "mode": ..., "snap_dir": ...,
+#              "bulk": bool, "seed": int | null}
+#   server -> {"event": "start" | "day" | "done" | "error", ...}  (streamed)
+
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.core.bulk_mode import bulk_mode
+from src.core.repo_truth import load_head_structure
+from src.core.snap_state import SNAP_FILENAME, load_last_snap
+from src.core.time_set import TimeInjection
+
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+RES_DIR = SRC_DIR / "res"
+CONFIG_PATH = RES_DIR / "repo_config.json"
+REPOPATH_FILE = SRC_DIR / "locked_res_ver1.3" / "gitcom_repopath.txt"
+
+SOCKET_ENV = "GITCOM_SIM_SOCKET"
+DEFAULT_SOCKET = "/tmp/gitcom_sim.sock"
+
+
+class DaemonError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Persistent git helper (one per repo)
+# --------------------------------------------------
+
+class GitHelper:
+    """
+    Keeps `git cat-file --batch-check` running for a repo so HEAD can be
+    resolved without a fork, and caches the ls-tree listing per HEAD sha.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._lock = threading.Lock()
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch-check"],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        self._tree: Tuple[Optional[str], List[str]] = (None, [])
+
+    def resolve(self, rev: str) -> Optional[str]:
+        with self._lock:
+            self._proc.stdin.write(rev + "\n")
+            self._proc.stdin.flush()
+            line = self._proc.stdout.readline().strip()
+
+        if not line or line.endswith("missing") or line.endswith("ambiguous"):
+            return None
+        return line.split(" ", 1)[0]
+
+    def head_structure(self) -> List[str]:
+        head = self.resolve("HEAD")
+        if head is None:
+            return []
+
+        cached_head, paths = self._tree
+        if cached_head != head:
+            paths = load_head_structure(self.repo_path)
+            self._tree = (head, paths)
+        return paths
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+
+# --------------------------------------------------
+# Warm state
+# --------------------------------------------------
+
+class WarmState:
+    def __init__(self, config_path: Path = CONFIG_PATH):
+        with open(config_path, "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+
+        self.time_injection = TimeInjection.from_config(self.config)
+
+        self._lock = threading.Lock()
+        self._helpers: Dict[str, GitHelper] = {}
+        self._repo_locks: Dict[str, threading.Lock] = {}
+        self._snaps: Dict[str, Tuple[int, set]] = {}
+
+        # importing the pipeline loads the message library once
+        from src.core import multidays_commit_pusher
+        self._pipeline = multidays_commit_pusher
+
+    # -------- repos --------
+
+    def helper(self, repo_path: str) -> GitHelper:
+        with self._lock:
+            if repo_path not in self._helpers:
+                self._helpers[repo_path] = GitHelper(repo_path)
+            return self._helpers[repo_path]
+
+    def repo_lock(self, repo_path: str) -> threading.Lock:
+        with self._lock:
+            return self._repo_locks.setdefault(repo_path, threading.Lock())
+
+    # -------- snapshots --------
+
+    def snap(self, repo_path: str, snap_dir: Path) -> set:
+        """
+        Cached snapshot, re-read only if the file changed on disk.
+        Missing snapshot -> seeded from HEAD.
+        """
+        snap_path = Path(snap_dir) / SNAP_FILENAME
+        if not snap_path.exists():
+            return set(self.helper(repo_path).head_structure())
+
+        mtime = snap_path.stat().st_mtime_ns
+        cached = self._snaps.get(str(snap_path))
+        if cached and cached[0] == mtime:
+            return set(cached[1])
+
+        snap = load_last_snap(snap_dir)
+        self._snaps[str(snap_path)] = (mtime, snap)
+        return set(snap)
+
+    def remember_snap(self, snap_dir: Path, snap: set) -> None:
+        snap_path = Path(snap_dir) / SNAP_FILENAME
+        if snap_path.exists():
+            self._snaps[str(snap_path)] = (snap_path.stat().st_mtime_ns, set(snap))
+
+    # -------- jobs --------
+
+    def run_job(self, job: Dict[str, Any], send) -> Dict[str, Any]:
+        for key in ("repo", "begin", "end"):
+            if key not in job:
+                raise DaemonError(f"job missing '{key}'")
+
+        repo_path = resolve_repo(job["repo"])
+        snap_dir = Path(job.get("snap_dir") or default_snap_dir(repo_path))
+        run_mode = job.get("mode", "soft_run")
+
+        with self.repo_lock(repo_path):
+            last_snap = self.snap(repo_path, snap_dir)
+            send({
+                "event": "start",
+                "repo": repo_path,
+                "head": self.helper(repo_path).resolve("HEAD"),
+                "snap_size": len(last_snap),
+            })
+
+            with bulk_mode(repo_path) if job.get("bulk") else nullcontext():
+                summary = self._pipeline.run_days(
+                    repo_path=repo_path,
+                    begin=job["begin"],
+                    end=job["end"],
+                    snap_dir=snap_dir,
+                    run_mode=run_mode,
+                    time_injection=self.time_injection,
+                    last_snap=last_snap,
+                    progress=send,
+                    seed=job.get("seed", self.config.get("seed")),
+                )
+
+            snap = summary.pop("snap")
+            if run_mode != "dry_run":
+                self.remember_snap(snap_dir, snap)
+
+        return summary
+
+    def close(self):
+        for helper in self._helpers.values():
+            helper.close()
+
+
+def resolve_repo(repo: str) -> str:
+    """
+    Accept a path, or a name from gitcom_repopath.txt.
+    """
+    if os.path.isdir(repo):
+        return os.path.abspath(repo)
+
+    from src.core.final_pusher import _resolve_repo_path
+    return _resolve_repo_path(repo_name=repo, repopath_file=REPOPATH_FILE)
+
+
+def default_snap_dir(repo_path: str) -> Path:
+    git_dir = subprocess.run(
+        ["git", "rev-parse", "--absolute-git-dir"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    return Path(git_dir) / "gitcom"
+
+
+# --------------------------------------------------
+# Server
+# --------------------------------------------------
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        state: WarmState = self.server.state
+
+        def send(event: Dict[str, Any]):
+            self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            job = json.loads(line)
+            summary = state.run_job(job, send)
+            send({"event": "done", **summary})
+        except Exception as e:
+            send({"event": "error", "error": f"{type(e).__name__}: {e}"})
+
+
+class SimDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, state: WarmState):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _JobHandler)
+        self.state = state
+
+    def server_close(self):
+        super().server_close()
+        self.state.close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def serve(socket_path: str) -> None:
+    from src.core.run_metrics import enable_from_env
+
+    enable_from_env()
+    state = WarmState()
+    server = SimDaemon(socket_path, state)
+    print(f"[daemon] listening on {socket_path}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[daemon] stopping")
+    finally:
+        server.server_close()
+
+
+# --------------------------------------------------
+# Client
+# --------------------------------------------------
+
+def submit_job(socket_path: str, job: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Send one job; yield server events until "done" / "error".
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(job) + "\n").encode("utf-8"))
+
+        with sock.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                event = json.loads(line)
+                yield event
+                if event.get("event") in ("done", "error"):
+                    return
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="gitcom simulator daemon")
+    parser.add_argument("--socket", default=os.environ.get(SOCKET_ENV, DEFAULT_SOCKET))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("serve")
+
+    p_submit = sub.add_parser("submit")
+    p_submit.add_argument("--repo", required=True, help="path or gitcom_repopath.txt name")
+    p_submit.add_argument("--begin", required=True)
+    p_submit.add_argument("--end", required=True)
+    p_submit.add_argument("--mode", default="soft_run", choices=["dry_run", "soft_run", "full_run"])
+    p_submit.add_argument("--snap-dir", default=None)
+    p_submit.add_argument("--bulk", action="store_true", help="bulk-mode git profile for this job")
+    p_submit.add_argument("--seed", type=int, default=None, help="run seed (reproducible job)")
+
+    args = parser.parse_args()
+
+    if args.cmd == "serve":
+        serve(args.socket)
+    else:
+        job = {
+            "repo": args.repo,
+            "begin": args.begin,
+            "end": args.end,
+            "mode": args.mode,
+            "snap_dir": args.snap_dir,
+            "bulk": args.bulk,
+        }
+        if args.seed is not None:
+            job["seed"] = args.seed
+        for event in submit_job(args.socket, job):
+            print(json.dumps(event))
+            if event.get("event") == "error":
+                raise SystemExit(1)
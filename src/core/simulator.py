@@ -4,7 +4,7 @@
 import os
 import subprocess
 import json
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 
 # =========================
 # Runtime mode
@@ -24,12 +24,27 @@ RES_DIR = os.path.join(os.path.dirname(CORE_DIR), "res")
 # =========================
 
 from msg.msg_selector import MsgSelector
+from msg_index import MsgIndex
+from rng_streams import RngStreams, resolve_seed
+from run_metrics import METRICS, enable_from_env
+from run_journal import RunJournal, current_head, default_journal_path, resume_seed
 
 with open(os.path.join(RES_DIR, "msg_lexicon.json"), "r", encoding="utf-8") as f:
     LEXICON = json.load(f)
 
 MSG_SELECTOR = MsgSelector(LEXICON)
 
+# =========================
+# Time injection (repo_config.json)
+# =========================
+
+from time_set import TimeInjection, commit_times, format_git_date
+
+with open(os.path.join(RES_DIR, "repo_config.json"), "r", encoding="utf-8") as f:
+    CONFIG = json.load(f)
+
+TIME_INJECTION = TimeInjection.from_config(CONFIG)
+
 TIMELINE_CTX = {
     "phase_type": "bootstrap",
     "tempo": "steady",
@@ -44,28 +59,64 @@ REMOTE = "origin"
 
 
 def run(cmd):
-    subprocess.run(cmd, check=True)
+    with METRICS.time_git(cmd):
+        subprocess.run(cmd, check=True)
 
 
-def inject_commit_time(day):
-    dt = datetime.strptime(day, "%Y-%m-%d")
-    return dt.replace(
-        hour=12, minute=0, second=0,
-        tzinfo=timezone.utc
-    ).isoformat()
+def inject_commit_times(days, streams=None):
+    """
+    One commit per day, the whole range in one commit_times() pass.
+    """
+    epochs = commit_times(days, [1] * len(days), TIME_INJECTION, streams=streams)
+    return {d: format_git_date(e, TIME_INJECTION) for d, e in zip(days, epochs)}
 
 
 # =========================
 # Core simulation
 # =========================
 
-def simulate(start_date, end_date):
+def simulate(start_date, end_date, resume=False, journal_path=None, seed=None):
     day = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
     delta = timedelta(days=1)
 
+    # -------------------------
+    # Progress journal
+    # -------------------------
+    journal = RunJournal(
+        journal_path or (default_journal_path() if RUN_MODE != "dry_run" else None),
+        run_key={"engine": "simulator", "start": start_date, "end": end_date},
+    )
+    position = 0
+
+    # history-wide message dedup: drafts already used in this repo are re-drawn
+    msg_index = MsgIndex(".").load() if RUN_MODE != "dry_run" else None
+    MSG_SELECTOR.seen = msg_index
+
+    point = journal.resume_point() if resume else None
+    if point:
+        position = point["next_position"]
+        day = datetime.strptime(point["next_day"], "%Y-%m-%d")
+        print(f"[journal] resuming at {point['next_day']} (day #{position})")
+    elif resume:
+        print("[journal] nothing to resume, starting fresh")
+
+    # per-(day, purpose) streams: a resumed or partial run reproduces
+    # exactly what a full run would have done on the same days
+    journal.seed = resolve_seed(resume_seed(point, seed), CONFIG)
+    streams = RngStreams(journal.seed, repo=os.path.basename(os.getcwd()))
+
+    # per-day streams: drawing from `day` on matches a full run exactly
+    days = []
+    d = day
+    while d <= end:
+        days.append(d.strftime("%Y-%m-%d"))
+        d += delta
+    commit_times_by_day = inject_commit_times(days, streams)
+
     while day <= end:
         day_str = day.strftime("%Y-%m-%d")
+        next_day_str = (day + delta).strftime("%Y-%m-%d")
 
         # -------------------------
         # Example action
@@ -79,10 +130,20 @@ def simulate(start_date, end_date):
         # -------------------------
         # Generate commit message
         # -------------------------
-        commit_msg = MSG_SELECTOR.generate(action, TIMELINE_CTX)
-        commit_time = inject_commit_time(day_str)
+        commit_msg = MSG_SELECTOR.generate(
+            action, TIMELINE_CTX, rng=streams.stream(day_str, "message")
+        )
+        commit_time = commit_times_by_day[day_str]
 
         print(f"\n[{day_str}] {commit_msg}")
+        METRICS.inc("gitcom_days_planned", engine="simulator")
+
+        journal.mark_pending(
+            position=position,
+            day=day_str,
+            next_day=next_day_str,
+            head_sha=current_head(),
+        )
 
         if RUN_MODE == "dry_run":
             print("  [DRY-RUN] skip commit & push")
@@ -96,21 +157,52 @@ def simulate(start_date, end_date):
                 "-m", commit_msg,
                 "--date", commit_time
             ])
+            METRICS.inc("gitcom_commits_executed", engine="simulator")
+            msg_index.add(commit_msg)
 
             if RUN_MODE == "full_run":
                 run(["git", "push", REMOTE, "main"])
             else:
                 print("  [SOFT-RUN] commit created locally, push skipped")
 
+        journal.record_day(
+            position=position,
+            day=day_str,
+            next_day=next_day_str,
+            head_sha=current_head(),
+            snap_version=None,
+        )
+
+        position += 1
         day += delta
 
+    if msg_index is not None:
+        msg_index.save()
+    journal.finish()
+
 
 # =========================
 # Entry
 # =========================
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", default="2022-04-25")
+    parser.add_argument("--end", default="2022-04-25")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the last checkpoint in .git/gitcom/run_journal.json",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="run seed (reproducible runs)")
+    args = parser.parse_args()
+
+    enable_from_env()
     simulate(
-        start_date="2022-04-25",
-        end_date="2022-04-25"
+        start_date=args.start,
+        end_date=args.end,
+        resume=args.resume,
+        seed=args.seed,
     )
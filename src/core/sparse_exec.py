@@ -0,0 +1,172 @@
+# src/core/sparse_exec.py
+# -----------------------
+# Sparse-checkout (cone mode) execution on large repos
+#
+#   python -m src.core.sparse_exec cone --plan src/locked_res_ver1.3/planned_temp_commit.txt
+#   python -m src.core.sparse_exec apply --repo /path/to/monorepo --plan <plan>
+#   python -m src.core.sparse_exec disable --repo /path/to/monorepo
+#
+# The cone is derived from the paths a run touches: the parent directory
+# of every planned path, nested directories folded into their ancestor
+# (top-level files are always in a cone). It is applied with
+# `git sparse-checkout set --cone --sparse-index`, so worktree and index
+# only expand inside the cone; everything else stays one sparse-directory
+# entry per tree.
+#
+# With execute_one_commit(sparse=True) the executor stages exactly the
+# paths of the pack (`git update-index --add --remove`) instead of
+# `git add .`, so per-commit cost follows the touched cone, not the repo.
+#
+# A cone is only ever widened by apply_cone(): directories from an earlier
+# run stay checked out.
+
+import subprocess
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.core.action_layout import ADD_DIR
+from src.core.run_metrics import METRICS
+
+
+class SparseExecError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Cone derivation
+# --------------------------------------------------
+
+def action_paths(actions: Iterable[Dict[str, Any]]) -> Iterable[str]:
+    """
+    Every path an action pack touches (rename: both ends).
+    """
+    for action in actions:
+        for key in ("path", "src", "dst"):
+            if action.get(key):
+                yield action[key]
+
+
+def cone_dirs(paths: Iterable[str]) -> List[str]:
+    """
+    Smallest set of directories covering the parents of `paths`.
+    Top-level files need no entry.
+    """
+    parents = {str(PurePosixPath(p).parent) for p in paths}
+    parents.discard(".")
+
+    return sorted(
+        d for d in parents
+        if not any(str(a) in parents for a in list(PurePosixPath(d).parents)[:-1])
+    )       # drop directories inside an ancestor that is in the cone
+
+
+def plan_cone(plan_path: Path) -> List[str]:
+    """
+    Cone of a plan file, read in one streaming pass.
+    """
+    from src.core.plan_stream import iter_plan
+
+    paths = set()
+    for commit in iter_plan(plan_path):
+        paths.update(action_paths(commit["actions"]))
+    return cone_dirs(paths)
+
+
+def snap_cone(snap: Iterable[str]) -> List[str]:
+    """
+    Cone of a simulated range: every snapshot file may be edited or
+    deleted, new files go to action_layout.ADD_DIR.
+    """
+    return cone_dirs([*snap, f"{ADD_DIR}/-"])
+
+
+# --------------------------------------------------
+# Apply
+# --------------------------------------------------
+
+def _git(repo_path: str, *args: str, check: bool = True) -> str:
+    cmd = ["git", *args]
+    with METRICS.time_git(cmd):
+        result = subprocess.run(
+            cmd,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    if check and result.returncode != 0:
+        raise SparseExecError(f"[sparse] {' '.join(cmd)} failed: {result.stderr.strip()}")
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def current_cone(repo_path: str) -> Optional[List[str]]:
+    """
+    Directories of the active cone, or None when the repo is not a cone
+    mode sparse checkout.
+    """
+    if _git(repo_path, "config", "--bool", "core.sparseCheckout", check=False) != "true":
+        return None
+    if _git(repo_path, "config", "--bool", "core.sparseCheckoutCone", check=False) != "true":
+        return None
+    return _git(repo_path, "sparse-checkout", "list").splitlines()
+
+
+def apply_cone(repo_path: str, dirs: Iterable[str]) -> List[str]:
+    """
+    Make sure `dirs` are checked out: enable cone mode + sparse index, or
+    widen the active cone. No-op when the cone already covers them.
+    """
+    wanted = _fold(dirs)
+    current = current_cone(repo_path)
+
+    if current is not None:
+        merged = _fold([*current, *wanted])
+        if merged == _fold(current):
+            return merged
+        wanted = merged
+
+    if wanted:
+        _git(repo_path, "sparse-checkout", "set", "--cone", "--sparse-index", *wanted)
+    else:
+        _git(repo_path, "sparse-checkout", "set", "--cone", "--sparse-index")
+    print(f"[sparse] cone: {', '.join(wanted) or '(top level only)'}")
+    return wanted
+
+
+def _fold(dirs: Iterable[str]) -> List[str]:
+    return cone_dirs(f"{d.strip('/')}/-" for d in dirs)
+
+
+def disable(repo_path: str) -> None:
+    _git(repo_path, "sparse-checkout", "disable")
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="sparse-checkout cone for plan execution")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_cone = sub.add_parser("cone")
+    p_cone.add_argument("--plan", type=Path, required=True)
+
+    p_apply = sub.add_parser("apply")
+    p_apply.add_argument("--repo", default=".")
+    p_apply.add_argument("--plan", type=Path, required=True)
+
+    p_off = sub.add_parser("disable")
+    p_off.add_argument("--repo", default=".")
+
+    args = parser.parse_args()
+
+    if args.cmd == "cone":
+        for d in plan_cone(args.plan):
+            print(d)
+    elif args.cmd == "apply":
+        apply_cone(args.repo, plan_cone(args.plan))
+    else:
+        disable(args.repo)
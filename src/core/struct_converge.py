@@ -0,0 +1,290 @@
+# src/core/struct_converge.py
+# ---------------------------
+# Structure-convergence planner: current snapshot -> ref/ target layout
+#
+#   snapshot (set of paths)  +  ref/repo_struct.json / ref/repo_files.json
+#       -> add / delete / rename set   (sorted-merge diffs, O(n log n))
+#       -> spread over the day plan    (one pass over all commits)
+#       -> plan commits in the plan_stream format:
+#          {"commit_index": 0, "time_point": "...", "actions": [{"op": ...}]}
+#
+# Renames pair a delete with an add of the same file name in another
+# directory. Commits that get no convergence work edit a file that
+# already exists at that point of the plan, so the plan always passes
+# anti_timedox.check_plan.
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.core.time_set import TimeInjection, commit_times, to_datetimes
+
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+REF_DIR = SRC_DIR / "ref"
+STRUCT_PATH = REF_DIR / "repo_struct.json"
+FILES_PATH = REF_DIR / "repo_files.json"
+
+PlanAction = Dict[str, str]
+PlanCommit = Dict[str, Any]
+
+
+class ConvergeError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Target structure
+# --------------------------------------------------
+
+def flatten_struct(struct: Dict[str, Any]) -> List[str]:
+    """
+    repo_struct.json tree -> flat list of file paths.
+    """
+    paths = list(struct.get("root_files", []))
+
+    stack = [("", name, node) for name, node in struct.get("directories", {}).items()]
+    while stack:
+        prefix, name, node = stack.pop()
+        base = f"{prefix}{name}/"
+        paths.extend(base + f for f in node.get("files", []))
+        stack.extend((base, sub, child) for sub, child in node.get("subdirs", {}).items())
+
+    return paths
+
+
+def load_target(
+    struct_path: Optional[Path] = STRUCT_PATH,
+    files_path: Optional[Path] = FILES_PATH,
+) -> List[str]:
+    """
+    Sorted, de-duplicated target paths from whichever ref files exist.
+    """
+    paths: List[str] = []
+
+    if struct_path and Path(struct_path).exists():
+        with open(struct_path, "r", encoding="utf-8") as f:
+            paths.extend(flatten_struct(json.load(f)))
+
+    if files_path and Path(files_path).exists():
+        with open(files_path, "r", encoding="utf-8") as f:
+            paths.extend(json.load(f).keys())
+
+    if not paths:
+        raise ConvergeError("[converge] no target structure found")
+
+    return _sorted_unique(paths)
+
+
+# --------------------------------------------------
+# Sorted-merge diffs
+# --------------------------------------------------
+
+def _sorted_unique(paths: Iterable[str]) -> List[str]:
+    out: List[str] = []
+    for p in sorted(paths):
+        if not out or out[-1] != p:
+            out.append(p)
+    return out
+
+
+def diff_sorted(current: List[str], target: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Both inputs sorted + unique. Returns (to_add, to_delete), both sorted.
+    """
+    to_add: List[str] = []
+    to_delete: List[str] = []
+    i = j = 0
+    n, m = len(current), len(target)
+
+    while i < n and j < m:
+        a, b = current[i], target[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            to_delete.append(a)
+            i += 1
+        else:
+            to_add.append(b)
+            j += 1
+
+    to_delete.extend(current[i:])
+    to_add.extend(target[j:])
+    return to_add, to_delete
+
+
+def _basename(path: str) -> str:
+    return path.rsplit("/", 1)[-1]
+
+
+def pair_renames(
+    to_add: List[str],
+    to_delete: List[str],
+) -> Tuple[List[Tuple[str, str]], List[str], List[str]]:
+    """
+    Merge both lists ordered by file name; equal names become renames.
+    Returns (renames [(src, dst)], remaining adds, remaining deletes).
+    """
+    adds = sorted(to_add, key=lambda p: (_basename(p), p))
+    dels = sorted(to_delete, key=lambda p: (_basename(p), p))
+
+    renames: List[Tuple[str, str]] = []
+    rest_add: List[str] = []
+    rest_del: List[str] = []
+    i = j = 0
+
+    while i < len(dels) and j < len(adds):
+        a, b = _basename(dels[i]), _basename(adds[j])
+        if a == b:
+            renames.append((dels[i], adds[j]))
+            i += 1
+            j += 1
+        elif a < b:
+            rest_del.append(dels[i])
+            i += 1
+        else:
+            rest_add.append(adds[j])
+            j += 1
+
+    rest_del.extend(dels[i:])
+    rest_add.extend(adds[j:])
+    return renames, rest_add, rest_del
+
+
+def converge_actions(current: Iterable[str], target: Iterable[str]) -> List[PlanAction]:
+    """
+    The full action set taking `current` to `target`, ordered by the
+    path it lands on so work moves through the tree directory by directory.
+    All actions touch disjoint paths, so any order is valid.
+    """
+    to_add, to_delete = diff_sorted(_sorted_unique(current), _sorted_unique(target))
+    renames, adds, deletes = pair_renames(to_add, to_delete)
+
+    keyed: List[Tuple[str, PlanAction]] = []
+    keyed.extend((dst, {"op": "rename", "src": src, "dst": dst}) for src, dst in renames)
+    keyed.extend((p, {"op": "add", "path": p}) for p in adds)
+    keyed.extend((p, {"op": "delete", "path": p}) for p in deletes)
+    keyed.sort(key=lambda kv: kv[0])
+
+    return [action for _, action in keyed]
+
+
+# --------------------------------------------------
+# Spread over the day plan
+# --------------------------------------------------
+
+def spread_actions(
+    actions: List[PlanAction],
+    days: List[str],
+    counts: List[int],
+    current: Iterable[str],
+    target: Iterable[str],
+    injection: Optional[TimeInjection] = None,
+) -> Iterator[PlanCommit]:
+    """
+    Distribute `actions` over every planned commit of the day plan
+    (counts[i] commits on days[i]); yields plan commits in time order.
+
+    Commit k gets actions[ceil(k*N/S) : ceil((k+1)*N/S)]; commits left
+    without work edit a file that is kept or was already added, so no
+    commit is empty. Without a kept file the first add / rename goes
+    into commit 0, which gives every later commit a file to edit.
+    """
+    injection = injection or TimeInjection()
+    total = sum(counts)
+    if total == 0:
+        raise ConvergeError("[converge] the day plan has no work days")
+
+    target_set = set(target)
+    anchor = next((p for p in _sorted_unique(current) if p in target_set), None)
+
+    if anchor is None:
+        first = next((i for i, a in enumerate(actions) if a["op"] != "delete"), None)
+        if first:
+            actions = [actions[first], *actions[:first], *actions[first + 1:]]
+
+    times = to_datetimes(commit_times(days, counts, injection), injection)
+    n = len(actions)
+
+    for k in range(total):
+        lo = -(-k * n // total)
+        hi = -(-(k + 1) * n // total)
+        chunk = actions[lo:hi]
+
+        if not chunk:
+            if anchor is None:
+                raise ConvergeError("[converge] nothing to converge and no file to edit")
+            chunk = [{"op": "edit", "path": anchor}]
+        elif anchor is None:
+            landed = [a.get("dst") or a["path"] for a in chunk if a["op"] != "delete"]
+            anchor = landed[-1] if landed else None
+
+        yield {
+            "commit_index": k,
+            "time_point": times[k].isoformat(),
+            "actions": chunk,
+        }
+
+
+def plan_convergence(
+    current: Iterable[str],
+    target: Iterable[str],
+    days: List[str],
+    counts: List[int],
+    injection: Optional[TimeInjection] = None,
+) -> Iterator[PlanCommit]:
+    current = list(current)
+    target = list(target)
+    actions = converge_actions(current, target)
+    return spread_actions(actions, days, counts, current, target, injection)
+
+
+def write_plan(plan: Iterable[PlanCommit], out_path: Path) -> int:
+    """
+    Write plan commits as NDJSON (plan_stream.iter_plan reads it back).
+    """
+    n = 0
+    with open(out_path, "w", encoding="utf-8") as f:
+        for commit in plan:
+            f.write(json.dumps(commit, separators=(",", ":")) + "\n")
+            n += 1
+    return n
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.core.multidays_commit_pusher import date_range, plan_day_counts
+    from src.core.repo_truth import load_head_structure
+    from src.core.snap_state import load_last_snap
+    from src.core.time_set import load_time_injection
+
+    parser = argparse.ArgumentParser(description="plan convergence to the ref/ structure")
+    parser.add_argument("--begin", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--out", type=Path, required=True, help="NDJSON plan for plan_stream")
+    parser.add_argument("--repo", default=None, help="take the current structure from HEAD")
+    parser.add_argument("--snap-dir", type=Path, default=Path("src/res"))
+    parser.add_argument("--struct", type=Path, default=STRUCT_PATH)
+    parser.add_argument("--files", type=Path, default=FILES_PATH)
+    args = parser.parse_args()
+
+    current = load_head_structure(args.repo) if args.repo else load_last_snap(args.snap_dir)
+    target = load_target(args.struct, args.files)
+
+    days = date_range(args.begin, args.end)
+    counts = plan_day_counts(days)
+
+    n = write_plan(
+        plan_convergence(
+            current, target, days, counts,
+            load_time_injection(Path("src/res/repo_config.json")),
+        ),
+        args.out,
+    )
+    print(f"[converge] {len(current)} -> {len(target)} files, {n} commits -> {args.out}")
@@ -0,0 +1,263 @@
+# src/core/team_sim.py
+# --------------------
+# Team simulation: many identities, one merged commit stream
+#
+#   python -m src.core.team_sim --team src/res/team.json \
+#       --begin 2022-01-01 --end 2022-12-31 --mode soft_run
+#
+#   plan     every identity gets its own timeline from its own stream
+#            (key: seed, "<repo>#<email>"): work/rest + commits per day
+#            with the identity's probabilities, then commit_times() -
+#            a few vectorized NumPy calls per author, spread over a
+#            process pool (Pool.map, one task per author); the streams
+#            are keyed per author, so the plan does not depend on the
+#            number of workers
+#   merge    heapq.merge over the per-author sorted timelines
+#            (k-way, O(N log A)); ties break by author order
+#   execute  one engine pass over the merged stream on the shared
+#            snapshot; each commit carries its author as GIT_AUTHOR_* /
+#            GIT_COMMITTER_* env (commit_executor author=)
+
+import heapq
+import multiprocessing
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.action_layout import generate_actions
+from src.core.anti_timedox import validate_actions
+from src.core.commit_executor import execute_one_commit
+from src.core.commit_prep import Identity
+from src.core.final_pusher import push_gitcom_repo
+from src.core.msg_index import MsgIndex
+from src.core.multidays_commit_pusher import (
+    MULTI_COMMIT_RANGE,
+    RUN_MODES,
+    TARGET_RECENCY,
+    apply_actions_to_snap,
+    date_range,
+)
+from src.core.rng_streams import RngStreams, resolve_seed
+from src.core.run_refs import begin_run, finish_run
+from src.core.snap_state import load_last_snap, persist_snap
+from src.core.time_set import TimeInjection, commit_times
+from src.core.weighted_pick import TargetSampler
+
+
+# (epoch, author index, commit number within the author's timeline)
+TimelineEntry = Tuple[int, int, int]
+
+
+# --------------------------------------------------
+# Plan
+# --------------------------------------------------
+
+def author_streams(seed: int, repo: str, identity: Identity) -> RngStreams:
+    return RngStreams(seed, f"{repo}#{identity.email}")
+
+
+def plan_author(
+    identity: Identity,
+    days: Sequence[str],
+    injection: TimeInjection,
+    streams: RngStreams,
+) -> np.ndarray:
+    """
+    Sorted commit epochs of one author over `days`.
+    """
+    gen = streams.numpy(None, "team/days")
+    n_days = len(days)
+    lo, hi = MULTI_COMMIT_RANGE
+
+    work = gen.random(n_days) < identity.work_probability
+    multi = gen.random(n_days) < identity.multi_commit_probability
+    counts = np.where(multi, gen.integers(lo, hi + 1, size=n_days), 1) * work
+
+    return commit_times(days, counts, injection, rng=streams.numpy(None, "team/time"))
+
+
+def _plan_author_task(task: Tuple[Identity, List[str], TimeInjection, int, str]) -> np.ndarray:
+    identity, days, injection, seed, repo = task
+    return plan_author(identity, days, injection, author_streams(seed, repo, identity))
+
+
+def plan_timelines(
+    identities: Sequence[Identity],
+    days: Sequence[str],
+    injection: TimeInjection,
+    seed: int,
+    repo: str,
+    workers: Optional[int] = None,
+) -> List[np.ndarray]:
+    """
+    Per-author timelines, in identity order.
+
+    workers=0 plans in-process (same output, for debugging).
+    """
+    tasks = [(ident, list(days), injection, seed, repo) for ident in identities]
+    if workers == 0 or len(tasks) < 2:
+        return list(map(_plan_author_task, tasks))
+    with multiprocessing.Pool(processes=min(workers or multiprocessing.cpu_count(), len(tasks))) as pool:
+        return pool.map(_plan_author_task, tasks)
+
+
+def merge_timelines(timelines: Sequence[np.ndarray]) -> Iterator[TimelineEntry]:
+    """
+    k-way merge of per-author sorted timelines.
+    """
+    return heapq.merge(*(_entries(a, epochs) for a, epochs in enumerate(timelines)))
+
+
+def _entries(author: int, epochs: np.ndarray) -> Iterator[TimelineEntry]:
+    for i, t in enumerate(epochs.tolist()):
+        yield t, author, i
+
+
+# --------------------------------------------------
+# Execute
+# --------------------------------------------------
+
+def run_team(
+    *,
+    repo_path: str,
+    identities: Sequence[Identity],
+    begin: str,
+    end: str,
+    snap_dir: Path,
+    run_mode: str = "soft_run",
+    time_injection: Optional[TimeInjection] = None,
+    last_snap: Optional[Sequence[str]] = None,
+    seed: Optional[int] = None,
+    dedup_msgs: bool = True,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Simulate [begin, end] for a whole team on repo_path.
+
+    workers: planning processes (None: one per author up to cpu_count,
+    0: in-process). Returns a summary with commits per author email.
+    """
+    if run_mode not in RUN_MODES:
+        raise ValueError(f"run_mode must be one of {RUN_MODES}, got {run_mode}")
+    if not identities:
+        raise ValueError("run_team needs at least one identity")
+
+    injection = time_injection or TimeInjection()
+    days = date_range(begin, end)
+    snap = set(last_snap) if last_snap is not None else load_last_snap(snap_dir)
+
+    seed = resolve_seed(seed)
+    repo = Path(repo_path).resolve().name
+    streams = [author_streams(seed, repo, ident) for ident in identities]
+
+    # 1. independent per-author plans
+    t0 = time.perf_counter()
+    timelines = plan_timelines(identities, days, injection, seed, repo, workers)
+    planned = sum(t.size for t in timelines)
+    plan_s = time.perf_counter() - t0
+
+    # 2. merged stream, one engine pass
+    sampler = TargetSampler(snap, recency=TARGET_RECENCY)
+    msg_index = MsgIndex(repo_path).load() if dedup_msgs and run_mode != "dry_run" else None
+    run = (
+        begin_run(repo_path, snap_dir, begin=begin, end=end, seed=seed, run_mode=run_mode,
+                  authors=len(identities))
+        if run_mode != "dry_run"
+        else None
+    )
+
+    per_author: Counter = Counter()
+    tz = injection.tzinfo
+    for epoch, a, i in merge_timelines(timelines):
+        ident = identities[a]
+        commit_time = datetime.fromtimestamp(epoch, tz)
+        day = commit_time.date().isoformat()
+
+        actions = generate_actions(
+            snap,
+            sampler=sampler,
+            rng=streams[a].stream(day, f"actions/{i}"),
+        )
+        valid_actions = validate_actions(last_snap=snap, actions=actions)
+
+        if run_mode != "dry_run":
+            execute_one_commit(
+                repo_path=Path(repo_path),
+                git_cmd_pack=valid_actions,
+                commit_time=commit_time,
+                commit_index=i + 1,
+                rng=streams[a].stream(day, f"message/{i}"),
+                msg_index=msg_index,
+                author=ident.author,
+            )
+
+        apply_actions_to_snap(snap, valid_actions)
+        sampler.apply(valid_actions)
+        per_author[ident.email] += 1
+
+    # 3. index + persist + push
+    if msg_index is not None and planned:
+        msg_index.save()
+
+    if run_mode != "dry_run":
+        Path(snap_dir).mkdir(parents=True, exist_ok=True)
+        persist_snap(snap_dir, snap)
+
+    if run is not None:
+        finish_run(repo_path, run)
+
+    if run_mode == "full_run" and planned:
+        push_gitcom_repo(repo_path=repo_path)
+
+    return {
+        "days": len(days),
+        "authors": len(identities),
+        "commits": planned,
+        "per_author": dict(per_author),
+        "plan_seconds": round(plan_s, 4),
+        "run_mode": run_mode,
+        "seed": seed,
+        "run_id": run["id"] if run else None,
+        "snap": snap,
+    }
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.core.commit_prep import load_identities
+    from src.core.time_set import load_time_injection
+
+    parser = argparse.ArgumentParser(description="multi-author simulation")
+    parser.add_argument("--team", type=Path, required=True, help="identities (.json list or identity.txt blocks)")
+    parser.add_argument("--begin", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--mode", default="soft_run", choices=RUN_MODES)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="planning processes, 0 = in-process")
+    args = parser.parse_args()
+
+    team: List[Identity] = load_identities(args.team)
+    summary = run_team(
+        repo_path=".",
+        identities=team,
+        begin=args.begin,
+        end=args.end,
+        snap_dir=Path("src/res"),
+        run_mode=args.mode,
+        time_injection=load_time_injection(Path("src/res/repo_config.json")),
+        seed=args.seed,
+        workers=args.workers,
+    )
+    print(
+        f"[team] {summary['commits']} commits by {summary['authors']} authors over "
+        f"{summary['days']} days (plan {summary['plan_seconds']}s)"
+    )
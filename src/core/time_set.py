@@ -0,0 +1,218 @@
+# src/core/time_set.py
+# --------------------
+# Commit timestamp engine honoring repo_config.json "time_injection"
+#
+#   "time_injection": {
+#     "timezone": "-0500",
+#     "strategy": "random",      # random | even | fixed
+#     "hour_range": [9, 22]      # local hours, both ends inclusive
+#   }
+#
+# All commit times of a date range are generated in one NumPy pass.
+# Guarantees:
+# - strictly increasing across the whole range
+# - every commit stays on its local day AND on the same UTC day
+#   (GitHub buckets contributions by date, so no day-crossing)
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as fixed_offset
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:  # keep this module importable on its own (simulator.py)
+    from src.core.rng_streams import RngStreams
+
+
+DayLike = Union[str, date, datetime]
+
+STRATEGIES = ("random", "even", "fixed")
+
+_DAY = 86400
+
+
+class TimeSetError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class TimeInjection:
+    timezone: str = "+0000"
+    hour_range: Tuple[int, int] = (9, 22)
+    strategy: str = "random"
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "TimeInjection":
+        ti = cfg.get("time_injection", {})
+        return cls(
+            timezone=ti.get("timezone", cls.timezone),
+            hour_range=tuple(ti.get("hour_range", cls.hour_range)),
+            strategy=ti.get("strategy", cls.strategy),
+        )
+
+    @property
+    def offset_seconds(self) -> int:
+        return _parse_offset(self.timezone)
+
+    @property
+    def tzinfo(self) -> fixed_offset:
+        return fixed_offset(timedelta(seconds=self.offset_seconds))
+
+    def window(self) -> Tuple[int, int]:
+        """
+        Allowed local seconds-of-day [lo, hi): hour_range clipped so the
+        UTC date equals the local date.
+        """
+        h0, h1 = self.hour_range
+        if not 0 <= h0 <= h1 <= 23:
+            raise TimeSetError(f"[time] bad hour_range {self.hour_range}")
+
+        off = self.offset_seconds
+        lo = max(h0 * 3600, off)
+        hi = min((h1 + 1) * 3600, _DAY + off)
+
+        if hi <= lo:
+            raise TimeSetError(
+                f"[time] hour_range {self.hour_range} never falls on the same UTC day "
+                f"in timezone {self.timezone}"
+            )
+        return lo, hi
+
+
+def load_time_injection(config_path: Path) -> TimeInjection:
+    with open(config_path, "r", encoding="utf-8") as f:
+        return TimeInjection.from_config(json.load(f))
+
+
+# --------------------------------------------------
+# Engine
+# --------------------------------------------------
+
+def commit_times(
+    days: Sequence[DayLike],
+    counts: Sequence[int],
+    injection: TimeInjection,
+    rng: Optional[np.random.Generator] = None,
+    streams: Optional["RngStreams"] = None,
+) -> np.ndarray:
+    """
+    Generate all commit times for `days` (ascending) with counts[i]
+    commits on days[i].
+
+    streams: draw each day's offsets from its own (day, "time") stream,
+    so any sub-range reproduces exactly the times of a full-range call.
+
+    Returns int64 UTC epoch seconds, strictly increasing, length sum(counts).
+    """
+    if injection.strategy not in STRATEGIES:
+        raise TimeSetError(f"[time] unknown strategy {injection.strategy!r}")
+
+    counts = np.asarray(counts, dtype=np.int64)
+    if counts.size == 0 or counts.sum() == 0:
+        return np.empty(0, dtype=np.int64)
+    if (counts < 0).any():
+        raise TimeSetError("[time] negative commit count")
+
+    day_index = _day_numbers(days)
+    if len(day_index) != len(counts):
+        raise TimeSetError("[time] days and counts differ in length")
+    if (np.diff(day_index) <= 0).any():
+        raise TimeSetError("[time] days must be strictly ascending")
+
+    lo, hi = injection.window()
+    span = hi - lo
+    if counts.max() > span:
+        raise TimeSetError(f"[time] more than {span} commits in one day window")
+
+    # local midnight of each commit's day, as UTC epoch
+    midnight = day_index * _DAY - injection.offset_seconds
+    base = np.repeat(midnight, counts)
+
+    total = int(counts.sum())
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    rank = np.arange(total, dtype=np.int64) - starts       # 0..k-1 within day
+    per_day = np.repeat(counts, counts)
+
+    if injection.strategy == "random" and streams is not None:
+        offsets = np.concatenate([
+            streams.numpy(int(d), "time").integers(lo, hi, size=int(n), dtype=np.int64)
+            for d, n in zip(day_index, counts) if n
+        ])
+        t = np.sort(base + offsets)
+    elif injection.strategy == "random":
+        rng = rng if rng is not None else np.random.default_rng()
+        offsets = rng.integers(lo, hi, size=total, dtype=np.int64)
+        t = np.sort(base + offsets)
+    elif injection.strategy == "even":
+        offsets = lo + ((2 * rank + 1) * span) // (2 * per_day)
+        t = base + offsets
+    else:  # fixed: start of window, one second apart
+        t = base + lo
+
+    # strict monotonicity: t[i] >= t[i-1] + 1
+    steps = np.arange(total, dtype=np.int64)
+    t = np.maximum.accumulate(t - steps) + steps
+
+    if (t >= base + hi).any():
+        raise TimeSetError("[time] day window overflow after de-duplication")
+
+    return t
+
+
+def times_for_day(
+    day: DayLike,
+    n: int,
+    injection: TimeInjection,
+    rng: Optional[np.random.Generator] = None,
+    streams: Optional["RngStreams"] = None,
+) -> List[datetime]:
+    """
+    Convenience for per-day orchestrators: n aware datetimes on `day`.
+    """
+    return to_datetimes(commit_times([day], [n], injection, rng, streams), injection)
+
+
+def to_datetimes(epochs: np.ndarray, injection: TimeInjection) -> List[datetime]:
+    tz = injection.tzinfo
+    return [datetime.fromtimestamp(int(t), tz) for t in epochs]
+
+
+def format_git_date(epoch: int, injection: TimeInjection) -> str:
+    """
+    "2022-04-25 13:07:41 -0500" (accepted by git --date / GIT_*_DATE).
+    """
+    dt = datetime.fromtimestamp(int(epoch), injection.tzinfo)
+    return dt.strftime("%Y-%m-%d %H:%M:%S %z")
+
+
+# --------------------------------------------------
+# helpers
+# --------------------------------------------------
+
+def _parse_offset(tz: str) -> int:
+    """
+    "-0500" -> -18000, "+05:30" -> 19800
+    """
+    raw = tz.replace(":", "").strip()
+    if len(raw) != 5 or raw[0] not in "+-" or not raw[1:].isdigit():
+        raise TimeSetError(f"[time] bad timezone offset {tz!r}, expected ±HHMM")
+    sign = -1 if raw[0] == "-" else 1
+    return sign * (int(raw[1:3]) * 3600 + int(raw[3:5]) * 60)
+
+
+def _day_numbers(days: Sequence[DayLike]) -> np.ndarray:
+    """
+    Days since epoch (int64) for str / date / datetime inputs.
+    """
+    if isinstance(days, np.ndarray) and np.issubdtype(days.dtype, np.datetime64):
+        return days.astype("datetime64[D]").astype(np.int64)
+
+    normalized = [
+        d.date().isoformat() if isinstance(d, datetime)
+        else d.isoformat() if isinstance(d, date)
+        else str(d)[:10]
+        for d in days
+    ]
+    return np.array(normalized, dtype="datetime64[D]").astype(np.int64)
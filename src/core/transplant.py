@@ -0,0 +1,315 @@
+# src/core/transplant.py
+# ----------------------
+# History transplant: an existing repo's shape onto a new timeline
+#
+#   python -m src.core.transplant --source ~/code/some-repo --target /tmp/new-repo
+#
+#   git fast-export  ->  retime (+ identity remap)  ->  git fast-import
+#
+# 1. `git log --format=%ct` over the exported revs gives the original
+#    commit times; their relative density is mapped linearly onto the
+#    repo_config.json "time_window" -> commits per day
+# 2. time_set.commit_times() turns that into strictly increasing times
+#    that follow "time_injection" (hour range, timezone, strategy)
+# 3. the fast-export stream is rewritten line by line: the k-th exported
+#    commit gets the k-th time on its author and committer lines, the
+#    identity comes from "git_identity"; blob/commit data is copied in
+#    fixed-size chunks
+#
+# fast-export emits parents before children, so assigning ascending times
+# in stream order keeps every child after its parents. Memory: the stream
+# is constant; the planned times take 8 bytes per commit.
+
+import json
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.multidays_commit_pusher import date_range
+from src.core.rng_streams import RngStreams, resolve_seed
+from src.core.time_set import TimeInjection, commit_times
+
+
+CONFIG_PATH = Path("src/res/repo_config.json")
+EXPORT_ARGS = ("--signed-tags=strip", "--tag-of-filtered-object=drop", "--reencode=yes")
+COPY_CHUNK = 1 << 20
+
+Identity = Tuple[bytes, bytes]
+
+
+class TransplantError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Timeline
+# --------------------------------------------------
+
+def source_epochs(source: str, revs: Sequence[str]) -> np.ndarray:
+    result = subprocess.run(
+        ["git", "log", "--format=%ct", *revs],
+        cwd=source,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise TransplantError(f"[transplant] git log failed: {result.stderr.decode(errors='replace')}")
+    return np.array(result.stdout.split(), dtype=np.int64)
+
+
+def retime_counts(epochs: np.ndarray, n_days: int) -> np.ndarray:
+    """
+    Commits per target day: the original [first, last] span is stretched
+    or squeezed linearly onto n_days, so bursts and gaps keep their shape.
+    """
+    if n_days <= 0:
+        raise TransplantError("[transplant] empty time window")
+    if epochs.size == 0:
+        return np.zeros(n_days, dtype=np.int64)
+
+    t0, t1 = int(epochs.min()), int(epochs.max())
+    pos = (epochs - t0) * n_days // (t1 - t0 + 1)
+    return np.bincount(pos, minlength=n_days).astype(np.int64)
+
+
+def plan_times(
+    epochs: np.ndarray,
+    days: Sequence[str],
+    injection: TimeInjection,
+    streams: RngStreams,
+) -> np.ndarray:
+    counts = retime_counts(epochs, len(days))
+
+    lo, hi = injection.window()
+    if counts.size and counts.max() > hi - lo:
+        raise TransplantError(
+            f"[transplant] {int(counts.max())} commits on one day do not fit the "
+            f"{hi - lo}s hour window; widen time_window"
+        )
+    return commit_times(days, counts, injection, streams=streams)
+
+
+# --------------------------------------------------
+# Stream rewrite
+# --------------------------------------------------
+
+def _person(line: bytes, epoch: int, tz: bytes, identity: Optional[Identity]) -> bytes:
+    """
+    b"author Name <mail> 1650000000 +0200" -> retimed (and remapped) line.
+    """
+    kind, _, rest = line.partition(b" ")
+    if identity is None:
+        who = rest[: rest.rindex(b">") + 1]
+    else:
+        who = identity[0] + b" <" + identity[1] + b">"
+    return b"%s %s %d %s\n" % (kind, who, epoch, tz)
+
+
+def _copy(src: BinaryIO, dst: BinaryIO, n: int) -> None:
+    while n:
+        chunk = src.read(min(n, COPY_CHUNK))
+        if not chunk:
+            raise TransplantError("[transplant] fast-export stream ended inside a data block")
+        dst.write(chunk)
+        n -= len(chunk)
+
+
+def rewrite_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    times: np.ndarray,
+    tz: bytes,
+    identity: Optional[Identity] = None,
+) -> int:
+    """
+    Copy a fast-export stream, retiming commits in order. Returns the
+    number of commits written.
+    """
+    k = -1
+    epoch = int(times[0]) if times.size else 0
+
+    for line in iter(src.readline, b""):
+        if line.startswith(b"data "):
+            dst.write(line)
+            _copy(src, dst, int(line[5:]))
+        elif line.startswith(b"commit "):
+            k += 1
+            if k >= times.size:
+                raise TransplantError("[transplant] more exported commits than planned times")
+            epoch = int(times[k])
+            dst.write(line)
+        elif line.startswith((b"author ", b"committer ", b"tagger ")):
+            dst.write(_person(line, epoch, tz, identity))
+        else:
+            dst.write(line)
+
+    return k + 1
+
+
+# --------------------------------------------------
+# Driver
+# --------------------------------------------------
+
+def _prepare_target(target: str, force: bool) -> None:
+    path = Path(target)
+    if not (path / ".git").exists() and not (path / "HEAD").exists():
+        path.mkdir(parents=True, exist_ok=True)
+        subprocess.run(["git", "init", "-q"], cwd=target, check=True)
+        return
+
+    has_head = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", "HEAD"],
+        cwd=target,
+        stdout=subprocess.DEVNULL,
+    ).returncode == 0
+    if has_head and not force:
+        raise TransplantError(f"[transplant] target {target} already has history (use force)")
+
+
+def _finish_target(source: str, target: str) -> None:
+    """
+    Point the target HEAD at the source's branch and check it out
+    (fast-import only writes objects and refs).
+    """
+    head = subprocess.run(
+        ["git", "symbolic-ref", "-q", "HEAD"],
+        cwd=source,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout.strip()
+    if head:
+        subprocess.run(["git", "symbolic-ref", "HEAD", head], cwd=target, check=True)
+
+    bare = subprocess.run(
+        ["git", "rev-parse", "--is-bare-repository"],
+        cwd=target,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout.strip()
+    if bare == "false":
+        subprocess.run(["git", "reset", "-q", "--hard"], cwd=target, check=True)
+
+
+def transplant(
+    source: str,
+    target: str,
+    *,
+    begin: str,
+    end: str,
+    injection: TimeInjection,
+    identity: Optional[Tuple[str, str]] = None,
+    seed: Optional[int] = None,
+    revs: Iterable[str] = ("--all",),
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Re-time every commit reachable from `revs` in `source` onto
+    [begin, end] and import it into `target` (created when missing).
+
+    identity: (name, email) for author, committer and tagger; None keeps
+              the original identities
+    force:    import into a target that already has commits (fast-import
+              --force, refs are overwritten)
+    """
+    revs = list(revs)
+    days = date_range(begin, end)
+    seed = resolve_seed(seed)
+    streams = RngStreams(seed, repo=Path(target).resolve().name)
+
+    t0 = time.perf_counter()
+    times = plan_times(source_epochs(source, revs), days, injection, streams)
+    _prepare_target(target, force)
+
+    ident = (identity[0].encode("utf-8"), identity[1].encode("utf-8")) if identity else None
+    tz = injection.timezone.replace(":", "").encode("ascii")
+
+    export = subprocess.Popen(
+        ["git", "fast-export", *EXPORT_ARGS, *revs],
+        cwd=source,
+        stdout=subprocess.PIPE,
+        bufsize=COPY_CHUNK,
+    )
+    import_cmd = ["git", "fast-import", "--quiet"] + (["--force"] if force else [])
+    fast_import = subprocess.Popen(
+        import_cmd,
+        cwd=target,
+        stdin=subprocess.PIPE,
+        bufsize=COPY_CHUNK,
+    )
+
+    try:
+        written = rewrite_stream(export.stdout, fast_import.stdin, times, tz, ident)
+    finally:
+        export.stdout.close()
+        fast_import.stdin.close()
+        export_rc, import_rc = export.wait(), fast_import.wait()
+
+    if export_rc != 0:
+        raise TransplantError(f"[transplant] git fast-export exited with {export_rc}")
+    if import_rc != 0:
+        raise TransplantError(f"[transplant] git fast-import exited with {import_rc}")
+    if written != times.size:
+        raise TransplantError(
+            f"[transplant] exported {written} commits but planned {times.size} times"
+        )
+    if written:
+        _finish_target(source, target)
+
+    elapsed = time.perf_counter() - t0
+    return {
+        "commits": written,
+        "days": len(days),
+        "active_days": int(np.unique((times + injection.offset_seconds) // 86400).size),
+        "seed": seed,
+        "seconds": round(elapsed, 3),
+    }
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="re-time an existing history onto time_window")
+    parser.add_argument("--source", required=True)
+    parser.add_argument("--target", required=True)
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    parser.add_argument("--begin", default=None, help="default: time_window.begin")
+    parser.add_argument("--end", default=None, help="default: time_window.end")
+    parser.add_argument("--rev", action="append", default=None, help="revs to export (default --all)")
+    parser.add_argument("--keep-identity", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    window = cfg.get("time_window", {})
+    begin = args.begin or window["begin"]
+    end = args.end or window["end"]
+    if not args.end and not window.get("inclusive", True):
+        end = date_range(begin, end)[-2]
+
+    ident = cfg.get("git_identity", {})
+    summary = transplant(
+        args.source,
+        args.target,
+        begin=begin,
+        end=end,
+        injection=TimeInjection.from_config(cfg),
+        identity=None if args.keep_identity else (ident["username"], ident["email"]),
+        seed=resolve_seed(args.seed, cfg),
+        revs=args.rev or ("--all",),
+        force=args.force,
+    )
+    rate = summary["commits"] / max(summary["seconds"], 1e-9)
+    print(
+        f"[transplant] {summary['commits']} commits onto {summary['active_days']}/{summary['days']} days "
+        f"in {summary['seconds']:.2f}s ({rate:,.0f} commits/s), seed {summary['seed']}"
+    )
@@ -0,0 +1,317 @@
+# src/core/weighted_pick.py
+# -------------------------
+# Weighted samplers for action_layout
+#
+#   AliasTable     : fixed weights, O(1) per draw (Walker / Vose alias method)
+#   FenwickTree    : prefix sums with O(log n) update and weighted search
+#   TargetSampler  : edit/delete target picker over a changing snapshot,
+#                    weighted by directory and recency, O(log n) per
+#                    draw / add / remove / touch
+
+import math
+import random
+from typing import Dict, Generic, Iterable, List, Optional, Sequence, TypeVar
+
+
+T = TypeVar("T")
+
+
+class WeightedPickError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Alias method
+# --------------------------------------------------
+
+class AliasTable(Generic[T]):
+    """
+    Precomputed alias table; draw() costs one random number.
+    """
+
+    def __init__(self, population: Sequence[T], weights: Sequence[float]):
+        if len(population) != len(weights) or not population:
+            raise WeightedPickError("population and weights must be non-empty and of equal length")
+        if any(w < 0 for w in weights) or sum(weights) <= 0:
+            raise WeightedPickError(f"invalid weights: {weights}")
+
+        n = len(population)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, s in enumerate(scaled) if s < 1.0]
+        large = [i for i, s in enumerate(scaled) if s >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # leftovers are 1.0 up to rounding
+
+        self.population = list(population)
+        self._prob = prob
+        self._alias = alias
+
+    def draw(self, rng=random) -> T:
+        u = rng.random() * len(self._prob)
+        i = int(u)
+        if u - i >= self._prob[i]:
+            i = self._alias[i]
+        return self.population[i]
+
+
+# --------------------------------------------------
+# Fenwick tree
+# --------------------------------------------------
+
+class FenwickTree:
+    """
+    Binary indexed tree over float weights (0-based slots).
+    """
+
+    def __init__(self, weights: Iterable[float] = ()):
+        tree = [0.0]
+        tree.extend(weights)
+        n = len(tree) - 1
+        # O(n) build
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def add(self, slot: int, delta: float) -> None:
+        i = slot + 1
+        n = len(self._tree)
+        while i < n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, slot: int) -> float:
+        """
+        Sum of slots [0, slot).
+        """
+        total = 0.0
+        i = slot
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def total(self) -> float:
+        return self.prefix(len(self))
+
+    def find(self, u: float) -> int:
+        """
+        Smallest slot whose inclusive prefix sum exceeds u.
+        """
+        n = len(self)
+        pos = 0
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and self._tree[nxt] <= u:
+                pos = nxt
+                u -= self._tree[nxt]
+            step >>= 1
+        return min(pos, n - 1)
+
+
+# --------------------------------------------------
+# Snapshot target sampler
+# --------------------------------------------------
+
+class TargetSampler:
+    """
+    Weighted pick of an existing path.
+
+    weight(path) = dir_weights[top-level dir] * exp(recency * last_touch)
+
+    Touching a file (add / edit / rename target) moves it to the current
+    clock, so with recency > 0 recently touched files dominate without
+    decaying every other weight. Weights are rescaled onto the clock (one
+    O(n) rebuild) only when they would overflow; long-idle paths may
+    underflow to 0 and are then only drawn when nothing else has weight.
+    """
+
+    _RESCALE_AT = 1e150
+
+    def __init__(
+        self,
+        paths: Iterable[str] = (),
+        recency: float = 0.0,
+        dir_weights: Optional[Dict[str, float]] = None,
+        rng=random,
+    ):
+        if recency < 0:
+            raise WeightedPickError("recency must be >= 0")
+
+        self.recency = recency
+        self.dir_weights = dict(dir_weights or {})
+        self.rng = rng
+
+        self._clock = 0
+        self._base = 0            # clock value whose weight is exp(0)
+        self._paths: List[Optional[str]] = []
+        self._touch: List[int] = []
+        self._slot: Dict[str, int] = {}
+        self._free: List[int] = []
+
+        for p in paths:
+            if p not in self._slot:
+                self._slot[p] = len(self._paths)
+                self._paths.append(p)
+                self._touch.append(0)
+
+        self._tree = FenwickTree(self._weight(p, 0) for p in self._paths)
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._slot
+
+    # -------- weights --------
+
+    def _dir_weight(self, path: str) -> float:
+        if not self.dir_weights:
+            return 1.0
+        top = path.split("/", 1)[0] if "/" in path else ""
+        return self.dir_weights.get(top, 1.0)
+
+    def _weight(self, path: str, touch: int) -> float:
+        return self._dir_weight(path) * math.exp(self.recency * (touch - self._base))
+
+    def _rescale(self) -> None:
+        # rebase on the clock: exponents stay <= 0 until the next rescale,
+        # so no weight can overflow however long the run; idle paths may
+        # underflow to 0 (see _draw_underflowed)
+        self._base = self._clock
+        self._tree = FenwickTree(
+            0.0 if p is None else self._weight(p, t)
+            for p, t in zip(self._paths, self._touch)
+        )
+
+    def _set(self, slot: int, weight: float) -> None:
+        current = self._tree.prefix(slot + 1) - self._tree.prefix(slot)
+        self._tree.add(slot, weight - current)
+
+    # -------- updates --------
+
+    def touch(self, path: str) -> None:
+        """
+        Mark path as just touched; adds it if missing.
+        """
+        self._clock += 1
+        if self.recency and self.recency * (self._clock - self._base) > math.log(self._RESCALE_AT):
+            self._rescale()
+
+        slot = self._slot.get(path)
+        if slot is None:
+            self.add(path)
+            return
+
+        self._touch[slot] = self._clock
+        self._set(slot, self._weight(path, self._clock))
+
+    def add(self, path: str) -> None:
+        if path in self._slot:
+            self.touch(path)
+            return
+
+        if not self._free:
+            self._grow()
+
+        slot = self._free.pop()
+        self._paths[slot] = path
+        self._touch[slot] = self._clock
+
+        self._slot[path] = slot
+        self._set(slot, self._weight(path, self._clock))
+
+    def remove(self, path: str) -> None:
+        slot = self._slot.pop(path, None)
+        if slot is None:
+            return
+        self._set(slot, 0.0)
+        self._paths[slot] = None
+        self._free.append(slot)
+
+    def apply(self, actions: Iterable[Dict[str, str]]) -> None:
+        """
+        Mirror committed actions (same contract as commit_executor).
+        """
+        for act in actions:
+            kind = act.get("type") or act.get("op")
+            if kind in ("add", "edit"):
+                self.touch(act["path"])
+            elif kind == "delete":
+                self.remove(act["path"])
+            elif kind == "rename":
+                self.remove(act["src"])
+                self.touch(act["dst"])
+
+    def _grow(self) -> None:
+        # double capacity; the O(n) rebuild is amortised O(1) per add
+        old = len(self._paths)
+        cap = max(8, 2 * old)
+        self._paths.extend([None] * (cap - old))
+        self._touch.extend([0] * (cap - old))
+        self._free.extend(range(cap - 1, old - 1, -1))
+        self._rescale()
+
+    # -------- draw --------
+
+    def draw(self, rng=None) -> str:
+        rng = rng or self.rng
+        if not self._slot:
+            raise WeightedPickError("cannot draw from an empty sampler")
+
+        total = self._tree.total()
+        if total <= 0:
+            # cancellation after many large add/remove deltas: exact rebuild
+            self._rescale()
+            total = self._tree.total()
+        if total <= 0:
+            return self._draw_underflowed(rng)
+
+        for _ in range(8):
+            path = self._paths[self._tree.find(rng.random() * total)]
+            if path is not None:
+                return path
+
+        # float drift left mass on a freed slot; exact fallback
+        self._rescale()
+        total = self._tree.total()
+        if total <= 0:
+            return self._draw_underflowed(rng)
+        return self._paths[self._tree.find(rng.random() * total)]
+
+    def _draw_underflowed(self, rng) -> str:
+        """
+        Every live weight underflowed to 0: O(n) draw with the weights
+        taken relative to the newest live touch (the same distribution,
+        without touching the tree's base).
+        """
+        live = [(p, t) for p, t in zip(self._paths, self._touch) if p is not None]
+        newest = max(t for _, t in live)
+        weights = [self._dir_weight(p) * math.exp(self.recency * (t - newest)) for p, t in live]
+        total = sum(weights)
+        if total <= 0:
+            raise WeightedPickError("all remaining paths have zero weight")
+
+        u = rng.random() * total
+        for (path, _), w in zip(live, weights):
+            u -= w
+            if u < 0:
+                return path
+        return next(p for (p, _), w in zip(reversed(live), reversed(weights)) if w > 0)
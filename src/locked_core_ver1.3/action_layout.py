@@ -3,7 +3,9 @@
 # Generate actions for ONE commit only
 
 import random
-from typing import List, Dict
+from typing import Collection, Dict, List, Optional, Tuple
+
+from src.core.weighted_pick import AliasTable, TargetSampler
 
 
 Action = Dict[str, str]
@@ -13,10 +15,17 @@ Action = Dict[str, str]
 #   "path": "src/note_0618.md"
 # }
 
+ADD_DIR = "src"         # new files land here (sparse_exec cones include it)
+ACTION_WEIGHTS = {"add": 0.5, "edit": 0.35, "delete": 0.15}
+ACTION_TYPES = AliasTable(list(ACTION_WEIGHTS), list(ACTION_WEIGHTS.values()))
+
 
 def generate_actions(
-    last_snap: List[str],
-    max_actions: int = 3
+    last_snap: Collection[str],
+    max_actions: int = 3,
+    sampler: Optional[TargetSampler] = None,
+    rng=random,
+    target_rng=None,
 ) -> List[Action]:
     """
     Generate actions for a single commit.
@@ -25,64 +34,57 @@ def generate_actions(
     - At least one action
     - Action count is small (human-scale)
     - Based on last snapshot state
-    """
-    if max_actions < 1:
-        raise ValueError("max_actions must be >= 1")
 
-    action_count = random.randint(1, max_actions)
-    actions: List[Action] = []
-
-    for _ in range(action_count):
-        action_type = _choose_action_type(last_snap)
-        action = _generate_action(action_type, last_snap)
-        actions.append(action)
-
-    return actions
+    sampler (optional): weighted edit/delete target picker kept in sync
+    with the snapshot by the caller; without it targets are uniform
+    over last_snap (which must then be a list).
 
+    rng: random.Random-like stream (see rng_streams); module random by default.
+    target_rng: stream for edit/delete targets (default: rng). With a
+    stream of its own, `rng` only draws what does not depend on the
+    snapshot (plan_action_types), so that part can be planned ahead.
+    """
+    planned = plan_action_types(rng, max_actions)
+    return resolve_actions(planned, last_snap, sampler, target_rng or rng)
 
-# ---------- helpers ----------
 
-def _choose_action_type(last_snap: List[str]) -> str:
+def plan_action_types(rng=random, max_actions: int = 3) -> List[Tuple[str, str]]:
     """
-    Choose action type based on current repository state.
+    Snapshot-independent half of generate_actions: (type, new file name)
+    per action.
     """
-    if not last_snap:
-        return "add"
+    if max_actions < 1:
+        raise ValueError("max_actions must be >= 1")
 
-    return random.choices(
-        population=["add", "edit", "delete"],
-        weights=[0.5, 0.35, 0.15],
-        k=1
-    )[0]
+    planned = []
+    for _ in range(rng.randint(1, max_actions)):
+        action_type = ACTION_TYPES.draw(rng)
+        planned.append((action_type, f"note_{rng.randint(1000, 9999)}.md"))
+    return planned
 
 
-def _generate_action(action_type: str, last_snap: List[str]) -> Action:
+def resolve_actions(
+    planned: List[Tuple[str, str]],
+    last_snap: Collection[str],
+    sampler: Optional[TargetSampler] = None,
+    rng=random,
+) -> List[Action]:
     """
-    Generate a single action dict.
+    Turn planned (type, name) pairs into actions against the snapshot;
+    on an empty snapshot every action becomes an add.
     """
-    if action_type == "add":
-        filename = f"note_{random.randint(1000, 9999)}.md"
-        return {
-            "type": "add",
-            "path": f"src/{filename}"
-        }
-
-    if action_type == "edit" and last_snap:
-        target = random.choice(last_snap)
-        return {
-            "type": "edit",
-            "path": target
-        }
-
-    if action_type == "delete" and last_snap:
-        target = random.choice(last_snap)
-        return {
-            "type": "delete",
-            "path": target
-        }
-
-    # fallback safety
-    return {
-        "type": "add",
-        "path": f"src/note_{random.randint(1000, 9999)}.md"
-    }
+    actions: List[Action] = []
+    for action_type, filename in planned:
+        if action_type == "add" or not last_snap:
+            actions.append({"type": "add", "path": f"{ADD_DIR}/{filename}"})
+        else:
+            actions.append({"type": action_type, "path": _pick_target(last_snap, sampler, rng)})
+    return actions
+
+
+# ---------- helpers ----------
+
+def _pick_target(last_snap: Collection[str], sampler: Optional[TargetSampler], rng=random) -> str:
+    if sampler is not None and len(sampler):
+        return sampler.draw(rng)
+    return rng.choice(last_snap)
@@ -2,14 +2,16 @@
 # -----------------------
 # Validate actions against last snapshot (anti-paradox mechanism)
 
-from typing import List, Dict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple
 
 
 Action = Dict[str, str]
 
 
 def validate_actions(
-    last_snap: List[str],
+    last_snap: Collection[str],
     actions: List[Action]
 ) -> List[Action]:
     """
@@ -20,10 +22,16 @@ def validate_actions(
     - Duplicate actions on the same path are reduced
     - At least one action must survive
     """
+    if not isinstance(last_snap, (set, frozenset)):
+        last_snap = set(last_snap)  # callers may pass a list: O(1) lookups
     validated: List[Action] = []
-    existing = set(last_snap)
+    # overlay on last_snap: O(len(actions)) instead of copying the snapshot
+    added, removed = set(), set()
     touched = set()
 
+    def exists(p):
+        return p in added or (p not in removed and p in last_snap)
+
     for action in actions:
         action_type = action.get("type")
         path = action.get("path")
@@ -37,18 +45,20 @@ def validate_actions(
 
         if action_type == "add":
             validated.append(action)
-            existing.add(path)
+            added.add(path)
+            removed.discard(path)
             touched.add(path)
 
         elif action_type == "edit":
-            if path in existing:
+            if exists(path):
                 validated.append(action)
                 touched.add(path)
 
         elif action_type == "delete":
-            if path in existing:
+            if exists(path):
                 validated.append(action)
-                existing.remove(path)
+                added.discard(path)
+                removed.add(path)
                 touched.add(path)
 
     # safety fallback: ensure at least one action
@@ -59,3 +69,181 @@ def validate_actions(
         })
 
     return validated
+
+
+# ==================================================
+# Plan-level validation (whole multi-day plan, one pass)
+# ==================================================
+
+PlanCommit = Dict[str, Any]
+
+
+@dataclass
+class PlanConflict:
+    commit_index: Any
+    kind: str
+    detail: str
+    action_index: Optional[int] = None
+    repaired: bool = False
+
+
+def check_plan(
+    last_snap: Iterable[str],
+    plan: Iterable[PlanCommit],
+    now: Optional[datetime] = None,
+) -> List[PlanConflict]:
+    """
+    Report-only validation; the plan is consumed once and NOT retained,
+    so a streamed plan (plan_stream.iter_plan) stays in constant memory.
+    """
+    report: List[PlanConflict] = []
+    for _ in _walk_plan(last_snap, plan, now, False, report):
+        pass
+    return report
+
+
+def validate_plan(
+    last_snap: Iterable[str],
+    plan: Iterable[PlanCommit],
+    now: Optional[datetime] = None,
+    repair: bool = True,
+) -> Tuple[List[PlanCommit], List[PlanConflict]]:
+    """
+    Validate an entire plan in O(total actions).
+
+    Rules enforced:
+    - Cannot edit or delete a file that does not exist (at that point of the plan)
+    - Cannot rename from a missing source or onto an existing target
+    - commit time_point must be strictly increasing and not in the future
+    - a time bumped for ordering must stay on its planned day
+
+    repair=True : drop offending actions, bump non-monotonic times to
+                  previous + 1s, drop future / day-crossing / emptied /
+                  unparseable commits
+    repair=False: keep the plan as-is, only report
+    """
+    report: List[PlanConflict] = []
+    out = list(_walk_plan(last_snap, plan, now, repair, report))
+    return out, report
+
+
+def _walk_plan(last_snap, plan, now, repair, report):
+    existing = set(last_snap)
+    now_ts = (now or datetime.now(timezone.utc)).timestamp()
+    prev_ts = None
+
+    for commit in plan:
+        idx = commit.get("commit_index")
+        commit_time = _as_datetime(commit.get("time_point"))
+
+        if commit_time is None:
+            report.append(PlanConflict(
+                idx, "bad_time",
+                f"unparseable time_point {commit.get('time_point')!r}",
+                repaired=repair,
+            ))
+            if repair:
+                continue
+            yield commit
+            continue
+
+        ts = commit_time.timestamp()
+
+        if prev_ts is not None and ts <= prev_ts:
+            report.append(PlanConflict(
+                idx, "non_monotonic_time",
+                f"{commit_time.isoformat()} <= previous commit",
+                repaired=repair,
+            ))
+            if repair:
+                planned_day = commit_time.date()
+                commit_time += timedelta(seconds=prev_ts - ts + 1)
+                ts = commit_time.timestamp()
+                if commit_time.date() != planned_day:
+                    report.append(PlanConflict(
+                        idx, "day_overflow",
+                        f"bumped to {commit_time.isoformat()}, past planned day {planned_day}",
+                        repaired=True,
+                    ))
+                    continue
+
+        # after the bump: a repaired time must not land in the future either
+        if ts > now_ts:
+            report.append(PlanConflict(
+                idx, "future_time",
+                f"{commit_time.isoformat()} is in the future",
+                repaired=repair,
+            ))
+            if repair:
+                continue
+
+        kept = []
+        for i, action in enumerate(commit.get("actions", [])):
+            problem = _apply_plan_action(existing, action)
+            if problem is None:
+                kept.append(action)
+                continue
+            kind, detail = problem
+            report.append(PlanConflict(
+                idx, kind, detail, action_index=i, repaired=repair,
+            ))
+
+        if not repair:
+            prev_ts = ts
+            yield commit
+            continue
+
+        if not kept:
+            report.append(PlanConflict(
+                idx, "empty_commit", "no valid actions left", repaired=True,
+            ))
+            continue
+
+        prev_ts = ts
+        yield {**commit, "time_point": commit_time.isoformat(), "actions": kept}
+
+
+def _apply_plan_action(existing: set, action: Dict[str, Any]):
+    """
+    Check one action against the evolving existence set and apply it.
+    Returns None if valid, else (kind, detail) and leaves the set untouched.
+    """
+    op = action.get("op") or action.get("type")
+
+    if op == "add":
+        path = action.get("path")
+        if not path:
+            return "bad_action", f"add without path: {action}"
+        existing.add(path)
+        return None
+
+    if op in ("edit", "delete"):
+        path = action.get("path")
+        if path not in existing:
+            return "missing_target", f"{op} of missing file {path!r}"
+        if op == "delete":
+            existing.remove(path)
+        return None
+
+    if op == "rename":
+        src, dst = action.get("src"), action.get("dst")
+        if src not in existing:
+            return "missing_source", f"rename from missing file {src!r}"
+        if dst in existing:
+            return "target_exists", f"rename onto existing file {dst!r}"
+        existing.remove(src)
+        existing.add(dst)
+        return None
+
+    return "bad_action", f"unknown op {op!r}"
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
@@ -9,16 +9,16 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
 
-from src.core.msg_lib import MsgLibrary
+from src.core.msg_lib import MSGS_PATH, MsgLibrary
+from src.core.plan_index import with_plan_trailer
+from src.core.run_metrics import METRICS
 
 
 # --------------------------------------------------
 # Msg library (GLOBAL, stable)
 # --------------------------------------------------
 
-_MSG_LIB = MsgLibrary(
-    Path("src/res/gitcom_msgs.json")
-)
+_MSG_LIB = MsgLibrary(MSGS_PATH)
 
 
 # --------------------------------------------------
@@ -30,10 +30,32 @@ def execute_one_commit(
     git_cmd_pack: List[Dict[str, Any]],
     commit_time: datetime,
     commit_index: int,
+    plan_id: str | None = None,
+    rng=None,
+    message: str | None = None,
+    msg_index=None,
+    author: tuple[str, str] | None = None,
+    sparse: bool = False,
+    allow_empty: bool = False,
 ):
     """
     Execute ONE git commit with a pack of structured file commands.
 
+    plan_id (optional) is recorded as a Gitcom-Plan-Id trailer so
+    re-executing the same plan can skip this commit (see plan_index).
+    rng (optional) is the message stream for this commit (see rng_streams).
+    message (optional) is a pre-planned message (see parallel_planner).
+    msg_index (optional) is the repo's message index (see msg_index):
+    library picks skip messages already in the history, and the new
+    commit's message is added to it.
+    author (optional) is (name, email) for this commit only, passed as
+    GIT_AUTHOR_* / GIT_COMMITTER_* env (no git config writes).
+    sparse (optional) stages only the pack's own paths instead of
+    `git add .`, for sparse-checkout cones (see sparse_exec).
+    allow_empty (optional) commits a pack with no net change (e.g. add,
+    rename, delete of one file) instead of failing, so a replayed plan
+    keeps one commit per planned commit (see plan_stream).
+
     Contract:
     - git_cmd_pack must be List[dict]
     - each cmd must contain:
@@ -48,9 +70,21 @@ def execute_one_commit(
 
     _apply_git_cmd_pack(repo_path, git_cmd_pack)
 
-    commit_msg = _MSG_LIB.pick(commit_index)
+    # message follows the leading action of the pack
+    if message is None:
+        message = _MSG_LIB.random_msg(
+            git_cmd_pack[0]["type"], commit_index, rng=rng, seen=msg_index
+        )
+
+    commit_msg = with_plan_trailer(message, plan_id)
+
+    paths = _pack_paths(git_cmd_pack) if sparse else None
+    _git_commit(repo_path, commit_msg, commit_time, author, paths, allow_empty)
 
-    _git_commit(repo_path, commit_msg, commit_time)
+    if msg_index is not None:
+        msg_index.add(message)
+
+    METRICS.inc("gitcom_commits_executed", engine="executor")
 
 
 # --------------------------------------------------
@@ -142,25 +176,56 @@ def _cmd_rename(repo_path: Path, cmd):
         src.rename(dst)
 
 
+def _pack_paths(git_cmd_pack) -> List[str]:
+    paths = []
+    for cmd in git_cmd_pack:
+        if cmd["type"] == "rename":
+            paths += [cmd["src"], cmd["dst"]]
+        else:
+            paths.append(cmd["path"])
+    return list(dict.fromkeys(paths))
+
+
 # --------------------------------------------------
 # Git Commit
 # --------------------------------------------------
 
-def _git_commit(repo_path: Path, message: str, commit_time: datetime):
+def _git_commit(
+    repo_path: Path,
+    message: str,
+    commit_time: datetime,
+    author: tuple[str, str] | None = None,
+    paths: List[str] | None = None,
+    allow_empty: bool = False,
+):
     env = os.environ.copy()
     env["GIT_AUTHOR_DATE"] = commit_time.isoformat()
     env["GIT_COMMITTER_DATE"] = commit_time.isoformat()
+    if author is not None:
+        name, email = author
+        env["GIT_AUTHOR_NAME"] = env["GIT_COMMITTER_NAME"] = name
+        env["GIT_AUTHOR_EMAIL"] = env["GIT_COMMITTER_EMAIL"] = email
+
+    if paths is None:
+        add_cmd = ["git", "add", "."]
+    else:
+        # exactly these paths: added, modified or removed, no worktree scan
+        add_cmd = ["git", "update-index", "--add", "--remove", "--", *paths]
+    with METRICS.time_git(add_cmd):
+        subprocess.run(
+            add_cmd,
+            cwd=repo_path,
+            check=True,
+            env=env,
+        )
 
-    subprocess.run(
-        ["git", "add", "."],
-        cwd=repo_path,
-        check=True,
-        env=env,
-    )
-
-    subprocess.run(
-        ["git", "commit", "-m", message],
-        cwd=repo_path,
-        check=True,
-        env=env,
-    )
+    commit_cmd = ["git", "commit", "-m", message]
+    if allow_empty:
+        commit_cmd.append("--allow-empty")
+    with METRICS.time_git(commit_cmd):
+        subprocess.run(
+            commit_cmd,
+            cwd=repo_path,
+            check=True,
+            env=env,
+        )
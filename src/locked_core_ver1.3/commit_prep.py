@@ -2,6 +2,7 @@
 # -----------------------
 # Prepare identity and date context for a single simulated day
 
+import json
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -47,6 +48,60 @@ def load_identity(identity_file: Path) -> tuple[str, str]:
     return username, email
 
 
+@dataclass(frozen=True)
+class Identity:
+    username: str
+    email: str
+    work_probability: float = 0.85
+    multi_commit_probability: float = 0.35
+
+    @property
+    def author(self) -> tuple[str, str]:
+        return self.username, self.email
+
+
+def load_identities(path: Path) -> list[Identity]:
+    """
+    Load several identities (team simulation).
+
+    - *.json: [{"username": ..., "email": ..., "work_probability": ...}, ...]
+              or a repo_config-style {"git_identities": [...]}
+    - otherwise identity.txt format, one username=/email= block per
+      person (every username= line starts a new identity)
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Identity file not found: {path}")
+
+    if path.suffix == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("git_identities", [])
+        identities = [Identity(**entry) for entry in data]
+    else:
+        blocks: list[dict] = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                if key == "username":
+                    blocks.append({"username": value})
+                elif key == "email" and blocks:
+                    blocks[-1]["email"] = value
+        identities = [Identity(**b) for b in blocks if b.get("email")]
+
+    if not identities:
+        raise ValueError(f"No identities (username + email) in {path}")
+
+    emails = [i.email for i in identities]
+    if len(set(emails)) != len(emails):
+        raise ValueError("Identity emails must be unique")
+
+    return identities
+
+
 # ---------- date ----------
 
 def select_date(input_date: str | None = None) -> str:
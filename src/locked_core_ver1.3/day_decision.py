@@ -5,7 +5,7 @@
 import random
 
 
-def decide_day_state(work_probability: float = 0.85) -> str:
+def decide_day_state(work_probability: float = 0.85, rng=random) -> str:
     """
     Decide whether the day is a working day or a rest day.
 
@@ -15,11 +15,12 @@ def decide_day_state(work_probability: float = 0.85) -> str:
     if not 0.0 <= work_probability <= 1.0:
         raise ValueError("work_probability must be between 0 and 1")
 
-    return "work" if random.random() < work_probability else "rest"
+    return "work" if rng.random() < work_probability else "rest"
 
 
 def decide_commit_mode(
-    multi_commit_probability: float = 0.35
+    multi_commit_probability: float = 0.35,
+    rng=random,
 ) -> str:
     """
     Decide whether the day uses single-commit or multi-commit mode.
@@ -30,4 +31,4 @@ def decide_commit_mode(
     if not 0.0 <= multi_commit_probability <= 1.0:
         raise ValueError("multi_commit_probability must be between 0 and 1")
 
-    return "multiple" if random.random() < multi_commit_probability else "single"
+    return "multiple" if rng.random() < multi_commit_probability else "single"
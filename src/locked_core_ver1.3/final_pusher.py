@@ -1,5 +1,8 @@
 import subprocess
 from pathlib import Path
+from typing import Dict
+
+from src.core.run_metrics import METRICS
 
 
 def push_gitcom_repo(
@@ -20,17 +23,56 @@ def push_gitcom_repo(
         print("[pusher] dry_run=True, skip actual push")
         return
 
+    # repos provisioned on a shared object store: hand new objects to the
+    # store and drop the local copies before pack-objects reads them
+    from src.core.object_store import repack_before_push
+    repack_before_push(repo_path)
+
+    # extra rev-list walk: only when someone is reading the metrics
+    push_bytes = _estimate_push_bytes(repo_path) if METRICS.exporting else None
+
+    push_cmd = ["git", "push"]
     try:
-        subprocess.run(
-            ["git", "push"],
-            cwd=repo_path,
-            check=True,
-        )
+        with METRICS.time_git(push_cmd):
+            subprocess.run(
+                push_cmd,
+                cwd=repo_path,
+                check=True,
+            )
     except subprocess.CalledProcessError as e:
         print("[pusher] push failed")
         raise e
 
-    print("[pusher] push completed")
+    if push_bytes is None:
+        print("[pusher] push completed")
+        return
+
+    METRICS.inc("gitcom_push_bytes", push_bytes)
+    print(f"[pusher] push completed (~{push_bytes} bytes)")
+
+
+def _estimate_push_bytes(repo_path: str) -> int:
+    """
+    On-disk size of objects not yet on the upstream branch.
+    Returns 0 when there is no upstream or git is too old for --disk-usage.
+    """
+    cmd = ["git", "rev-list", "--objects", "--disk-usage", "@{u}..HEAD"]
+    with METRICS.time_git(cmd):
+        result = subprocess.run(
+            cmd,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+
+    if result.returncode != 0:
+        return 0
+
+    try:
+        return int(result.stdout.strip() or 0)
+    except ValueError:
+        return 0
 
 
 # --------------------------------------------------
@@ -52,17 +94,22 @@ def _resolve_repo_path(
         [mac]
         gitcom-test=/Users/xxx/gitcom-test
     """
-    if not repopath_file.exists():
-        raise FileNotFoundError(f"repopath file not found: {repopath_file}")
+    mapping = load_repo_paths(repopath_file)
 
-    import platform
+    if repo_name not in mapping:
+        raise KeyError(f"repo '{repo_name}' not found in {_platform_section()}")
 
-    system = platform.system().lower()
-    if system.startswith("win"):
-        section = "[windows]"
-    else:
-        section = "[mac]"
+    return mapping[repo_name]
+
+
+def load_repo_paths(repopath_file: Path) -> Dict[str, str]:
+    """
+    All name -> path entries of the current platform's section.
+    """
+    if not repopath_file.exists():
+        raise FileNotFoundError(f"repopath file not found: {repopath_file}")
 
+    section = _platform_section()
     current = None
     mapping = {}
 
@@ -78,7 +125,13 @@ def _resolve_repo_path(
                 k, v = line.split("=", 1)
                 mapping[k.strip()] = v.strip()
 
-    if repo_name not in mapping:
-        raise KeyError(f"repo '{repo_name}' not found in {section}")
+    return mapping
 
-    return mapping[repo_name]
+
+def _platform_section() -> str:
+    import platform
+
+    system = platform.system().lower()
+    if system.startswith("win"):
+        return "[windows]"
+    return "[mac]"
@@ -3,10 +3,13 @@
 import random
 import json
 import os
-import time
+from pathlib import Path
+
+# 消息库随锁定资源一起发布，按模块位置定位（与工作目录无关）
+MSGS_PATH = Path(__file__).resolve().parents[1] / "locked_res_ver1.3" / "gitcom_msgs.json"
 
 class MsgLibrary:
-    def __init__(self, local_file_path="gitcom_msgs.json"):
+    def __init__(self, local_file_path=MSGS_PATH):
         self.local_file_path = local_file_path
         self.msg_data = self.load_msgs()
         self.used_msgs = {action: [] for action in self.msg_data.keys()}
@@ -17,16 +20,35 @@ class MsgLibrary:
                 return json.load(file)
         return {}
     
-    def random_msg(self, action_type, commit_index):
-        random.seed(commit_index + time.time())  # 使用时间戳和 commit_index 生成随机种子
+    def random_msg(self, action_type, commit_index, rng=None, seen=None):
+        # rng: 调用方传入的随机流 (rng_streams)，不再用时间戳重置全局种子
+        # seen: 仓库历史消息索引 (msg_index.MsgIndex)，优先选历史中未出现过的消息
+        rng = rng or random
+
+        # 与 pick 一致：库中没有该类型的消息时退回类型名本身
+        if not self.msg_data.get(action_type):
+            return action_type
 
-        available_msgs = list(set(self.msg_data[action_type]) - set(self.used_msgs[action_type]))
+        used = set(self.used_msgs.setdefault(action_type, []))
+        available_msgs = [msg for msg in self.msg_data[action_type] if msg not in used]
+
+        if seen is not None:
+            fresh_msgs = [msg for msg in available_msgs if msg not in seen]
+            if fresh_msgs:
+                available_msgs = fresh_msgs
 
         if not available_msgs:
             self.used_msgs[action_type] = []
             available_msgs = self.msg_data[action_type]
 
-        commit_msg = random.choice(available_msgs)
+        commit_msg = rng.choice(available_msgs)
         self.used_msgs[action_type].append(commit_msg)
 
         return commit_msg
+
+    def pick(self, action_type, u):
+        # 无状态选择：u ∈ [0, 1) 由调用方的随机流给出（并行规划用，与分片无关）
+        msgs = self.msg_data.get(action_type) or []
+        if not msgs:
+            return action_type
+        return msgs[int(u * len(msgs))]
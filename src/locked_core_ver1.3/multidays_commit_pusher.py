@@ -0,0 +1,290 @@
+"""
+multidays_commit_pusher.py
+
+Multi-day noise simulation orchestrator.
+Same pipeline as oneday, over a date range; one push at the end.
+"""
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.core.snap_state import load_last_snap, persist_snap
+from src.core.day_decision import decide_day_state, decide_commit_mode
+from src.core.action_layout import generate_actions
+from src.core.anti_timedox import validate_actions
+from src.core.commit_executor import execute_one_commit
+from src.core.final_pusher import push_gitcom_repo
+from src.core.msg_index import MsgIndex
+from src.core.repo_maintenance import maintain
+from src.core.rng_streams import RngStreams, resolve_seed
+from src.core.run_refs import begin_run, finish_run
+from src.core.run_metrics import METRICS
+from src.core.sparse_exec import apply_cone, snap_cone
+from src.core.time_set import TimeInjection, commit_times, to_datetimes
+from src.core.weighted_pick import TargetSampler
+
+
+RUN_MODES = ("dry_run", "soft_run", "full_run")
+
+MULTI_COMMIT_RANGE = (2, 4)   # commits on a "multiple" day, inclusive
+
+TARGET_RECENCY = 0.05         # edit/delete favour recently touched files
+
+Progress = Callable[[Dict[str, Any]], None]
+
+
+# --------------------------------------------------
+# helpers
+# --------------------------------------------------
+
+def date_range(begin: str, end: str) -> List[str]:
+    """
+    Inclusive list of YYYY-MM-DD strings.
+    """
+    day = datetime.strptime(begin, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    if last < day:
+        raise ValueError(f"end {end} is before begin {begin}")
+
+    days = []
+    while day <= last:
+        days.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return days
+
+
+def apply_actions_to_snap(snap: set, actions: Iterable[Dict[str, str]]) -> None:
+    for act in actions:
+        if act["type"] == "add":
+            snap.add(act["path"])
+        elif act["type"] == "delete":
+            snap.discard(act["path"])
+        elif act["type"] == "rename":
+            snap.discard(act["src"])
+            snap.add(act["dst"])
+
+
+def plan_day_counts(days: List[str], streams: Optional[RngStreams] = None) -> List[int]:
+    """
+    Commits per day for the whole range (0 = rest day).
+
+    With `streams`, each day draws from its own (day, "day") stream, so
+    the count of a day does not depend on the rest of the range.
+    """
+    counts: List[int] = []
+
+    for day in days:
+        rng = streams.stream(day, "day") if streams is not None else random
+
+        if decide_day_state(rng=rng) == "rest":
+            counts.append(0)
+            continue
+
+        n = 1
+        if decide_commit_mode(rng=rng) == "multiple":
+            n = rng.randint(*MULTI_COMMIT_RANGE)
+        counts.append(n)
+
+    return counts
+
+
+def _emit(progress: Optional[Progress], **event):
+    if progress is not None:
+        progress(event)
+
+
+# --------------------------------------------------
+# core
+# --------------------------------------------------
+
+def run_days(
+    *,
+    repo_path: str,
+    begin: str,
+    end: str,
+    snap_dir: Path,
+    run_mode: str = "soft_run",
+    time_injection: Optional[TimeInjection] = None,
+    last_snap: Optional[Iterable[str]] = None,
+    progress: Optional[Progress] = None,
+    maintain_every: int = 0,
+    remote: Optional[str] = None,
+    seed: Optional[int] = None,
+    counts: Optional[List[int]] = None,
+    dedup_msgs: bool = True,
+    record_run: bool = True,
+    sparse: bool = False,
+) -> Dict[str, Any]:
+    """
+    Simulate every day in [begin, end] on repo_path.
+
+    - last_snap: starting snapshot (loaded from snap_dir when None)
+    - progress:  optional callback receiving one dict per event
+    - maintain_every: run repo_maintenance every N work days and once
+                      before persist/push (0 = off)
+    - remote: the push remote (repo_config.json execution_repo.remote);
+              maintenance times `git push --dry-run` against it
+    - seed: run seed for the (repo, day, purpose) streams; a fresh one is
+            drawn (and returned in the summary) when None
+    - counts: commits per day for the whole range (e.g. heatmap_solver);
+              replaces the day_decision draws
+    - dedup_msgs: prefer messages never used in the repo history
+                  (msg_index, kept up to date as commits are created)
+    - record_run: record run refs + the pre-run snapshot so the range can
+                  be rolled back (run_refs); summary["run_id"]
+    - sparse: run in a sparse-checkout cone covering the snapshot and
+              the add directory; commits stage only their own paths
+              (sparse_exec)
+
+    Returns a summary; summary["snap"] is the final snapshot set.
+    """
+    if run_mode not in RUN_MODES:
+        raise ValueError(f"run_mode must be one of {RUN_MODES}, got {run_mode}")
+
+    injection = time_injection or TimeInjection()
+    days = date_range(begin, end)
+    snap = set(last_snap) if last_snap is not None else load_last_snap(snap_dir)
+
+    seed = resolve_seed(seed)
+    streams = RngStreams(seed, repo=Path(repo_path).resolve().name)
+
+    # 1. day decisions for the whole range (0 commits = rest day)
+    if counts is None:
+        counts = plan_day_counts(days, streams)
+    elif len(counts) != len(days):
+        raise ValueError(f"counts has {len(counts)} entries for {len(days)} days")
+    work_days = [day for day, n in zip(days, counts) if n]
+
+    # 2. all commit times in one call
+    times = to_datetimes(commit_times(days, counts, injection, streams=streams), injection)
+
+    if sparse and run_mode != "dry_run":
+        apply_cone(repo_path, snap_cone(snap))
+
+    # 3. actions + commits, day by day (events in calendar order)
+    sampler = TargetSampler(snap, recency=TARGET_RECENCY)
+    msg_index = MsgIndex(repo_path).load() if dedup_msgs and run_mode != "dry_run" else None
+    run = (
+        begin_run(repo_path, snap_dir, begin=begin, end=end, seed=seed, run_mode=run_mode)
+        if record_run and run_mode != "dry_run"
+        else None
+    )
+
+    k = 0
+    done_work_days = 0
+    for day, n in zip(days, counts):
+        if n == 0:
+            METRICS.inc("gitcom_days_skipped", engine="multidays", reason="rest")
+            _emit(progress, event="day", day=day, state="rest", commits=0)
+            continue
+
+        METRICS.inc("gitcom_days_planned", engine="multidays")
+
+        for commit_index in range(1, n + 1):
+            actions = generate_actions(
+                snap,
+                sampler=sampler,
+                rng=streams.stream(day, f"actions/{commit_index}"),
+                target_rng=streams.stream(day, f"targets/{commit_index}"),
+            )
+            valid_actions = validate_actions(last_snap=snap, actions=actions)
+
+            if run_mode != "dry_run":
+                execute_one_commit(
+                    repo_path=Path(repo_path),
+                    git_cmd_pack=valid_actions,
+                    commit_time=times[k],
+                    commit_index=commit_index,
+                    rng=streams.stream(day, f"message/{commit_index}"),
+                    msg_index=msg_index,
+                    sparse=sparse,
+                )
+
+            apply_actions_to_snap(snap, valid_actions)
+            sampler.apply(valid_actions)
+            k += 1
+
+        _emit(progress, event="day", day=day, state="work", commits=n, snap_size=len(snap))
+
+        done_work_days += 1
+        if (
+            maintain_every
+            and run_mode != "dry_run"
+            and done_work_days % maintain_every == 0
+            and done_work_days < len(work_days)
+        ):
+            maintain(repo_path, remote=remote)
+
+    # 4. message index + maintenance + persist + push
+    if msg_index is not None and k:
+        msg_index.save()
+
+    if maintain_every and run_mode != "dry_run" and k:
+        maintain(repo_path, remote=remote)
+
+    if run_mode != "dry_run":
+        Path(snap_dir).mkdir(parents=True, exist_ok=True)
+        persist_snap(snap_dir, snap)
+
+    if run is not None:
+        finish_run(repo_path, run)
+
+    if run_mode == "full_run" and k:
+        push_gitcom_repo(repo_path=repo_path)
+
+    return {
+        "days": len(days),
+        "work_days": len(work_days),
+        "commits": k,
+        "run_mode": run_mode,
+        "seed": seed,
+        "run_id": run["id"] if run else None,
+        "snap": snap,
+    }
+
+
+# --------------------------------------------------
+# entry
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from src.core.time_set import load_time_injection
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--begin", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--mode", default="soft_run", choices=RUN_MODES)
+    parser.add_argument("--bulk", action="store_true", help="run under the bulk-mode git profile")
+    parser.add_argument("--maintain-every", type=int, default=0, help="repo maintenance every N work days")
+    parser.add_argument("--seed", type=int, default=None, help="run seed (reproducible runs)")
+    parser.add_argument("--allow-repeat-msgs", action="store_true", help="skip the history message index")
+    parser.add_argument("--sparse", action="store_true", help="sparse-checkout cone limited to the touched paths")
+    args = parser.parse_args()
+
+    from contextlib import nullcontext
+    from src.core.bulk_mode import bulk_mode
+
+    config_path = Path("src/res/repo_config.json")
+    with open(config_path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    with bulk_mode(".") if args.bulk else nullcontext():
+        summary = run_days(
+            repo_path=".",
+            begin=args.begin,
+            end=args.end,
+            snap_dir=Path("src/res"),
+            run_mode=args.mode,
+            time_injection=load_time_injection(config_path),
+            maintain_every=args.maintain_every,
+            remote=cfg.get("execution_repo", {}).get("remote"),
+            seed=args.seed,
+            dedup_msgs=not args.allow_repeat_msgs,
+            sparse=args.sparse,
+        )
+    print(f"[multidays] {summary['commits']} commits over {summary['work_days']}/{summary['days']} days")
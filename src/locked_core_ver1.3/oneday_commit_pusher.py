@@ -6,8 +6,6 @@ Executor is atomic; identity is bound here.
 """
 
 from pathlib import Path
-from datetime import datetime, timedelta
-import subprocess
 
 from src.core.repo_truth import load_head_structure
 from src.core.snap_state import load_last_snap, persist_snap
@@ -17,6 +15,9 @@ from src.core.anti_timedox import validate_actions
 from src.core.commit_parser import parse_actions
 from src.core.commit_executor import execute_one_commit
 from src.core.commit_prep import prepare_day_context
+from src.core.msg_index import MsgIndex
+from src.core.run_metrics import METRICS
+from src.core.time_set import TimeInjection, load_time_injection, times_for_day
 
 
 # --------------------------------------------------
@@ -30,25 +31,6 @@ FORCE_WORK = True   # 临时调试用，关掉即可恢复真实 rest 行为
 # helpers
 # --------------------------------------------------
 
-def _ensure_git_identity(repo_path: str, username: str, email: str):
-    subprocess.run(
-        ["git", "config", "user.name", username],
-        cwd=repo_path,
-        check=True,
-    )
-    subprocess.run(
-        ["git", "config", "user.email", email],
-        cwd=repo_path,
-        check=True,
-    )
-
-
-def _inject_commit_time(base_date: str, commit_index: int) -> datetime:
-    day = datetime.strptime(base_date, "%Y-%m-%d")
-    base_time = day.replace(hour=10, minute=30, second=0)
-    return base_time + timedelta(minutes=17 * (commit_index - 1))
-
-
 def _text_cmds_to_structured(cmd_lines: list[str]) -> list[dict]:
     structured = []
 
@@ -82,14 +64,13 @@ def run_one_day(
     identity_file: Path,
     snap_dir: Path,
     input_date: str | None = None,
+    time_injection: TimeInjection | None = None,
 ) -> None:
 
     # 1. prepare day context
     day_ctx = prepare_day_context(identity_file, input_date)
     print(f"[day] date = {day_ctx.base_date}")
 
-    _ensure_git_identity(repo_path, day_ctx.username, day_ctx.email)
-
     # 2. repo truth
     truth_paths = load_head_structure(repo_path)
     print(f"[truth] {len(truth_paths)} tracked paths")
@@ -108,8 +89,11 @@ def run_one_day(
             day_state = "work"
         else:
             print("[decision] rest day, no commits")
+            METRICS.inc("gitcom_days_skipped", engine="oneday", reason="rest")
             return
 
+    METRICS.inc("gitcom_days_planned", engine="oneday")
+
     commit_mode = decide_commit_mode()
     print(f"[decision] commit_mode = {commit_mode}")
 
@@ -118,7 +102,7 @@ def run_one_day(
     print(f"[action] generated {len(actions)} actions")
 
     valid_actions = validate_actions(
-        last_snap=list(last_snap),
+        last_snap=last_snap,
         actions=actions,
     )
     print(f"[timedox] {len(valid_actions)} actions survived")
@@ -133,14 +117,21 @@ def run_one_day(
 
     # 7. execute commit (single for now)
     commit_index = 1
-    commit_time = _inject_commit_time(day_ctx.base_date, commit_index)
+    commit_times = times_for_day(
+        day_ctx.base_date, commit_index, time_injection or TimeInjection()
+    )
+    commit_time = commit_times[commit_index - 1]
 
+    msg_index = MsgIndex(repo_path).load()
     execute_one_commit(
         repo_path=Path(repo_path),
         git_cmd_pack=git_cmd_pack,
         commit_time=commit_time,
         commit_index=commit_index,
+        msg_index=msg_index,
+        author=(day_ctx.username, day_ctx.email),
     )
+    msg_index.save()
     print("[commit] executed 1 commit")
 
     # 8. update snap
@@ -165,4 +156,5 @@ if __name__ == "__main__":
         identity_file=Path("src/res/identity.txt"),
         snap_dir=Path("src/res"),
         input_date=None,
+        time_injection=load_time_injection(Path("src/res/repo_config.json")),
     )
@@ -1,20 +1,31 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
 import os
 import shutil
 import subprocess
+import sys
 import json
-import random
 from datetime import datetime, timedelta, timezone
 
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.dirname(CORE_DIR)
+
+# run as a plain script (the directory name is not importable): make the
+# repo root importable for src.core
+sys.path.insert(0, os.path.dirname(SRC_DIR))
+
+from src.core.run_metrics import METRICS, enable_from_env
+from src.core.rng_streams import RngStreams, resolve_seed
+from src.core.time_set import TimeInjection, commit_times, format_git_date
+from src.core.run_journal import RunJournal, current_head, default_journal_path, resume_seed
+
 
 # =========================
 # Load config
 # =========================
 
-CORE_DIR = os.path.dirname(os.path.abspath(__file__))
-SRC_DIR = os.path.dirname(CORE_DIR)
 RES_DIR = os.path.join(SRC_DIR, "res")
 CONFIG_PATH = os.path.join(RES_DIR, "repo_config.json")
 
@@ -34,6 +45,7 @@ INCLUSIVE = cfg["time_window"].get("inclusive", True)
 
 TZ_OFFSET = cfg["time_injection"]["timezone"]  # e.g. "-0500"
 HOUR_RANGE = cfg["time_injection"]["hour_range"]
+TIME_INJECTION = TimeInjection.from_config(cfg)
 
 COMMIT_MSG = cfg["message"]["default"]
 
@@ -59,21 +71,20 @@ def is_protected(name: str) -> bool:
 # =========================
 
 def run(cmd, cwd=None):
-    subprocess.run(cmd, cwd=cwd, check=True)
+    with METRICS.time_git(cmd):
+        subprocess.run(cmd, cwd=cwd, check=True)
 
 
-def inject_commit_time(day: datetime) -> str:
+def inject_commit_times(days, streams: RngStreams = None) -> dict:
     """
     关键修复点：
-    - 固定使用「中午时间」避免 UTC 跨日
-    - 不再随机到晚间
+    - 按 time_injection（timezone / hour_range / strategy）生成
+    - time_set 保证不跨 UTC 日
+    - streams: 按 (seed, repo, day) 的独立随机流，可复现
+    - 整个区间一次生成（每天 1 个 commit），返回 {day_str: git date}
     """
-    hour = random.randint(11, 15)  # 安全区间
-    minute = random.randint(0, 59)
-    second = random.randint(0, 59)
-
-    t = day.replace(hour=hour, minute=minute, second=second)
-    return t.strftime(f"%Y-%m-%d %H:%M:%S {TZ_OFFSET}")
+    epochs = commit_times(days, [1] * len(days), TIME_INJECTION, streams=streams)
+    return {d: format_git_date(e, TIME_INJECTION) for d, e in zip(days, epochs)}
 
 
 def apply_repo_state(day_str: str):
@@ -115,6 +126,17 @@ def apply_repo_state(day_str: str):
 # Main simulation
 # =========================
 
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="continue from the last checkpoint in <exec repo>/.git/gitcom/run_journal.json",
+)
+parser.add_argument("--seed", type=int, default=None, help="run seed (default: repo_config.json \"seed\")")
+args = parser.parse_args()
+
+enable_from_env()
+
 os.chdir(EXEC_REPO)
 
 run(["git", "config", "user.name", GIT_USER])
@@ -122,23 +144,71 @@ run(["git", "config", "user.email", GIT_EMAIL])
 
 day = TIME_BEGIN
 delta = timedelta(days=1)
+position = 0
+
+journal = RunJournal(
+    default_journal_path(),
+    run_key={
+        "engine": "ver2.0",
+        "begin": cfg["time_window"]["begin"],
+        "end": cfg["time_window"]["end"],
+    },
+)
+
+point = journal.resume_point() if args.resume else None
+if point:
+    position = point["next_position"]
+    day = datetime.fromisoformat(point["next_day"])
+    print(f"[journal] resuming at {point['next_day']} (day #{position})")
+elif args.resume:
+    print("[journal] nothing to resume, starting fresh")
+
+# a resumed run keeps the journal seed: the remaining days draw the same streams
+journal.seed = resolve_seed(resume_seed(point, args.seed), cfg)
+STREAMS = RngStreams(journal.seed, repo=os.path.basename(EXEC_REPO.rstrip("/")))
+
+# per-day streams: the range from `day` on draws exactly what a full run would
+days_left = []
+d = day
+while d <= TIME_END:
+    days_left.append(d.strftime("%Y-%m-%d"))
+    d += delta
+COMMIT_TIMES = inject_commit_times(days_left, STREAMS)
 
 while True:
     if day > TIME_END:
         break
 
     day_str = day.strftime("%Y-%m-%d")
+    next_day_str = (day + delta).strftime("%Y-%m-%d")
     print(f"\n=== Simulating {day_str} ===")
 
+    commit_time = COMMIT_TIMES[day_str]
+    journal.mark_pending(
+        position=position,
+        day=day_str,
+        next_day=next_day_str,
+        head_sha=current_head(),
+    )
+
     changed = apply_repo_state(day_str)
 
     if not changed:
+        METRICS.inc("gitcom_days_skipped", engine="ver2.0", reason="no_repo_state")
+        journal.record_day(
+            position=position,
+            day=day_str,
+            next_day=next_day_str,
+            head_sha=current_head(),
+            snap_version=journal.state.get("snap_version"),
+        )
+        position += 1
         day += delta
         continue
 
-    run(["git", "add", "-A"])
+    METRICS.inc("gitcom_days_planned", engine="ver2.0")
 
-    commit_time = inject_commit_time(day)
+    run(["git", "add", "-A"])
 
     run([
         "git", "commit",
@@ -146,7 +216,20 @@ while True:
         "-m", COMMIT_MSG,
         "--date", commit_time
     ])
+    METRICS.inc("gitcom_commits_executed", engine="ver2.0")
 
     run(["git", "push", REMOTE, "main"])
 
+    # snapshot version = the repo_states/<day> directory just applied
+    journal.record_day(
+        position=position,
+        day=day_str,
+        next_day=next_day_str,
+        head_sha=current_head(),
+        snap_version=day_str,
+    )
+
+    position += 1
     day += delta
+
+journal.finish()
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+import pytest
+
+from src.core.anti_timedox import check_plan, validate_actions, validate_plan
+
+
+NOW = datetime(2022, 2, 1, 12, 0, 0)
+
+
+def _c(i, time_point, *actions):
+    return {"commit_index": i, "time_point": time_point, "actions": list(actions)}
+
+
+def _kinds(report):
+    return [(c.commit_index, c.kind, c.repaired) for c in report]
+
+
+def test_clean_plan_passes_through():
+    plan = [
+        _c(0, "2022-01-03T10:00:00", {"op": "add", "path": "a"}),
+        _c(1, "2022-01-03T11:00:00", {"op": "rename", "src": "a", "dst": "b"}),
+        _c(2, "2022-01-04T09:00:00", {"op": "edit", "path": "b"}, {"op": "delete", "path": "x"}),
+    ]
+    out, report = validate_plan({"x"}, plan, now=NOW)
+    assert report == []
+    assert out == plan
+
+
+@pytest.mark.parametrize("action, kind", [
+    ({"op": "edit", "path": "nope"}, "missing_target"),
+    ({"op": "delete", "path": "nope"}, "missing_target"),
+    ({"op": "rename", "src": "nope", "dst": "y"}, "missing_source"),
+    ({"op": "rename", "src": "x", "dst": "z"}, "target_exists"),
+    ({"op": "add"}, "bad_action"),
+    ({"op": "chmod", "path": "x"}, "bad_action"),
+])
+def test_action_conflicts(action, kind):
+    plan = [_c(0, "2022-01-03T10:00:00", action, {"op": "edit", "path": "x"})]
+    out, report = validate_plan({"x", "z"}, plan, now=NOW)
+    assert _kinds(report) == [(0, kind, True)]
+    assert out[0]["actions"] == [{"op": "edit", "path": "x"}]
+
+
+def test_emptied_commit_is_dropped():
+    plan = [_c(0, "2022-01-03T10:00:00", {"op": "edit", "path": "nope"})]
+    out, report = validate_plan(set(), plan, now=NOW)
+    assert out == []
+    assert _kinds(report) == [(0, "missing_target", True), (0, "empty_commit", True)]
+
+
+def test_bad_time_is_dropped_and_reported_repaired():
+    plan = [_c(0, "yesterday", {"op": "add", "path": "a"})]
+    out, report = validate_plan(set(), plan, now=NOW)
+    assert out == []
+    assert _kinds(report) == [(0, "bad_time", True)]
+
+    assert _kinds(check_plan(set(), plan, now=NOW)) == [(0, "bad_time", False)]
+
+
+def test_future_commit_is_dropped():
+    plan = [_c(0, "2022-03-01T10:00:00", {"op": "add", "path": "a"})]
+    out, report = validate_plan(set(), plan, now=NOW)
+    assert out == []
+    assert _kinds(report) == [(0, "future_time", True)]
+
+
+def test_non_monotonic_time_is_bumped():
+    plan = [
+        _c(0, "2022-01-03T10:00:00", {"op": "add", "path": "a"}),
+        _c(1, "2022-01-03T09:00:00", {"op": "edit", "path": "a"}),
+    ]
+    out, report = validate_plan(set(), plan, now=NOW)
+    assert _kinds(report) == [(1, "non_monotonic_time", True)]
+    assert out[1]["time_point"] == "2022-01-03T10:00:01"
+
+
+def test_bump_past_midnight_is_dropped():
+    plan = [
+        _c(0, "2022-01-03T23:59:59", {"op": "add", "path": "a"}),
+        _c(1, "2022-01-03T23:00:00", {"op": "edit", "path": "a"}),
+    ]
+    out, report = validate_plan(set(), plan, now=NOW)
+    assert [c["commit_index"] for c in out] == [0]
+    assert _kinds(report) == [(1, "non_monotonic_time", True), (1, "day_overflow", True)]
+
+
+def test_bump_into_the_future_is_dropped():
+    now = datetime(2022, 1, 3, 10, 0, 0)
+    plan = [
+        _c(0, "2022-01-03T10:00:00", {"op": "add", "path": "a"}),
+        _c(1, "2022-01-03T09:00:00", {"op": "edit", "path": "a"}),
+    ]
+    out, report = validate_plan(set(), plan, now=now)
+    assert [c["commit_index"] for c in out] == [0]
+    assert _kinds(report) == [(1, "non_monotonic_time", True), (1, "future_time", True)]
+
+
+def test_check_plan_reports_without_repairing():
+    plan = [
+        _c(0, "2022-01-03T10:00:00", {"op": "edit", "path": "nope"}),
+        _c(1, "2022-01-03T09:00:00", {"op": "add", "path": "a"}),
+    ]
+    assert _kinds(check_plan(set(), iter(plan), now=NOW)) == [
+        (0, "missing_target", False),
+        (1, "non_monotonic_time", False),
+    ]
+
+
+
+def test_validate_actions_overlay():
+    actions = [
+        {"type": "delete", "path": "a"},
+        {"type": "edit", "path": "a"},
+        {"type": "add", "path": "b"},
+        {"type": "edit", "path": "b"},
+        {"type": "edit", "path": "missing"},
+    ]
+    expected = [actions[0], actions[2]]
+    assert validate_actions(["a"], actions) == expected      # list snapshot (oneday)
+    assert validate_actions({"a"}, actions) == expected
+    assert validate_actions([], [{"type": "edit", "path": "x"}]) == [
+        {"type": "add", "path": "src/fallback_note.md"}
+    ]
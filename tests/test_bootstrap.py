@@ -0,0 +1,87 @@
+import pytest
+
+from src.core.bootstrap import (
+    BootstrapError, RepoSpec, clone_from_mirror, ensure_mirror, load_specs, spin_up,
+)
+from src.core.object_store import (
+    ObjectStoreError, init_store, provision, repack, repack_before_push, store_of,
+)
+
+from conftest import commit, git
+
+
+@pytest.fixture
+def upstream(repo):
+    commit(repo, "src", path="src/a.txt")
+    commit(repo, "docs", path="docs/b.txt")
+    return repo
+
+
+def test_ensure_mirror_is_marked_as_mirror_not_store(upstream, tmp_path):
+    mirror = ensure_mirror(tmp_path / "mirrors", str(upstream))
+
+    assert git(mirror, "config", "gitcom.mirror") == "true"
+    assert git(mirror, "config", "gc.pruneExpire") == "never"
+    assert git(mirror, "rev-parse", "main") == git(upstream, "rev-parse", "HEAD")
+    assert ensure_mirror(tmp_path / "mirrors", str(upstream), refresh=False) == mirror
+
+
+@pytest.mark.parametrize("mode", ["partial", "reference"])
+def test_clone_fetches_from_mirror_and_pushes_upstream(upstream, tmp_path, mode):
+    mirror = ensure_mirror(tmp_path / "mirrors", str(upstream))
+    spec = RepoSpec("r", tmp_path / "clone", url=str(upstream), sparse=("src",))
+
+    info = clone_from_mirror(mirror, spec, mode=mode)
+
+    assert info["action"] == "cloned" and info["mode"] == mode
+    assert git(spec.path, "remote", "get-url", "origin") == mirror.as_uri()
+    assert git(spec.path, "remote", "get-url", "--push", "origin") == str(upstream)
+    assert (spec.path / "src" / "a.txt").exists()
+    assert not (spec.path / "docs").exists()
+    with pytest.raises(BootstrapError):
+        clone_from_mirror(mirror, spec, mode=mode)
+
+
+def test_reference_clone_push_does_not_absorb_into_mirror(upstream, tmp_path):
+    mirror = ensure_mirror(tmp_path / "mirrors", str(upstream))
+    spec = RepoSpec("r", tmp_path / "clone", url=str(upstream))
+    clone_from_mirror(mirror, spec, mode="reference")
+    commit(spec.path, "local")
+
+    assert store_of(spec.path) is None
+    repack_before_push(str(spec.path))
+    assert git(mirror, "for-each-ref", "refs/repos") == ""
+
+
+def test_partial_clone_is_refused_by_the_store(upstream, tmp_path):
+    mirror = ensure_mirror(tmp_path / "mirrors", str(upstream))
+    spec = RepoSpec("r", tmp_path / "clone", url=str(upstream))
+    clone_from_mirror(mirror, spec, mode="partial")
+    store = init_store(tmp_path / "store.git")
+
+    with pytest.raises(ObjectStoreError, match="partial clone"):
+        provision(store, spec.path)
+    with pytest.raises(ObjectStoreError, match="partial clone"):
+        repack(store, spec.path)
+    assert store_of(spec.path) is None
+
+
+def test_spin_up_batch(upstream, tmp_path):
+    infos = spin_up(str(upstream), tmp_path / "runs", 3,
+                    mirror_dir=tmp_path / "mirrors", workers=2)
+
+    assert [i["name"] for i in infos] == ["run-000", "run-001", "run-002"]
+    for info in infos:
+        assert git(info["path"], "rev-parse", "HEAD") == git(upstream, "rev-parse", "HEAD")
+
+
+def test_load_specs_adds_execution_repo_and_skips_repos_without_url(tmp_path):
+    cfg = {
+        "execution_repo": {"path": str(tmp_path / "exec")},
+        "bootstrap": {"repos": {"exec": {"url": "u", "branch": "dev", "sparse": ["src"]}}},
+    }
+    specs = load_specs(cfg, repopath_file=tmp_path / "missing.txt")
+
+    assert specs == [RepoSpec("exec", tmp_path / "exec", "u", "dev", ("src",))]
+    assert load_specs({"execution_repo": {"path": str(tmp_path / "x")}},
+                      repopath_file=tmp_path / "missing.txt") == []
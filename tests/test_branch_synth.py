@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from src.core.branch_synth import BranchSynthError, synthesize
+from src.core.msg_lib import MSGS_PATH
+
+from conftest import commit, git
+
+
+AUTHOR = ("t", "t@example.com")
+
+
+@pytest.fixture
+def msgs_path(tmp_path):
+    path = tmp_path / "msgs.json"
+    path.write_text(json.dumps({
+        kind: [f"{kind} message {i}" for i in range(6)]
+        for kind in ("add", "edit", "delete")
+    }), encoding="utf-8")
+    return path
+
+
+def _synth(repo, msgs_path, begin="2022-01-03", end="2022-02-28", **kw):
+    return synthesize(
+        str(repo), begin, end,
+        n_branches=6, author=AUTHOR, seed=11, msgs_path=msgs_path, **kw,
+    )
+
+
+def test_begin_before_the_base_commit_is_rejected(repo, msgs_path):
+    commit(repo, "late", date="2022-01-10T10:00:00")
+    with pytest.raises(BranchSynthError):
+        _synth(repo, msgs_path, workers=0)
+
+
+def test_commits_on_the_base_day_come_after_it(repo, msgs_path):
+    base = commit(repo, "late", date="2022-01-03T23:00:00")
+    summary = _synth(repo, msgs_path, workers=0)
+
+    base_time = int(git(repo, "log", "-1", "--format=%ct", base))
+    times = git(repo, "log", "--format=%ct", f"{base}..main").split()
+    assert times and min(int(t) for t in times) > base_time
+    assert git(repo, "rev-parse", "main") == summary["head"]
+
+
+def test_branches_fork_from_the_main_tip_of_their_fork_day(repo, msgs_path):
+    summary = _synth(repo, msgs_path, workers=0)
+    merges = git(repo, "rev-list", "--first-parent", "--merges", "main").split()
+
+    assert any(fork != summary["base"] for fork in summary["forks"].values())
+    for name, fork in summary["forks"].items():
+        first = git(repo, "rev-list", "--reverse", f"{fork}..{name}").split()[0]
+        assert git(repo, "rev-parse", f"{first}^") == fork
+        assert fork == summary["base"] or fork in merges
+
+        # no merge on main between the fork point and the branch's first commit
+        first_time = int(git(repo, "log", "-1", "--format=%ct", first))
+        later = git(repo, "rev-list", "--first-parent", f"{fork}..main").split()
+        assert all(
+            int(git(repo, "log", "-1", "--format=%ct", m)) > first_time
+            for m in later
+        )
+
+
+def test_pool_build_matches_in_process_build(repo, tmp_path, msgs_path):
+    serial = _synth(repo, msgs_path, workers=0)
+    git(repo, "reset", "-q", "--hard", serial["base"])
+    for name in serial["branches"]:
+        git(repo, "update-ref", "-d", f"refs/heads/{name}")
+
+    pooled = _synth(repo, msgs_path, workers=2)
+    assert pooled["head"] == serial["head"]
+    assert pooled["forks"] == serial["forks"]
+
+
+def test_default_library_titles_commits(repo):
+    summary = synthesize(str(repo), "2022-01-03", "2022-01-31", n_branches=2, author=AUTHOR, seed=3, workers=0)
+
+    with open(MSGS_PATH, "r", encoding="utf-8") as f:
+        library = {m for msgs in json.load(f).values() for m in msgs}
+    subjects = git(repo, "log", "--no-merges", "--format=%s", f"{summary['base']}..main").splitlines()
+    assert subjects and all(s in library for s in subjects)
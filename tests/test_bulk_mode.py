@@ -0,0 +1,50 @@
+import subprocess
+
+import pytest
+
+from src.core import bulk_mode as bm
+
+from conftest import commit, git
+
+
+def _local(repo, key):
+    result = subprocess.run(
+        ["git", "config", "--local", "--get-all", key],
+        cwd=repo, stdout=subprocess.PIPE, text=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def test_profile_is_applied_and_restored(repo):
+    git(repo, "config", "gc.auto", "123")
+    with bm.bulk_mode(str(repo), run_finalize=False):
+        assert _local(repo, "gc.auto") == "0"
+        assert _local(repo, "core.fsync") == "none"
+        commit(repo, "in bulk")
+    assert _local(repo, "gc.auto") == "123"
+    assert _local(repo, "core.fsync") is None
+    assert not bm._state_path(str(repo)).exists()
+
+
+def test_failure_restores_without_finalize(repo, monkeypatch):
+    calls = []
+    monkeypatch.setattr(bm, "finalize", lambda path: calls.append(path))
+
+    with pytest.raises(RuntimeError, match="boom"):
+        with bm.bulk_mode(str(repo)):
+            raise RuntimeError("boom")
+
+    assert calls == []
+    assert _local(repo, "gc.auto") is None
+
+    with bm.bulk_mode(str(repo)):
+        pass
+    assert calls == [str(repo)]
+
+
+def test_second_apply_is_refused(repo):
+    bm.apply_profile(str(repo))
+    with pytest.raises(bm.BulkModeError):
+        bm.apply_profile(str(repo))
+    assert bm.restore_profile(str(repo))
+    assert not bm.restore_profile(str(repo))
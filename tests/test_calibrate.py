@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.core.calibrate import (
+    CalibrateError, DayParams, _streak_stats, distribution, grid_search, simulate,
+)
+
+
+def test_streak_stats():
+    work = np.array([
+        [1, 1, 0, 1, 1, 1, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+    ], dtype=bool)
+    longest, mean = _streak_stats(work)
+    assert longest.tolist() == [3, 0]
+    assert mean.tolist() == [2.5, 0.0]
+
+
+def test_simulate_matches_the_day_model():
+    params = DayParams(work_probability=0.8, multi_commit_probability=0.5, multi_range=(2, 4))
+    s = simulate(params, sims=4000, rng=np.random.default_rng(0))
+
+    assert set(s) >= {"weekly_commits", "rest_ratio", "final_files"}
+    assert all(v.shape == (4000,) for v in s.values())
+    assert abs(s["rest_ratio"].mean() - 0.2) < 0.01
+    # E[commits/day] = p_work * (1 - p_multi + p_multi * mean(2..4))
+    assert abs(s["weekly_commits"].mean() - 7 * 0.8 * 2.0) < 0.1
+    assert (s["final_files"] >= 0).all()
+
+
+def test_simulate_edge_cases():
+    idle = simulate(DayParams(work_probability=0.0, start_files=5), sims=10, rng=np.random.default_rng(1))
+    assert (idle["weekly_commits"] == 0).all() and (idle["final_files"] == 5).all()
+    assert (idle["rest_ratio"] == 1).all()
+
+    busy = simulate(DayParams(work_probability=1.0), sims=10, days=28, rng=np.random.default_rng(1))
+    assert (busy["max_streak"] == 28).all() and (busy["rest_ratio"] == 0).all()
+    assert (busy["final_files"] > 0).all()       # an empty snapshot only grows
+
+
+def test_distribution():
+    dist = distribution({"x": np.arange(101, dtype=float)})
+    assert dist["x"] == {"mean": 50.0, "p5": 5.0, "p50": 50.0, "p95": 95.0}
+
+
+def test_grid_search_finds_the_generating_point():
+    kw = dict(sims=300, days=364, seed=3)
+    target = {"rest_ratio": 0.3, "weekly_commits": 7 * 0.7 * (1 + 2 * 0.2)}
+    serial = grid_search(target, [0.5, 0.7, 0.9], [0.0, 0.2, 0.6], workers=0, **kw)
+    pooled = grid_search(target, [0.5, 0.7, 0.9], [0.0, 0.2, 0.6], workers=2, **kw)
+
+    assert serial == pooled
+    best = serial[0]["params"]
+    assert (best["work_probability"], best["multi_commit_probability"]) == (0.7, 0.2)
+
+    with pytest.raises(CalibrateError):
+        grid_search({"nope": 1.0}, [0.5], [0.5], workers=0)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.core.heatmap_solver import day_axis, profile_target, solve
+
+
+def test_excess_over_the_cap_is_spread_not_dropped():
+    target = np.array([30.0, 20.0] + [1.0] * 10)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        counts = solve(target, max_per_day=12, rng=rng)
+        assert counts.max() <= 12
+        assert counts.sum() == 60
+
+
+def test_total_above_capacity_fills_every_work_day():
+    counts = solve(np.array([50.0, 50.0, 0.0, 1.0]), max_per_day=12, rng=np.random.default_rng(1))
+    assert counts.tolist() == [12, 12, 0, 12]
+
+
+def test_rest_days_and_totals_per_repo():
+    days = day_axis("2022-01-03", "2022-03-27")
+    target = np.stack([
+        profile_target(days, [1, 1, 1, 1, 1, 0, 0], 3.0),
+        profile_target(days, [2, 2, 2, 2, 2, 2, 2], 3.0),
+    ])
+    counts = solve(target, min_rest_ratio=0.3, max_streak=5, max_per_day=12, rng=np.random.default_rng(2))
+
+    assert counts.shape == target.shape
+    assert (counts.sum(axis=1) == target.sum(axis=1)).all()
+    assert counts.max() <= 12
+    assert ((counts == 0).mean(axis=1) >= 0.3).all()
@@ -0,0 +1,63 @@
+import json
+
+from src.core import history_stats as hs
+
+from conftest import commit, git
+
+
+def _library():
+    with open(hs.MSGS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_log_fields_survive_chunk_boundaries(repo):
+    commit(repo, "two words", date="2022-01-03T10:00:00")
+    commit(repo, "ünïcode subject", date="2022-01-04T10:00:00")
+
+    fields = list(hs._iter_log_fields(str(repo), "HEAD", chunk_size=7))
+    assert [f[3] for f in fields] == ["ünïcode subject", "two words", "init"]
+    assert all(len(f) == 4 and len(f[0]) == 40 for f in fields)
+    assert fields[0][1] == git(repo, "log", "-1", "--format=%at")
+
+
+def test_history_is_cached_per_head(repo):
+    hist, parsed = hs.load_history(str(repo))
+    assert (len(hist), parsed) == (1, 1)
+    assert hs.load_history(str(repo))[1] == 0
+
+    commit(repo, "two", date="2022-01-03T10:00:00")
+    hist, parsed = hs.load_history(str(repo))
+    assert (len(hist), parsed) == (2, 1)
+
+    # rewritten history: full re-parse
+    git(repo, "reset", "-q", "--hard", "HEAD~1")
+    commit(repo, "other", date="2022-01-04T10:00:00")
+    hist, parsed = hs.load_history(str(repo))
+    assert (len(hist), parsed) == (2, 2)
+    assert sorted(hist.subjects.tolist()) == ["init", "other"]
+
+
+def test_analyze(repo):
+    add, edit = _library()["add"][0], _library()["edit"][0]
+    commit(repo, add, date="2022-01-03T09:00:00+0000")      # Monday
+    commit(repo, add, date="2022-01-03T15:00:00+0000")
+    commit(repo, edit, date="2022-01-04T10:00:00+0000")
+    commit(repo, "by hand", date="2022-01-06T10:00:00+0000")
+
+    hist, _ = hs.load_history(str(repo), use_cache=False)
+    keep = hist.ts >= 1641168000                             # drop the init commit
+    hist.ts, hist.subjects, hist.author = hist.ts[keep], hist.subjects[keep], hist.author[keep]
+    report = hs.analyze(hist)
+
+    assert report["commits"] == 4
+    assert (report["first_day"], report["last_day"]) == ("2022-01-03", "2022-01-06")
+    assert (report["active_days"], report["days"]) == (3, 4)
+    assert report["rest_ratio"] == 0.25
+    assert report["per_day_histogram"] == [0, 2, 1]
+    assert report["weekday"]["mon"] == 2 and report["weekday"]["thu"] == 1
+    assert report["hour"][9] == report["hour"][15] == 1
+    assert report["streaks"]["max"] == 2 and report["gaps"]["count"] == 1
+    assert report["duplicate_rate"] == 0.25
+    assert report["top_duplicates"] == [[add, 2]]
+    assert report["action_mix"] == {"add": 2, "edit": 1, "other": 1}
+    assert report["day_decision_fit"]["multi_commit_probability"] == round(1 / 3, 4)
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+from src.core.job_queue import (
+    _SCHEMA, STATUS_PARTIAL, STATUS_QUEUED, STATUS_RUNNING, JobQueue, resume_begin,
+)
+
+from conftest import commit
+
+
+def _running(queue, job_id, worker, started_at):
+    queue._conn.execute(
+        "UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE id = ?",
+        (STATUS_RUNNING, worker, started_at, job_id),
+    )
+
+
+def _status(queue, job_id):
+    return queue._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+
+def test_requeue_stale_only_takes_dead_or_expired_workers(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite")
+    host = os.uname().nodename
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+
+    ids = [queue.add(repo=f"r{i}", begin="2022-01-01", end="2022-01-02") for i in range(4)]
+    _running(queue, ids[0], f"{host}:{os.getpid()}", time.time() - 10 ** 6)   # alive
+    _running(queue, ids[1], f"{host}:{dead.pid}", time.time())                 # dead
+    _running(queue, ids[2], "elsewhere:1", time.time())                        # lease ok
+    _running(queue, ids[3], "elsewhere:2", time.time() - 10 ** 6)              # lease expired
+
+    assert queue.requeue_stale() == 2
+    assert [_status(queue, i) for i in ids] == [
+        STATUS_RUNNING, STATUS_QUEUED, STATUS_RUNNING, STATUS_QUEUED,
+    ]
+    queue.close()
+
+
+def test_retry_resumes_after_last_landed_day(repo, tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite")
+    job_id = queue.add(repo="r", begin="2022-01-01", end="2022-01-05", max_attempts=1)
+    job = queue.claim("w")
+    assert resume_begin(job, str(repo)) == "2022-01-01"   # first attempt
+
+    # the attempt finished 01-02 and landed part of 01-03, then failed
+    commit(repo, "day 2", date="2022-01-02T10:00:00")
+    queue.mark_progress(job_id, "2022-01-02")
+    commit(repo, "day 3 a", date="2022-01-03T10:00:00")
+    queue.fail(job, "boom", partial=True)
+    assert _status(queue, job_id) == STATUS_PARTIAL
+
+    # a manual retry resets the attempt budget but still resumes
+    queue.retry(job_id)
+    job = queue.claim("w")
+    assert job.attempts == 1 and job.resumed
+    assert resume_begin(job, str(repo)) == "2022-01-04"
+
+    # HEAD outside the job window (older history) does not move the start
+    job.done_through = None
+    job.begin = "2022-02-01"
+    job.end = "2022-02-05"
+    assert resume_begin(job, str(repo)) == "2022-02-01"
+    queue.close()
+
+
+def test_partial_first_day_is_not_committed_twice(repo, tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite")
+    job_id = queue.add(repo="r", begin="2022-01-03", end="2022-01-05", max_attempts=1)
+    job = queue.claim("w")
+
+    # failed inside the first day: no done_through, only landed commits
+    commit(repo, "day 3 a", date="2022-01-03T10:00:00")
+    queue.fail(job, "boom", partial=True)
+    queue.retry(job_id)
+
+    job = queue.claim("w")
+    assert job.done_through is None
+    assert resume_begin(job, str(repo)) == "2022-01-04"
+    queue.close()
+
+
+def test_stale_jobs_resume(repo, tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite")
+    job_id = queue.add(repo="r", begin="2022-01-03", end="2022-01-05")
+    queue.claim("elsewhere:1")
+    commit(repo, "day 3 a", date="2022-01-03T10:00:00")
+    queue._conn.execute("UPDATE jobs SET started_at = 0 WHERE id = ?", (job_id,))
+
+    assert queue.requeue_stale() == 1
+    assert resume_begin(queue.claim("w"), str(repo)) == "2022-01-04"
+    queue.close()
+
+
+def test_queue_without_landed_column_is_migrated(tmp_path):
+    db = tmp_path / "jobs.sqlite"
+    conn = sqlite3.connect(db)
+    conn.executescript(_SCHEMA.replace("    landed       INTEGER NOT NULL DEFAULT 0,\n", ""))
+    conn.execute("INSERT INTO jobs (repo, begin, end, created_at) VALUES ('r', '2022-01-01', '2022-01-02', 0)")
+    conn.commit()
+    conn.close()
+
+    queue = JobQueue(db)
+    job = queue.claim("w")
+    assert job.landed == 0 and not job.resumed
+    queue.close()
@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.core import msg_index
+from src.core.msg_index import HASHES_FILENAME, MsgIndex
+
+from conftest import commit, git
+
+
+def test_load_indexes_history_and_add(repo):
+    commit(repo, "first change")
+    index = MsgIndex(str(repo)).load()
+    assert "init" in index and "first change" in index
+    assert "never used" not in index
+
+    index.add("planned message")
+    assert "planned message" in index
+    assert index.fresh(["init", "new one"]) == ["new one"]
+
+
+def test_save_picks_up_commits_made_without_add(repo):
+    index = MsgIndex(str(repo)).load()
+
+    commit(repo, "added by the run")
+    index.add("added by the run")
+    commit(repo, "made elsewhere")      # no add()
+    index.save()
+
+    assert "made elsewhere" in index
+    assert "made elsewhere" in MsgIndex(str(repo)).load()
+
+
+def test_rewritten_history_is_rebuilt(repo):
+    commit(repo, "dropped later")
+    MsgIndex(str(repo)).load()
+
+    git(repo, "reset", "-q", "--hard", "HEAD~1")
+    commit(repo, "replacement")
+    index = MsgIndex(str(repo)).load()
+    assert "replacement" in index
+    assert "dropped later" not in index
+
+
+def test_save_never_replaces_a_mapped_file(repo, monkeypatch):
+    index = MsgIndex(str(repo)).load()
+    assert isinstance(index._hashes, np.memmap)
+
+    written = msg_index._save_npy
+
+    def _save_npy(path, array):
+        if path.name == HASHES_FILENAME:
+            assert not isinstance(index._hashes, np.memmap)
+        written(path, array)
+
+    monkeypatch.setattr(msg_index, "_save_npy", _save_npy)
+    index.save()                        # nothing pending, same head
+    index.add("later")
+    index.save()
+    assert "later" in MsgIndex(str(repo)).load()
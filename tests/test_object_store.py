@@ -0,0 +1,65 @@
+from src.core import object_store as store_mod
+from src.core.object_store import (
+    STORE_REF_PREFIX, absorb, init_store, provision, repack, repo_key, store_of,
+)
+
+from conftest import commit, git
+
+
+def _objects(repo):
+    stats = dict(line.split(": ", 1) for line in git(repo, "count-objects", "-v").splitlines())
+    return int(stats["count"]) + int(stats["in-pack"])
+
+
+def test_init_store_is_idempotent_and_never_prunes(tmp_path):
+    store = init_store(tmp_path / "store.git")
+    assert init_store(store) == store
+    for key, value in store_mod.STORE_CONFIG.items():
+        assert git(store, "config", key) == value
+
+
+def test_provision_new_repo(tmp_path):
+    store = init_store(tmp_path / "store.git")
+    info = provision(store, tmp_path / "fresh")
+
+    assert info["created"] and info["attached"]
+    assert store_of(tmp_path / "fresh") == store
+    assert provision(store, tmp_path / "fresh")["attached"] is False
+
+
+def test_provision_existing_repo_moves_objects_to_the_store(repo, tmp_path):
+    for i in range(5):
+        commit(repo, f"c{i}", path=f"f{i}.txt")
+    store = init_store(tmp_path / "store.git")
+    head = git(repo, "rev-parse", "HEAD")
+
+    info = provision(store, repo)
+
+    assert not info["created"] and info["attached"]
+    assert _objects(repo) == 0                       # everything is borrowed
+    assert git(store, "rev-parse", f"{STORE_REF_PREFIX}/{repo_key(repo)}/heads/main") == head
+    git(repo, "fsck", "--connectivity-only", "--no-dangling")
+
+
+def test_repack_keeps_only_new_objects_local(repo, tmp_path):
+    store = init_store(tmp_path / "store.git")
+    provision(store, repo)
+    commit(repo, "after", path="new.txt")
+    assert _objects(repo) > 0
+
+    info = repack(store, repo)
+    assert info["refs"] >= 1
+    assert _objects(repo) == 0
+    assert absorb(store, repo) == info["refs"]
+
+    # the store never drops what a repo borrows, even after the ref moves
+    git(repo, "reset", "-q", "--hard", "HEAD~1")
+    repack(store, repo)
+    store_mod.compact_store(store)
+    git(store, "cat-file", "-e", git(repo, "rev-parse", "HEAD@{1}"))
+
+
+def test_repos_with_the_same_name_get_separate_keys(tmp_path):
+    a, b = tmp_path / "a" / "repo", tmp_path / "b" / "repo"
+    assert repo_key(a) != repo_key(b)
+    assert repo_key(a).startswith("repo-")
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from src.core.multidays_commit_pusher import run_days
+from src.core.parallel_planner import plan_repos
+
+from conftest import git
+
+
+SEED = 20220103
+BEGIN, END = "2022-01-03", "2022-01-24"
+
+
+@pytest.fixture
+def msgs_path(tmp_path):
+    path = tmp_path / "msgs.json"
+    path.write_text(json.dumps({
+        kind: [f"{kind} message {i}" for i in range(6)]
+        for kind in ("add", "edit", "delete")
+    }), encoding="utf-8")
+    return path
+
+
+def _plan(tmp_path, msgs_path, name, **kw):
+    out = tmp_path / name
+    plan_repos({"demo": ()}, BEGIN, END, out, SEED, msgs_path=msgs_path, **kw)
+    return [json.loads(line) for line in (out / "demo.ndjson").read_text(encoding="utf-8").splitlines()]
+
+
+def test_output_does_not_depend_on_workers_or_shards(tmp_path, msgs_path):
+    serial = _plan(tmp_path, msgs_path, "serial", workers=0)
+    assert serial
+    assert _plan(tmp_path, msgs_path, "pool", workers=2, shard_size=5) == serial
+    assert _plan(tmp_path, msgs_path, "small", workers=0, shard_size=1) == serial
+
+
+def test_plan_matches_what_run_days_commits(tmp_path):
+    out = tmp_path / "plan"
+    plan_repos({"demo": ()}, BEGIN, END, out, SEED, workers=0)     # shipped library
+    plan = [json.loads(line) for line in (out / "demo.ndjson").read_text(encoding="utf-8").splitlines()]
+    assert all(c["message"] not in ("add", "edit", "delete", "rename") for c in plan)
+
+    repo = tmp_path / "demo"      # same repo name -> same streams
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    run_days(
+        repo_path=str(repo), begin=BEGIN, end=END, snap_dir=tmp_path / "snap",
+        last_snap=set(), seed=SEED, dedup_msgs=False, record_run=False,
+    )
+
+    log = git(repo, "log", "--reverse", "--format=%aI%x01%s")
+    executed = [tuple(line.split("\x01")) for line in log.splitlines()]
+    assert executed == [(c["time_point"], c["message"]) for c in plan]
+
+    files = set()
+    for c in plan:
+        for a in c["actions"]:
+            (files.discard if a["op"] == "delete" else files.add)(a["path"])
+    assert set(git(repo, "ls-files").splitlines()) == files
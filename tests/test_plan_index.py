@@ -0,0 +1,30 @@
+from src.core.plan_index import PlanIndex, pending_commits, plan_commit_id, with_plan_trailer
+
+from conftest import git
+
+
+def _planned(time_point="2022-01-03T10:00:00"):
+    return {"time_point": time_point, "actions": [{"type": "edit", "path": "a.md"}]}
+
+
+def test_identical_commits_get_distinct_ids():
+    plan = [_planned(), _planned()]
+    ids = [plan_commit_id(c, i) for i, c in enumerate(plan)]
+    assert ids[0] != ids[1]
+
+
+def test_ids_are_stable_and_explicit_id_wins():
+    assert plan_commit_id(_planned(), 4) == plan_commit_id(_planned(), 4)
+    assert plan_commit_id(_planned(), 4, "a") != plan_commit_id(_planned(), 4, "b")
+    assert plan_commit_id({**_planned(), "plan_id": "fixed"}, 9) == "fixed"
+
+
+def test_index_skips_landed_commits(repo):
+    plan = [_planned(), _planned()]
+    first = next(pending_commits(plan, PlanIndex(str(repo)).load()))
+    (repo / "a.md").write_text("x\n", encoding="utf-8")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", with_plan_trailer("day", first["plan_id"]))
+
+    left = list(pending_commits(plan, PlanIndex(str(repo)).load()))
+    assert [c["plan_id"] for c in left] == [plan_commit_id(plan[1], 1)]
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.core.plan_index import PlanIndex
+from src.core.plan_stream import PlanStreamError, executor_engine, iter_plan, replay_plan, to_cmd_pack
+
+from conftest import git
+
+SHIPPED_PLAN = Path(__file__).resolve().parents[1] / "src" / "locked_res_ver1.3" / "planned_temp_commit.txt"
+
+
+def _commits(n):
+    return [
+        {"commit_index": i, "time_point": f"2022-01-0{i % 9 + 1}T10:00:00",
+         "actions": [{"op": "add", "path": f"f{i}.txt"}]}
+        for i in range(n)
+    ]
+
+
+def test_json_array_across_chunks(tmp_path):
+    plan = tmp_path / "plan.txt"
+    plan.write_text(json.dumps(_commits(50), indent=2), encoding="utf-8")
+    assert list(iter_plan(plan, chunk_size=7)) == _commits(50)
+
+
+def test_ndjson_across_chunks(tmp_path):
+    plan = tmp_path / "plan.ndjson"
+    plan.write_text("\n".join(json.dumps(c) for c in _commits(20)) + "\n\n", encoding="utf-8")
+    assert list(iter_plan(plan, chunk_size=5)) == _commits(20)
+
+
+def test_empty_plan(tmp_path):
+    plan = tmp_path / "plan.txt"
+    plan.write_text("  \n", encoding="utf-8")
+    assert list(iter_plan(plan)) == []
+
+
+def test_truncated_array_is_refused(tmp_path):
+    plan = tmp_path / "plan.txt"
+    plan.write_text(json.dumps(_commits(3))[:-1], encoding="utf-8")
+    with pytest.raises(PlanStreamError, match="truncated"):
+        list(iter_plan(plan))
+
+
+def test_malformed_array_does_not_buffer_the_file(tmp_path):
+    plan = tmp_path / "plan.txt"
+    plan.write_text("[{" + "x" * 10_000 + "]", encoding="utf-8")
+    with pytest.raises(PlanStreamError, match="no complete commit"):
+        list(iter_plan(plan, chunk_size=64, max_commit_chars=1000))
+
+
+def test_overlong_ndjson_line_is_refused(tmp_path):
+    plan = tmp_path / "plan.ndjson"
+    good = json.dumps(_commits(1)[0])
+    plan.write_text(good + "\n{" + "x" * 5000 + "\n", encoding="utf-8")
+    with pytest.raises(PlanStreamError, match="line 2"):
+        list(iter_plan(plan, chunk_size=16, max_commit_chars=1000))
+
+
+def test_missing_fields_are_refused(tmp_path):
+    plan = tmp_path / "plan.ndjson"
+    plan.write_text('{"time_point": "2022-01-01T10:00:00"}\n', encoding="utf-8")
+    with pytest.raises(PlanStreamError, match="actions"):
+        list(iter_plan(plan))
+
+
+def test_to_cmd_pack_maps_op_to_type():
+    assert to_cmd_pack([{"op": "rename", "src": "a", "dst": "b"}]) == [
+        {"src": "a", "dst": "b", "type": "rename"}
+    ]
+
+
+def test_engine_failure_does_not_hang_the_reader(tmp_path):
+    plan = tmp_path / "plan.ndjson"
+    plan.write_text("\n".join(json.dumps(c) for c in _commits(30)), encoding="utf-8")
+
+    def engine(commit):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        replay_plan(plan, engine, prefetch=1, progress_every=0)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_replay_the_shipped_plan(repo, sparse):
+    tree = git(repo, "rev-parse", "HEAD^{tree}")
+    index = PlanIndex(str(repo)).load()
+
+    engine = executor_engine(str(repo), sparse=sparse)
+    assert replay_plan(SHIPPED_PLAN, engine, index=index) == {"executed": 1, "skipped": 0}
+
+    # add + rename + delete of one file: an empty commit carrying the plan id
+    assert git(repo, "rev-list", "--count", "HEAD") == "2"
+    assert git(repo, "rev-parse", "HEAD^{tree}") == tree
+    assert "Gitcom-Plan-Id:" in git(repo, "log", "-1", "--format=%B")
+
+    assert replay_plan(SHIPPED_PLAN, engine, index=PlanIndex(str(repo)).load()) == {"executed": 0, "skipped": 1}
@@ -0,0 +1,28 @@
+from src.core import repo_maintenance as rm
+
+from conftest import commit
+
+
+def test_graph_lag_counts_from_the_last_graph_write(repo):
+    assert rm.object_stats(str(repo)).graph_lag == 1
+
+    head = commit(repo, "two")
+    rm._write_state(rm._git_dir(str(repo)), {"graph_head": head})
+    commit(repo, "three")
+    assert rm.object_stats(str(repo)).graph_lag == 1
+
+
+def test_missing_graph_head_is_stale(repo):
+    commit(repo, "two")
+    rm._write_state(rm._git_dir(str(repo)), {"graph_head": "0" * 40})
+    assert rm.object_stats(str(repo)).graph_lag == 2
+
+
+def test_plan_tasks():
+    stats = rm.ObjectStats(
+        loose=rm.LOOSE_THRESHOLD, loose_kib=0, packed=0, packs=1,
+        pack_kib=0, has_midx=False, graph_lag=3,
+    )
+    assert rm.plan_tasks(stats) == ["repack-loose", "multi-pack-index", "commit-graph"]
+    stats.loose, stats.graph_lag = 0, 0
+    assert rm.plan_tasks(stats) == []
@@ -0,0 +1,78 @@
+import pytest
+
+from src.core.run_journal import RunJournal, RunJournalError, current_head, resume_seed
+
+from conftest import commit
+
+
+KEY = {"engine": "test", "start": "2022-01-01", "end": "2022-01-05"}
+
+
+def _pending(journal, repo):
+    journal.seed = 1234
+    journal.mark_pending(
+        position=3,
+        day="2022-01-04",
+        next_day="2022-01-05",
+        head_sha=current_head(str(repo)),
+    )
+
+
+def test_landed_commit_resumes_after_the_day(repo, tmp_path):
+    journal = RunJournal(tmp_path / "j.json", KEY)
+    _pending(journal, repo)
+    commit(repo, "day 4")
+
+    point = RunJournal(tmp_path / "j.json", KEY).resume_point(str(repo))
+    assert point["next_day"] == "2022-01-05"
+    assert point["next_position"] == 4
+    assert point["seed"] == 1234
+
+
+def test_missing_commit_redoes_the_day(repo, tmp_path):
+    journal = RunJournal(tmp_path / "j.json", KEY)
+    _pending(journal, repo)
+
+    point = RunJournal(tmp_path / "j.json", KEY).resume_point(str(repo))
+    assert point["next_day"] == "2022-01-04"
+    assert point["next_position"] == 3
+    assert point["seed"] == 1234
+
+
+def test_head_moved_after_done_day_is_refused(repo, tmp_path):
+    journal = RunJournal(tmp_path / "j.json", KEY)
+    journal.record_day(
+        position=0, day="2022-01-01", next_day="2022-01-02",
+        head_sha=current_head(str(repo)), snap_version=None,
+    )
+    commit(repo, "manual")
+    with pytest.raises(RunJournalError):
+        RunJournal(tmp_path / "j.json", KEY).resume_point(str(repo))
+
+
+def test_other_run_key_is_refused(repo, tmp_path):
+    _pending(RunJournal(tmp_path / "j.json", KEY), repo)
+    with pytest.raises(RunJournalError):
+        RunJournal(tmp_path / "j.json", {**KEY, "end": "2022-02-01"}).load()
+
+
+def test_in_memory_journal_needs_no_repo(tmp_path):
+    journal = RunJournal(None, KEY)
+    journal.mark_pending(
+        position=0, day="2022-01-01", next_day="2022-01-02",
+        head_sha=None,
+    )
+    assert journal.state["status"] == "pending"
+    assert journal.resume_point(str(tmp_path)) is None
+    journal.finish()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_resume_reuses_the_journal_seed():
+    point = {"next_position": 1, "next_day": "2022-01-02", "seed": 99}
+    assert resume_seed(point, None) == 99
+    assert resume_seed(point, 99) == 99
+    assert resume_seed(None, 5) == 5
+    assert resume_seed({**point, "seed": None}, 5) == 5
+    with pytest.raises(RunJournalError):
+        resume_seed(point, 5)
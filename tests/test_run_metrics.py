@@ -0,0 +1,65 @@
+import time
+import urllib.request
+
+from src.core.run_metrics import RunMetrics, _git_subcommand, serve_http, write_file
+
+
+def test_git_subcommand():
+    assert _git_subcommand(["git", "-C", "repo", "-c", "a=b", "--no-pager", "commit", "-m", "x"]) == "commit"
+    assert _git_subcommand(["git", "--version"]) == "unknown"
+
+
+def test_render_openmetrics():
+    m = RunMetrics()
+    m.inc("gitcom_commits_executed", engine="executor")
+    m.inc("gitcom_commits_executed", 2, engine="executor")
+    m.set_gauge("gitcom_queue_depth", 3, stage='plan "reader"')
+    m.observe("gitcom_git_command_seconds", 0.007, buckets=(0.005, 0.01), subcommand="add")
+    m.observe("gitcom_git_command_seconds", 1.0, buckets=(0.005, 0.01), subcommand="add")
+
+    lines = m.render().splitlines()
+    assert lines[-1] == "# EOF"
+    assert "# TYPE gitcom_commits_executed counter" in lines
+    assert 'gitcom_commits_executed_total{engine="executor"} 3' in lines
+    assert 'gitcom_queue_depth{stage="plan \\"reader\\""} 3' in lines
+    assert 'gitcom_git_command_seconds_bucket{subcommand="add",le="0.005"} 0' in lines
+    assert 'gitcom_git_command_seconds_bucket{subcommand="add",le="0.01"} 1' in lines
+    assert 'gitcom_git_command_seconds_bucket{subcommand="add",le="+Inf"} 2' in lines
+    assert 'gitcom_git_command_seconds_count{subcommand="add"} 2' in lines
+    assert 'gitcom_git_command_seconds_sum{subcommand="add"} 1.007' in lines
+
+
+def test_time_git_records_failures_too():
+    m = RunMetrics()
+    try:
+        with m.time_git(["git", "push"]):
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert 'gitcom_git_command_seconds_count{subcommand="push"} 1' in m.render()
+
+
+def test_exporters(tmp_path):
+    m = RunMetrics()
+    m.inc("gitcom_days_planned")
+
+    server = serve_http(0, metrics=m)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url) as resp:
+            assert resp.headers["Content-Type"].startswith("application/openmetrics-text")
+            assert resp.read().decode() == m.render()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    path = tmp_path / "metrics.txt"
+    stop = write_file(path, interval=60, metrics=m)
+    m.inc("gitcom_days_planned")
+    stop.set()
+    for _ in range(100):              # final write on stop
+        if path.exists() and "gitcom_days_planned_total 2" in path.read_text():
+            break
+        time.sleep(0.02)
+    assert path.read_text() == m.render()
+    assert m.exporting
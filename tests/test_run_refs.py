@@ -0,0 +1,94 @@
+import pytest
+
+from src.core import run_refs as rr
+from src.core.snap_state import SNAP_FILENAME
+
+from conftest import commit, git
+
+
+@pytest.fixture
+def remote(repo, tmp_path):
+    bare = tmp_path / "remote.git"
+    git(tmp_path, "init", "-q", "--bare", str(bare))
+    git(repo, "remote", "add", "origin", str(bare))
+    git(repo, "push", "-q", "origin", "main")
+    return bare
+
+
+def _run(repo, snap_dir, run_id, *messages):
+    record = rr.begin_run(str(repo), snap_dir, run_id=run_id)
+    for i, message in enumerate(messages):
+        commit(repo, message, date=f"2022-01-0{i + 1}T10:00:00")
+    (snap_dir / SNAP_FILENAME).write_text(f"{run_id}\n", encoding="utf-8")
+    return rr.finish_run(str(repo), record)
+
+
+@pytest.fixture
+def snap_dir(tmp_path):
+    path = tmp_path / "snap"
+    path.mkdir()
+    (path / SNAP_FILENAME).write_text("before\n", encoding="utf-8")
+    return path
+
+
+def test_local_rollback_restores_branch_and_snapshot(repo, remote, snap_dir):
+    run = _run(repo, snap_dir, "r1", "a", "b")
+    rr.rollback(str(repo), "r1")
+
+    assert git(repo, "rev-parse", "HEAD") == run["base"]
+    assert (snap_dir / SNAP_FILENAME).read_text(encoding="utf-8") == "before\n"
+    assert rr.load_record(str(repo), "r1")["status"] == "rolled_back"
+
+
+def test_pushed_run_needs_force(repo, remote, snap_dir):
+    run = _run(repo, snap_dir, "r1", "a", "b")
+    git(repo, "push", "-q", "origin", "main")
+
+    with pytest.raises(rr.RollbackError):
+        rr.rollback(str(repo), "r1")
+    rr.rollback(str(repo), "r1", force=True)
+
+    assert git(remote, "rev-parse", "main") == run["base"]
+
+
+def test_commits_after_the_run_are_never_dropped(repo, remote, snap_dir):
+    _run(repo, snap_dir, "r1", "a")
+    foreign = commit(repo, "by hand", date="2022-02-01T10:00:00")
+
+    with pytest.raises(rr.RollbackError):
+        rr.rollback(str(repo), "r1", force=True)
+    assert git(repo, "rev-parse", "HEAD") == foreign
+
+
+def test_remote_commits_after_the_run_are_never_dropped(repo, remote, snap_dir):
+    run = _run(repo, snap_dir, "r1", "a")
+    commit(repo, "by hand", date="2022-02-01T10:00:00")
+    git(repo, "push", "-q", "origin", "main")
+    git(repo, "reset", "-q", "--hard", run["head"])
+
+    with pytest.raises(rr.RollbackError):
+        rr.rollback(str(repo), "r1", force=True)
+    assert git(repo, "rev-parse", "HEAD") == run["head"]
+
+
+def test_later_runs_are_rolled_back_with_it(repo, remote, snap_dir):
+    first = _run(repo, snap_dir, "r1", "a")
+    _run(repo, snap_dir, "r2", "b", "c")
+
+    record = rr.rollback(str(repo), "r1")
+
+    assert record["cascaded"] == ["r2"]
+    assert git(repo, "rev-parse", "HEAD") == first["base"]
+    later = rr.load_record(str(repo), "r2")
+    assert later["status"] == "rolled_back"
+    assert later["rolled_back_with"] == "r1"
+
+
+def test_unfinished_run_needs_force(repo, remote, snap_dir):
+    record = rr.begin_run(str(repo), snap_dir, run_id="r1")
+    commit(repo, "a")
+
+    with pytest.raises(rr.RollbackError):
+        rr.rollback(str(repo), "r1")
+    rr.rollback(str(repo), "r1", force=True)
+    assert git(repo, "rev-parse", "HEAD") == record["base"]
@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from src.core import commit_executor
+from src.core.msg_lib import MsgLibrary
+from src.core.sim_daemon import SimDaemon, WarmState, resolve_repo, submit_job
+
+from conftest import git
+
+
+def test_executor_loads_the_shipped_library():
+    assert commit_executor._MSG_LIB.msg_data.get("add")
+
+
+def test_random_msg_falls_back_to_the_action_type(tmp_path):
+    lib = MsgLibrary(tmp_path / "missing.json")
+    assert lib.random_msg("add", 1) == "add"
+    assert lib.pick("add", 0.5) == "add"
+
+
+def test_repo_names_resolve_from_the_shipped_registry():
+    assert resolve_repo("gitcom-test").rstrip("/\\").endswith("gitcom-test")
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    server = SimDaemon(str(tmp_path / "sim.sock"), WarmState())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_job_round_trip(repo, tmp_path, daemon):
+    job = {
+        "repo": str(repo),
+        "begin": "2022-01-03",
+        "end": "2022-01-09",
+        "mode": "soft_run",
+        "snap_dir": str(tmp_path / "snap"),
+        "seed": 5,
+    }
+    events = list(submit_job(daemon.server_address, job))
+
+    assert events[0]["event"] == "start"
+    assert events[-1]["event"] == "done", events[-1]
+    assert any(e["event"] == "day" for e in events)
+
+    library = set().union(*map(set, commit_executor._MSG_LIB.msg_data.values()))
+    subjects = git(repo, "log", "--format=%s", "HEAD~1..HEAD").splitlines()
+    assert subjects and all(s in library for s in subjects)
+
+
+def test_job_errors_are_streamed(daemon):
+    events = list(submit_job(daemon.server_address, {"repo": "."}))
+    assert [e["event"] for e in events] == ["error"]
@@ -0,0 +1,65 @@
+from datetime import datetime
+from pathlib import Path
+
+from src.core.commit_executor import execute_one_commit
+from src.core.sparse_exec import apply_cone, cone_dirs, current_cone
+
+from conftest import commit, git
+
+
+def test_sibling_with_a_common_prefix_is_not_folded():
+    assert cone_dirs(["a/x", "a-b/y", "a/b/z"]) == ["a", "a-b"]
+
+
+def test_nested_directories_fold_into_their_ancestor():
+    assert cone_dirs(["x/y/z/f", "x/f", "top", "x.y/f"]) == ["x", "x.y"]
+    assert cone_dirs(["p/q/r/f", "p/q/f"]) == ["p/q"]
+
+
+def _tree(repo):
+    for d in ("a", "b", "c"):
+        commit(repo, d, path=f"{d}/f.txt")
+
+
+def test_apply_cone_enables_then_widens(repo):
+    _tree(repo)
+    assert current_cone(str(repo)) is None
+
+    assert apply_cone(str(repo), ["a/"]) == ["a"]
+    assert git(repo, "config", "--bool", "index.sparse") == "true"
+    assert (repo / "a" / "f.txt").exists() and not (repo / "b").exists()
+
+    assert apply_cone(str(repo), ["b"]) == ["a", "b"]
+    assert current_cone(str(repo)) == ["a", "b"]
+    assert (repo / "b" / "f.txt").exists() and not (repo / "c").exists()
+
+
+def test_apply_cone_is_a_noop_when_already_covered(repo, capsys):
+    _tree(repo)
+    apply_cone(str(repo), ["a", "b"])
+    capsys.readouterr()
+
+    assert apply_cone(str(repo), ["a/deep/dir", "b"]) == ["a", "b"]
+    assert capsys.readouterr().out == ""
+    assert current_cone(str(repo)) == ["a", "b"]
+
+
+def test_sparse_commit_stages_only_the_pack(repo):
+    _tree(repo)
+    apply_cone(str(repo), ["a"])
+    (repo / "a" / "stray.txt").write_text("untracked\n", encoding="utf-8")
+    (repo / "README.md").write_text("dirty\n", encoding="utf-8")
+    pack = [
+        {"type": "add", "path": "a/new.txt"},
+        {"type": "rename", "src": "a/f.txt", "dst": "a/g.txt"},
+    ]
+
+    execute_one_commit(Path(repo), pack, datetime(2022, 2, 1, 10), 0,
+                       message="sparse", sparse=True)
+
+    changed = git(repo, "show", "--no-renames", "--name-status", "--format=", "HEAD").splitlines()
+    assert sorted(changed) == ["A\ta/g.txt", "A\ta/new.txt", "D\ta/f.txt"]
+    status = {line.strip() for line in git(repo, "status", "--porcelain").splitlines()}
+    assert status == {"M README.md", "?? a/stray.txt"}
+    # paths outside the cone are still in the commit, untouched
+    assert git(repo, "ls-tree", "-r", "--name-only", "HEAD", "b") == "b/f.txt"
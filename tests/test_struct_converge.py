@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+
+from src.core.anti_timedox import check_plan
+from src.core.struct_converge import (
+    ConvergeError,
+    converge_actions,
+    diff_sorted,
+    flatten_struct,
+    pair_renames,
+    plan_convergence,
+)
+
+
+NOW = datetime(2030, 1, 1)
+DAYS = ["2022-01-03", "2022-01-04", "2022-01-05"]
+
+
+def _final(current, plan):
+    files = set(current)
+    for commit in plan:
+        for a in commit["actions"]:
+            if a["op"] == "add":
+                files.add(a["path"])
+            elif a["op"] == "delete":
+                files.discard(a["path"])
+            elif a["op"] == "rename":
+                files.discard(a["src"])
+                files.add(a["dst"])
+    return files
+
+
+def test_flatten_struct():
+    struct = {
+        "root_files": ["README.md"],
+        "directories": {"src": {"files": ["a.py"], "subdirs": {"x": {"files": ["b.py"]}}}},
+    }
+    assert sorted(flatten_struct(struct)) == ["README.md", "src/a.py", "src/x/b.py"]
+
+
+def test_diff_and_renames():
+    to_add, to_delete = diff_sorted(["a", "d/x.md", "k"], ["a", "e/x.md", "z"])
+    assert (to_add, to_delete) == (["e/x.md", "z"], ["d/x.md", "k"])
+    assert pair_renames(to_add, to_delete) == ([("d/x.md", "e/x.md")], ["z"], ["k"])
+    assert converge_actions(["a", "d/x.md", "k"], ["a", "e/x.md", "z"]) == [
+        {"op": "rename", "src": "d/x.md", "dst": "e/x.md"},
+        {"op": "delete", "path": "k"},
+        {"op": "add", "path": "z"},
+    ]
+
+
+def test_no_kept_file_and_more_commits_than_actions():
+    current, target = {"x/a.md"}, {"y/b.md"}
+    plan = list(plan_convergence(current, target, DAYS, [5, 0, 2]))
+
+    assert len(plan) == 7
+    assert all(c["actions"] for c in plan)
+    assert _final(current, plan) == target
+    assert check_plan(current, plan, now=NOW) == []
+
+
+def test_more_actions_than_commits():
+    current = {f"old/{i}.md" for i in range(10)} | {"keep.md"}
+    target = {f"new/{i}.txt" for i in range(15)} | {"keep.md"}
+    plan = list(plan_convergence(current, target, DAYS, [1, 2, 0]))
+
+    assert len(plan) == 3
+    assert sum(len(c["actions"]) for c in plan) == 25
+    assert _final(current, plan) == target
+    assert check_plan(current, plan, now=NOW) == []
+
+
+def test_nothing_to_converge_edits_a_kept_file():
+    plan = list(plan_convergence({"a"}, {"a"}, DAYS, [1, 1, 1]))
+    assert [c["actions"] for c in plan] == [[{"op": "edit", "path": "a"}]] * 3
+
+
+def test_empty_day_plan_is_refused():
+    with pytest.raises(ConvergeError):
+        list(plan_convergence({"a"}, {"b"}, DAYS, [0, 0, 0]))
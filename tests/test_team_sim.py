@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.core.commit_prep import Identity
+from src.core.multidays_commit_pusher import date_range
+from src.core.team_sim import merge_timelines, plan_timelines
+from src.core.time_set import TimeInjection
+
+TEAM = [
+    Identity("ann", "ann@example.com"),
+    Identity("bob", "bob@example.com", work_probability=0.5),
+    Identity("cy", "cy@example.com", multi_commit_probability=0.9),
+]
+
+
+def test_pool_plan_matches_in_process_plan():
+    days = date_range("2022-01-01", "2022-03-31")
+    serial = plan_timelines(TEAM, days, TimeInjection(), 7, "repo", workers=0)
+    pooled = plan_timelines(TEAM, days, TimeInjection(), 7, "repo", workers=2)
+
+    assert len(pooled) == len(TEAM)
+    for a, b in zip(serial, pooled):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_merged_stream_is_sorted():
+    days = date_range("2022-01-01", "2022-01-31")
+    timelines = plan_timelines(TEAM, days, TimeInjection(), 7, "repo", workers=0)
+    merged = [epoch for epoch, _, _ in merge_timelines(timelines)]
+
+    assert merged == sorted(merged)
+    assert len(merged) == sum(t.size for t in timelines)
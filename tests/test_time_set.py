@@ -0,0 +1,36 @@
+from datetime import timezone
+
+import numpy as np
+import pytest
+
+from src.core.rng_streams import RngStreams
+from src.core.time_set import TimeInjection, TimeSetError, commit_times, to_datetimes
+
+
+DAYS = ["2022-01-03", "2022-01-04", "2022-01-06"]
+INJ = TimeInjection(timezone="-0500", hour_range=(9, 22), strategy="random")
+
+
+def test_range_call_matches_per_day_calls():
+    streams = RngStreams(7, repo="r")
+    whole = commit_times(DAYS, [1, 1, 1], INJ, streams=streams)
+    per_day = np.concatenate([commit_times([d], [1], INJ, streams=streams) for d in DAYS])
+    assert whole.tolist() == per_day.tolist()
+
+
+@pytest.mark.parametrize("strategy", ["random", "even", "fixed"])
+def test_strictly_increasing_on_local_and_utc_day(strategy):
+    inj = TimeInjection(timezone="-0500", hour_range=(9, 22), strategy=strategy)
+    times = to_datetimes(commit_times(DAYS, [5, 0, 40], inj, streams=RngStreams(1)), inj)
+    assert len(times) == 45
+    assert all(a < b for a, b in zip(times, times[1:]))
+    for t in times:
+        assert 9 <= t.hour <= 22
+        assert t.astimezone(timezone.utc).date() == t.date()
+
+
+def test_bad_input_is_refused():
+    with pytest.raises(TimeSetError):
+        commit_times(["2022-01-04", "2022-01-03"], [1, 1], INJ)
+    with pytest.raises(TimeSetError):
+        commit_times(DAYS, [1, 1], INJ)
@@ -0,0 +1,84 @@
+import io
+
+import numpy as np
+import pytest
+
+from src.core.time_set import TimeInjection
+from src.core.transplant import TransplantError, retime_counts, rewrite_stream, transplant
+
+from conftest import commit, git
+
+
+def _data(payload: bytes) -> bytes:
+    return b"data %d\n%s" % (len(payload), payload)
+
+
+STREAM = b"".join([
+    b"blob\nmark :1\n", _data(b"commit refs/heads/x\nauthor Fake <f> 1 +0000\n"), b"\n",
+    b"reset refs/heads/main\n",
+    b"commit refs/heads/main\nmark :2\n",
+    b"author Ann <ann@a> 1600000000 +0200\n",
+    b"committer Bob <bob@b> 1600000001 +0200\n",
+    _data(b"first\nauthor in the message\n"),
+    b"M 100644 :1 a.txt\n\n",
+    b"commit refs/heads/main\nmark :3\n",
+    b"author Ann <ann@a> 1600000100 +0200\n",
+    b"committer Ann <ann@a> 1600000100 +0200\n",
+    _data(b"second"), b"\nfrom :2\n\n",
+])
+
+
+def test_rewrite_stream_retimes_headers_only():
+    out = io.BytesIO()
+    n = rewrite_stream(io.BytesIO(STREAM), out, np.array([100, 200]), b"-0500")
+
+    assert n == 2
+    expected = (STREAM
+                .replace(b"Ann <ann@a> 1600000000 +0200", b"Ann <ann@a> 100 -0500")
+                .replace(b"Bob <bob@b> 1600000001 +0200", b"Bob <bob@b> 100 -0500")
+                .replace(b"Ann <ann@a> 1600000100 +0200", b"Ann <ann@a> 200 -0500"))
+    assert out.getvalue() == expected
+
+
+def test_rewrite_stream_identity_and_limits():
+    out = io.BytesIO()
+    rewrite_stream(io.BytesIO(STREAM), out, np.array([100, 200]), b"+0000", (b"New", b"new@n"))
+    assert out.getvalue().count(b"New <new@n>") == 4
+    assert b"author Fake <f> 1 +0000" in out.getvalue()      # blob data untouched
+
+    with pytest.raises(TransplantError, match="more exported commits"):
+        rewrite_stream(io.BytesIO(STREAM), io.BytesIO(), np.array([100]), b"+0000")
+    with pytest.raises(TransplantError, match="inside a data block"):
+        rewrite_stream(io.BytesIO(STREAM[:40]), io.BytesIO(), np.array([100, 200]), b"+0000")
+
+
+def test_retime_counts_keeps_the_shape():
+    epochs = np.array([0, 1, 2, 50, 99])
+    assert retime_counts(epochs, 10).tolist() == [3, 0, 0, 0, 0, 1, 0, 0, 0, 1]
+    assert retime_counts(np.array([], dtype=np.int64), 3).tolist() == [0, 0, 0]
+    with pytest.raises(TransplantError):
+        retime_counts(epochs, 0)
+
+
+def test_transplant(repo, tmp_path):
+    commit(repo, "two", date="2021-12-05T10:00:00", path="src/a.txt")
+    commit(repo, "three", date="2021-12-20T10:00:00")
+    target = tmp_path / "target"
+    injection = TimeInjection(timezone="-0500")
+
+    summary = transplant(
+        str(repo), str(target), begin="2022-03-01", end="2022-03-31",
+        injection=injection, identity=("New", "new@n"), seed=1,
+    )
+
+    assert summary["commits"] == 3
+    assert git(target, "rev-parse", "HEAD^{tree}") == git(repo, "rev-parse", "HEAD^{tree}")
+    assert git(target, "log", "--format=%s").split() == ["three", "two", "init"]
+    assert set(git(target, "log", "--format=%an <%ae>|%cn").splitlines()) == {"New <new@n>|New"}
+
+    dates = git(target, "log", "--reverse", "--format=%ad", "--date=iso-strict").split()
+    assert dates == sorted(dates)
+    assert all(d.startswith("2022-03-") and d.endswith("-05:00") for d in dates)
+
+    with pytest.raises(TransplantError, match="already has history"):
+        transplant(str(repo), str(target), begin="2022-03-01", end="2022-03-31", injection=injection)
@@ -0,0 +1,88 @@
+import random
+from collections import Counter
+
+import pytest
+
+from src.core.weighted_pick import AliasTable, FenwickTree, TargetSampler, WeightedPickError
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable(["a", "b", "c", "z"], [5, 3, 2, 0])
+    rng = random.Random(1)
+    counts = Counter(table.draw(rng) for _ in range(20000))
+    assert counts["z"] == 0
+    for key, p in (("a", 0.5), ("b", 0.3), ("c", 0.2)):
+        assert abs(counts[key] / 20000 - p) < 0.02
+
+
+@pytest.mark.parametrize("population, weights", [([], []), (["a"], [1, 2]), (["a"], [-1]), (["a", "b"], [0, 0])])
+def test_alias_table_rejects_bad_weights(population, weights):
+    with pytest.raises(WeightedPickError):
+        AliasTable(population, weights)
+
+
+def test_fenwick_prefix_add_find():
+    weights = [1.0, 0.0, 2.0, 3.0, 0.5]
+    tree = FenwickTree(weights)
+    assert [tree.prefix(i) for i in range(6)] == [0.0, 1.0, 1.0, 3.0, 6.0, 6.5]
+    assert [tree.find(u) for u in (0.0, 0.99, 1.0, 2.9, 3.0, 6.4)] == [0, 0, 2, 2, 3, 4]
+
+    tree.add(1, 4.0)
+    assert tree.total() == 10.5
+    assert tree.find(1.5) == 1
+
+
+def test_sampler_only_draws_live_paths():
+    sampler = TargetSampler(["a", "b"])
+    sampler.apply([
+        {"type": "add", "path": "c"},
+        {"type": "delete", "path": "a"},
+        {"type": "rename", "src": "b", "dst": "d"},
+    ])
+    assert len(sampler) == 2 and "a" not in sampler and "d" in sampler
+
+    rng = random.Random(3)
+    assert {sampler.draw(rng) for _ in range(200)} == {"c", "d"}
+
+    sampler.remove("c")
+    sampler.remove("d")
+    with pytest.raises(WeightedPickError):
+        sampler.draw(rng)
+
+
+def test_sampler_recency_and_dir_weights():
+    rng = random.Random(5)
+    sampler = TargetSampler([f"f{i}" for i in range(50)], recency=6.0)
+    sampler.touch("f7")
+    assert Counter(sampler.draw(rng) for _ in range(500))["f7"] > 250
+
+    sampler = TargetSampler(["docs/a", "src/b"], dir_weights={"docs": 0.0})
+    assert {sampler.draw(rng) for _ in range(100)} == {"src/b"}
+
+
+def test_sampler_survives_cancellation_and_idle_underflow():
+    # remove() of a huge weight cancels the tree total to 0.0
+    sampler = TargetSampler(["a"], dir_weights={"big": 1e20})
+    sampler.add("big/x")
+    sampler.remove("big/x")
+    assert sampler.draw(random.Random(0)) == "a"
+
+    # the only recently touched path goes away: "a" must not underflow to 0
+    sampler = TargetSampler(["a", "b"], recency=50.0)
+    for _ in range(100):
+        sampler.touch("b")
+    sampler.remove("b")
+    assert sampler.draw(random.Random(0)) == "a"
+
+
+def test_sampler_churn_never_overflows():
+    sampler = TargetSampler(["a", "b"], recency=0.05)
+    for i in range(20000):
+        sampler.touch(f"tmp{i}")
+        sampler.remove(f"tmp{i}")
+    sampler.touch("c")
+
+    rng = random.Random(0)
+    assert Counter(sampler.draw(rng) for _ in range(200))["c"] == 200
+    sampler.remove("c")
+    assert {sampler.draw(rng) for _ in range(200)} == {"a", "b"}